@@ -4,10 +4,11 @@ from flask_migrate import Migrate
 from flask_mail import Mail
 from flask_login import LoginManager
 from config import config
+from app.utils.db_routing import RoutingSession
 import os
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 mail = Mail()
 login_manager = LoginManager()
@@ -32,9 +33,9 @@ def create_app(config_name=None):
         if app.config.get("DISABLE_DATABASE", False):
             return None
         try:
-            from app.models.user import User
+            from app.utils.identity_cache import identity_cache
 
-            return User.query.get(int(user_id))
+            return identity_cache.load_user(int(user_id))
         except:
             return None
 
@@ -42,6 +43,16 @@ def create_app(config_name=None):
     if not app.config.get("DISABLE_DATABASE", False):
         db.init_app(app)
         migrate.init_app(app, db)
+
+        # Apply SQLite pragmas (WAL, busy timeout, ...) to new connections
+        from app.utils.sqlite_tuning import init_sqlite_tuning
+
+        init_sqlite_tuning(app)
+
+        # Read replica engine for admin reads (READ_REPLICA_ENABLED)
+        from app.utils.db_routing import init_read_routing
+
+        init_read_routing(app)
     else:
         # Initialize a dummy db for compatibility
         db.init_app(app)
@@ -49,11 +60,56 @@ def create_app(config_name=None):
     # Initialize Flask-Mail
     mail.init_app(app)
 
+    # Initialize pooled SMTP transport
+    from app.utils.mail_transport import init_mail_transport
+
+    init_mail_transport(app)
+
+    # Initialize email template rendering
+    from app.utils.email_rendering import init_email_rendering
+
+    init_email_rendering(app)
+
     # Initialize hCaptcha
     from app.utils.hcaptcha_utils import init_hcaptcha
 
     init_hcaptcha(app)
 
+    # Initialize login lockout engine
+    from app.utils.lockout import init_lockout, lockout_engine
+
+    init_lockout(app)
+
+    # Initialize bounded password hashing pool
+    from app.utils.password_hashing import hashing_service, init_hashing
+
+    init_hashing(app)
+
+    # Initialize offline breached-password check
+    from app.utils.breached_passwords import init_breached_passwords
+
+    init_breached_passwords(app)
+
+    # Check signed token settings
+    from app.utils.signed_tokens import init_signed_tokens
+
+    init_signed_tokens(app)
+
+    # Load zxcvbn dictionaries up front when preloading (shared copy-on-write by forked workers)
+    if app.config.get("ZXCVBN_PRELOAD", False):
+        from app.utils.password_validator import preload_zxcvbn
+
+        stats = preload_zxcvbn()
+        app.logger.info(
+            f"zxcvbn dictionaries loaded in {stats['load_ms']} ms, "
+            f"RSS {stats['rss_before_kib'] // 1024} -> {stats['rss_after_kib'] // 1024} MiB"
+        )
+
+    # Initialize identity cache for the user loader
+    from app.utils.identity_cache import init_identity_cache
+
+    init_identity_cache(app)
+
     # Import models to ensure they are registered with SQLAlchemy
     if not app.config.get("DISABLE_DATABASE", False):
         from app.models import Contact, User, PasswordResetToken
@@ -63,12 +119,22 @@ def create_app(config_name=None):
 
     register_blueprints(app)
 
+    # Register CLI commands
+    from app.commands import register_commands
+
+    register_commands(app)
+
     # Create database tables only in non-Vercel environments
     with app.app_context():
         if not app.config.get("DISABLE_DATABASE", False):
             try:
                 db.create_all()
 
+                # Create the user search index and its sync triggers (SQLite only)
+                from app.utils.user_search import create_search_index
+
+                create_search_index()
+
                 # Create default admin user if it doesn't exist
                 from app.models.user import User
                 from app.models.email_verification import EmailVerification
@@ -81,7 +147,9 @@ def create_app(config_name=None):
                         is_admin=True,
                         active=True,
                     )
-                    admin_user.set_password("admin123")  # Change this in production!
+                    # Hash inline: no argon2 pool threads in a preloading master
+                    with hashing_service.inline():
+                        admin_user.set_password("admin123")  # Change this in production!
                     db.session.add(admin_user)
                     db.session.commit()
 
@@ -101,9 +169,7 @@ def create_app(config_name=None):
                     )
                 else:
                     # Ensure existing admin has verified email
-                    if not EmailVerification.is_email_verified(
-                        admin_user.id, admin_user.email
-                    ):
+                    if not admin_user.email_verified:
                         admin_verification = EmailVerification(
                             user_id=admin_user.id, email=admin_user.email
                         )
@@ -115,6 +181,14 @@ def create_app(config_name=None):
                         admin_verification.verify()
                         app.logger.info("Admin email verification created and verified")
 
+                # Seed lockout counters from recent failed attempts
+                lockout_engine.load_from_database()
+
+                # Drop the setup connections so workers forked from a preloaded
+                # gunicorn master open their own instead of sharing these
+                db.session.remove()
+                db.engine.dispose()
+
             except Exception as e:
                 app.logger.warning(f"Database initialization failed: {e}")
 
@@ -0,0 +1,22 @@
+from .lockout import lockout_cli
+from .bench import bench_cli
+from .rollups import rollups_cli
+from .search import search_cli
+from .hashing import calibrate_hash
+from .breached import breached_cli
+from .outbox import outbox_cli
+from .maintenance import maintenance_cli
+from .archive import archive_cli
+
+
+def register_commands(app):
+    """Register all CLI command groups with the Flask app."""
+    app.cli.add_command(lockout_cli)
+    app.cli.add_command(bench_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(calibrate_hash)
+    app.cli.add_command(breached_cli)
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(maintenance_cli)
+    app.cli.add_command(archive_cli)
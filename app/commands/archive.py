@@ -0,0 +1,36 @@
+import click
+from flask.cli import AppGroup
+
+from app.commands.maintenance import print_results
+from app.utils.archive import ARCHIVED_TABLES, archive_and_prune, archive_dir, archive_summary
+
+archive_cli = AppGroup('archive', help='Archive-then-prune for login attempts and contact submissions.')
+
+
+@archive_cli.command('run')
+@click.option('--table', 'tables', multiple=True, type=click.Choice(list(ARCHIVED_TABLES)),
+              help='Archive only this table (repeatable; default: all).')
+@click.option('--batch-size', default=None, type=int, help='Rows per batch (default: MAINTENANCE_BATCH_SIZE).')
+@click.option('--max-seconds', default=None, type=float, help='Stop after this long; the next run continues.')
+def run(tables, batch_size, max_seconds):
+    """Write rows past their retention window to the archive, then delete them."""
+
+    def progress(rows, elapsed):
+        rate = rows / elapsed if elapsed > 0 else 0
+        click.echo(f"  {rows:,} rows, {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+    results = [archive_and_prune(table, batch_size=batch_size, max_seconds=max_seconds, progress=progress)
+               for table in tables or ARCHIVED_TABLES]
+    print_results(results)
+
+
+@archive_cli.command('status')
+def status():
+    """Show archive files per table."""
+    click.echo(f"Archive directory: {archive_dir()}")
+    for table, info in archive_summary().items():
+        if not info['files']:
+            click.echo(f"{table:>20}: no archive files")
+            continue
+        click.echo(f"{table:>20}: {info['files']} files, {info['bytes'] / 1024:,.0f} KiB, "
+                   f"{info['first_day']} to {info['last_day']}")
@@ -0,0 +1,420 @@
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from app import db
+from app.models.login_attempt import LoginAttempt
+from app.models.login_rollup import LoginRollup
+from app.models.contact import Contact
+from app.models.email_verification import EmailVerification
+from app.models.user import User
+from app.utils.admin_stats import get_dashboard_stats
+from app.utils.user_search import create_search_index, search_users
+
+bench_cli = AppGroup('bench', help='Performance benchmarks run against a scratch database.')
+
+
+def parse_sizes(value):
+    """Parse a comma separated list of row counts."""
+    return sorted(int(size) for size in value.split(',') if size.strip())
+
+
+def scratch_session(path):
+    """Create a session on a fresh SQLite file with the app schema."""
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    return engine, Session(engine)
+
+
+def fill_login_attempts(session, count, days=60, batch_size=50000):
+    """Insert ``count`` synthetic login attempts spread over the last ``days``."""
+    now = datetime.utcnow()
+    span = int(timedelta(days=days).total_seconds())
+    while count > 0:
+        batch = min(batch_size, count)
+        session.execute(insert(LoginAttempt), [
+            {
+                'ip_address': f'10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}',
+                'username_or_email': f'user{random.randint(1, 5000)}',
+                'success': random.random() < 0.7,
+                'attempted_at': now - timedelta(seconds=random.randint(0, span)),
+            }
+            for _ in range(batch)
+        ])
+        session.commit()
+        count -= batch
+
+
+def fill_users(session, count, batch_size=50000):
+    """Insert ``count`` synthetic users with distinct usernames and emails."""
+    words = ['alpha', 'bravo', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'kilo', 'lima']
+    domains = ['example.com', 'mail.test', 'corp.local']
+    now = datetime.utcnow()
+    start = session.query(User).count()
+    for offset in range(0, count, batch_size):
+        session.execute(insert(User), [
+            {
+                'username': f'{random.choice(words)}{random.choice(words)}{i}',
+                'email': f'user{i}@{random.choice(domains)}',
+                'password_hash': 'x',
+                'active': True,
+                'is_admin': False,
+                'created_at': now - timedelta(minutes=i),
+            }
+            for i in range(start + offset, start + min(offset + batch_size, count))
+        ])
+        session.commit()
+
+
+def time_call(func, repeat):
+    """Median wall time of ``func`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def legacy_dashboard_stats(session):
+    """The per-counter COUNT queries the dashboard used to run."""
+    now = datetime.utcnow()
+    thirty_days_ago = now - timedelta(days=30)
+    twenty_four_hours_ago = now - timedelta(hours=24)
+    session.query(User).count()
+    session.query(User).filter_by(active=True).count()
+    session.query(User).filter(User.created_at >= thirty_days_ago).count()
+    session.query(LoginAttempt).filter(LoginAttempt.attempted_at >= twenty_four_hours_ago).count()
+    session.query(LoginAttempt).filter(
+        LoginAttempt.attempted_at >= twenty_four_hours_ago, LoginAttempt.success == False
+    ).count()
+    session.query(EmailVerification).filter_by(is_verified=True).count()
+    session.query(EmailVerification).filter_by(is_verified=False).count()
+    session.query(Contact).filter(Contact.created_at >= thirty_days_ago).count()
+
+
+@bench_cli.command('dashboard')
+@click.option('--sizes', default='10000,100000,1000000', show_default=True,
+              help='Comma separated login_attempts table sizes to measure.')
+@click.option('--repeat', default=5, show_default=True, type=int)
+def dashboard(sizes, repeat):
+    """Measure dashboard statistics latency as login_attempts grows."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine, session = scratch_session(os.path.join(tmpdir, 'bench.db'))
+        click.echo(f"{'rows':>12} {'legacy ms':>12} {'aggregate ms':>14} {'rollups ms':>12}")
+        loaded = 0
+        for size in parse_sizes(sizes):
+            fill_login_attempts(session, size - loaded)
+            loaded = size
+            legacy_ms = time_call(lambda: legacy_dashboard_stats(session), repeat)
+            aggregate_ms = time_call(lambda: get_dashboard_stats(session, use_rollups=False), repeat)
+            LoginRollup.rebuild(since=datetime.utcnow() - timedelta(days=2),
+                               until=datetime.utcnow() + timedelta(days=1), session=session)
+            rollups_ms = time_call(lambda: get_dashboard_stats(session, use_rollups=True), repeat)
+            click.echo(f"{size:>12,} {legacy_ms:>12.2f} {aggregate_ms:>14.2f} {rollups_ms:>12.2f}")
+        session.close()
+        engine.dispose()
+
+
+@bench_cli.command('search')
+@click.option('--users', 'user_count', default=1000000, show_default=True, type=int,
+              help='Number of users in the scratch table.')
+@click.option('--terms', default='ab,kilo,bravodelta,user4242,mail.test', show_default=True,
+              help='Comma separated search terms to measure.')
+@click.option('--repeat', default=5, show_default=True, type=int)
+def search(user_count, terms, repeat):
+    """Compare admin user search (first page plus count) with LIKE '%term%'."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine, session = scratch_session(os.path.join(tmpdir, 'bench.db'))
+        fill_users(session, user_count)
+        create_search_index(engine=engine)
+
+        def legacy(term):
+            query = session.query(User).filter(User.username.contains(term) | User.email.contains(term))
+            query.count()
+            query.order_by(User.created_at.desc()).limit(25).all()
+
+        def indexed(term):
+            query = search_users(session.query(User), term)
+            query.order_by(None).count()
+            query.limit(25).all()
+
+        click.echo(f"{user_count:,} users")
+        click.echo(f"{'term':>14} {'LIKE ms':>10} {'indexed ms':>12}")
+        for term in (t.strip() for t in terms.split(',') if t.strip()):
+            legacy_ms = time_call(lambda: legacy(term), repeat)
+            indexed_ms = time_call(lambda: indexed(term), repeat)
+            click.echo(f"{term:>14} {legacy_ms:>10.2f} {indexed_ms:>12.2f}")
+        session.close()
+        engine.dispose()
+
+
+# Runs in a fresh interpreter so nothing is loaded yet
+ZXCVBN_PROBE = """
+import json, sys, time
+import app
+started = time.perf_counter()
+import app.utils.password_validator as validator
+import_ms = (time.perf_counter() - started) * 1000
+stats = validator.preload_zxcvbn()
+stats.update(import_ms=round(import_ms, 1))
+print(json.dumps(stats))
+"""
+
+
+@bench_cli.command('zxcvbn')
+def zxcvbn_load():
+    """Report validator import time, zxcvbn load time and RSS before/after in a fresh process."""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    output = subprocess.run([sys.executable, '-c', ZXCVBN_PROBE], cwd=root, check=True,
+                            capture_output=True, text=True).stdout
+    stats = json.loads(output.strip().splitlines()[-1])
+    click.echo(f"validator import: {stats['import_ms']:.1f} ms (zxcvbn loaded lazily)")
+    click.echo(f"zxcvbn load + first score: {stats['load_ms']:.1f} ms")
+    click.echo(f"RSS before load: {stats['rss_before_kib'] / 1024:.1f} MiB")
+    click.echo(f"RSS after load: {stats['rss_after_kib'] / 1024:.1f} MiB "
+               f"(+{(stats['rss_after_kib'] - stats['rss_before_kib']) / 1024:.1f} MiB per process "
+               f"unless preloaded in the gunicorn master)")
+
+
+def anon_rss_kib():
+    """Anonymous (private, not file-backed) resident memory in KiB, or None without /proc."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('RssAnon:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+@bench_cli.command('breached')
+@click.option('--records', default=1000000, show_default=True, type=int,
+              help='Synthetic breached hashes in the scratch file.')
+@click.option('--lookups', default=100000, show_default=True, type=int)
+def breached(records, lookups):
+    """Measure breached-password lookups (hits and misses, with and without the Bloom filter)."""
+    from app.utils.breached_passwords import (
+        BloomFile, HashFile, build_bloom_file, build_hash_file, password_digest,
+    )
+
+    with tempfile.TemporaryDirectory() as workdir:
+        hash_path = os.path.join(workdir, 'hashes.bin')
+        bloom_path = os.path.join(workdir, 'hashes.bloom')
+        members = [f'breached-{i}' for i in range(min(records, lookups))]
+        digests = sorted({password_digest(p) for p in members} |
+                         {os.urandom(20) for _ in range(records - len(members))})
+        build_hash_file(digests, hash_path, presorted=True)
+        bloom = build_bloom_file(hash_path, bloom_path)
+        del digests
+
+        hashes, bloom_filter = HashFile(hash_path), BloomFile(bloom_path)
+        misses = [f'not-breached-{i}' for i in range(lookups)]
+        click.echo(f"{hashes.count:,} hashes: {os.path.getsize(hash_path) // 1024} KiB file, "
+                   f"{bloom['bytes'] // 1024} KiB Bloom filter ({bloom['probes']} probes)")
+
+        def lookup(passwords, use_bloom):
+            for password in passwords:
+                digest = password_digest(password)
+                if use_bloom and not bloom_filter.might_contain(digest):
+                    continue
+                hashes.contains(digest)
+
+        rss_before = anon_rss_kib()
+        click.echo(f"{'case':>22} {'us/lookup':>10}")
+        for label, passwords, use_bloom in (
+            ('hit', members, False),
+            ('miss', misses, False),
+            ('hit (bloom)', members, True),
+            ('miss (bloom)', misses, True),
+        ):
+            started = time.perf_counter()
+            lookup(passwords, use_bloom)
+            elapsed_us = (time.perf_counter() - started) * 1e6 / len(passwords)
+            click.echo(f"{label:>22} {elapsed_us:>10.2f}")
+        if rss_before is not None:
+            click.echo(f"Private memory growth over {4 * lookups:,} lookups: "
+                       f"{(anon_rss_kib() - rss_before) / 1024:.1f} MiB (mapped pages are shared page cache)")
+        hashes.close()
+        bloom_filter.close()
+
+
+@bench_cli.command('smtp')
+@click.option('--messages', default=50, show_default=True, type=int)
+@click.option('--handshake-ms', default=50, show_default=True, type=int,
+              help='Simulated connect + STARTTLS + AUTH time on the local SMTP sink.')
+def smtp(messages, handshake_ms):
+    """Compare a new SMTP connection per message with the pooled transport."""
+    from flask import current_app
+    from flask_mail import Message
+    from app import mail
+    from app.utils.mail_transport import MailTransport
+    from app.utils.smtp_sink import SMTPSink
+
+    with SMTPSink(port=0, connect_delay=handshake_ms / 1000) as sink:
+        state = mail.init_mail({'MAIL_SERVER': sink.host, 'MAIL_PORT': sink.port,
+                                'MAIL_DEFAULT_SENDER': 'bench@example.com'})
+        original_state = current_app.extensions['mail']
+        current_app.extensions['mail'] = state
+        try:
+            batch = [Message(f'Bench {i}', recipients=[f'user{i}@example.com'], body='Benchmark message')
+                     for i in range(messages)]
+
+            started = time.perf_counter()
+            for message in batch:
+                with mail.connect() as connection:
+                    connection.send(message)
+            per_message_s = time.perf_counter() - started
+            per_message_connections = sink.connections
+
+            transport = MailTransport(pool_size=1)
+            started = time.perf_counter()
+            transport.send_many(batch)
+            pooled_s = time.perf_counter() - started
+            transport.close_all()
+        finally:
+            current_app.extensions['mail'] = original_state
+
+    click.echo(f"{messages} messages, {handshake_ms} ms simulated handshake")
+    click.echo(f"{'transport':>22} {'connections':>12} {'total ms':>10} {'ms/message':>11}")
+    click.echo(f"{'connection per send':>22} {per_message_connections:>12} "
+               f"{per_message_s * 1000:>10.0f} {per_message_s * 1000 / messages:>11.1f}")
+    click.echo(f"{'pooled':>22} {sink.connections - per_message_connections:>12} "
+               f"{pooled_s * 1000:>10.0f} {pooled_s * 1000 / messages:>11.1f}")
+
+
+@bench_cli.command('email')
+@click.option('--repeat', default=1000, show_default=True, type=int)
+def email(repeat):
+    """Compare compiling an email template per send with rendering the cached one."""
+    from flask import current_app
+    from app.utils.email_rendering import SAMPLE_CONTEXTS, EmailRenderer, email_renderer
+
+    click.echo(f"{'template':>22} {'compile + inline ms':>20} {'cached render us':>17} {'bulk us/message':>16}")
+    for name in email_renderer.template_names():
+        context = SAMPLE_CONTEXTS.get(name, {})
+
+        # What every send paid when the template was built per message
+        cold_ms = []
+        for _ in range(min(repeat, 20)):
+            renderer = EmailRenderer()
+            renderer.init_app(current_app)
+            started = time.perf_counter()
+            renderer.render(name, **context)
+            cold_ms.append((time.perf_counter() - started) * 1000)
+
+        email_renderer.render(name, **context)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            email_renderer.render(name, **context)
+        cached_us = (time.perf_counter() - started) * 1e6 / repeat
+
+        started = time.perf_counter()
+        for _ in email_renderer.render_many(name, [context] * repeat):
+            pass
+        bulk_us = (time.perf_counter() - started) * 1e6 / repeat
+
+        click.echo(f"{name:>22} {statistics.median(cold_ms):>20.2f} {cached_us:>17.1f} {bulk_us:>16.1f}")
+    # The throwaway renderers re-registered themselves
+    current_app.extensions['email_renderer'] = email_renderer
+
+
+def _sqlite_load_worker(path, pragmas, role, seconds, start_at, results):
+    """
+    One simulated gunicorn worker: record login attempts (writer) or run
+    dashboard counts (reader) on its own engine until the time is up.
+    """
+    from sqlalchemy import func, select
+    from sqlalchemy.exc import OperationalError
+    from app.utils.sqlite_tuning import tune_engine
+
+    engine = create_engine(f'sqlite:///{path}')
+    if pragmas:
+        tune_engine(engine, pragmas)
+    latencies, errors = [], 0
+    user = f'user{os.getpid() % 5000}'
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            with engine.begin() as connection:
+                since = datetime.utcnow() - timedelta(minutes=15)
+                if role == 'writer':
+                    # The lockout check and the attempt row written by each login
+                    connection.execute(select(func.count(LoginAttempt.id)).where(
+                        LoginAttempt.username_or_email == user, LoginAttempt.attempted_at >= since))
+                    connection.execute(insert(LoginAttempt).values(
+                        ip_address='10.0.0.1', username_or_email=user, success=random.random() < 0.7,
+                        attempted_at=datetime.utcnow()))
+                else:
+                    connection.execute(select(LoginAttempt.success, func.count(LoginAttempt.id)).where(
+                        LoginAttempt.attempted_at >= since - timedelta(days=1)).group_by(LoginAttempt.success)).all()
+        except OperationalError:
+            errors += 1  # database is locked
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    engine.dispose()
+    results.put((role, latencies, errors))
+
+
+@bench_cli.command('sqlite-writes')
+@click.option('--writers', default=8, show_default=True, type=int, help='Concurrent writer processes.')
+@click.option('--readers', default=2, show_default=True, type=int, help='Concurrent dashboard reader processes.')
+@click.option('--seconds', default=5.0, show_default=True, type=float)
+@click.option('--rows', default=100000, show_default=True, type=int, help='Login attempts in the table beforehand.')
+def sqlite_writes(writers, readers, seconds, rows):
+    """Compare concurrent login writes with SQLite defaults and with the tuned pragmas."""
+    import multiprocessing
+    from flask import current_app
+    from app.utils.sqlite_tuning import read_pragmas, sqlite_pragmas, tune_engine
+
+    def percentile(values, fraction):
+        return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+    tuned_pragmas = sqlite_pragmas(current_app.config)
+    click.echo(f"{writers} writer and {readers} reader processes for {seconds:g}s on {rows:,} rows")
+    click.echo(f"{'profile':>8} {'journal':>8} {'writes/s':>9} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} "
+               f"{'reads/s':>8} {'locked':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile, pragmas in (('default', None), ('tuned', tuned_pragmas)):
+            path = os.path.join(tmp, f'{profile}.db')
+            engine, session = scratch_session(path)
+            fill_login_attempts(session, rows)
+            session.close()
+            engine.dispose()
+            if pragmas:
+                tune_engine(engine, pragmas)
+            journal = read_pragmas(engine, ['journal_mode'])['journal_mode']
+            engine.dispose()
+
+            results = multiprocessing.Queue()
+            start_at = time.time() + 0.5
+            processes = [
+                multiprocessing.Process(target=_sqlite_load_worker,
+                                        args=(path, pragmas, role, seconds, start_at, results))
+                for role in ['writer'] * writers + ['reader'] * readers
+            ]
+            for process in processes:
+                process.start()
+            outcomes = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+            write_ms = sorted(ms for role, latencies, _ in outcomes if role == 'writer' for ms in latencies)
+            reads = sum(len(latencies) for role, latencies, _ in outcomes if role == 'reader')
+            locked = sum(errors for _, _, errors in outcomes)
+            click.echo(f"{profile:>8} {journal:>8} {len(write_ms) / seconds:>9,.0f} "
+                       f"{percentile(write_ms, 0.5):>7.1f} {percentile(write_ms, 0.99):>7.1f} "
+                       f"{(write_ms[-1] if write_ms else 0):>7.0f} {reads / seconds:>8,.0f} {locked:>7}")
@@ -0,0 +1,81 @@
+import gzip
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.utils.breached_passwords import (
+    BreachedPasswordError,
+    breached_passwords,
+    build_bloom_file,
+    build_hash_file,
+    parse_hash_lines,
+)
+
+breached_cli = AppGroup('breached', help='Offline breached-password list commands.')
+
+
+def default_hash_path():
+    return current_app.config.get('BREACHED_PASSWORDS_FILE') or os.path.join(
+        current_app.instance_path, 'breached-passwords.bin'
+    )
+
+
+@breached_cli.command('build')
+@click.argument('source', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', default=None, help='Hash file to write (default: BREACHED_PASSWORDS_FILE).')
+@click.option('--bloom', 'bloom_path', default=None,
+              help='Bloom filter file to write (default: BREACHED_PASSWORDS_BLOOM, if set).')
+@click.option('--no-bloom', is_flag=True, help='Skip building the Bloom filter.')
+@click.option('--fp-rate', default=0.01, show_default=True, type=float,
+              help='Bloom filter false positive rate.')
+@click.option('--min-count', default=1, show_default=True, type=int,
+              help='Drop hashes seen fewer times than this in breaches.')
+@click.option('--presorted', is_flag=True,
+              help='Stream input that is already sorted by hash (e.g. the Pwned Passwords download).')
+def build(source, output, bloom_path, no_bloom, fp_rate, min_count, presorted):
+    """
+    Build the lookup files from a SHA1[:COUNT] hash list (optionally gzipped).
+
+    Download the SHA-1 list from https://haveibeenpwned.com/Passwords or with
+    the PwnedPasswordsDownloader tool; no network access is needed afterwards.
+    """
+    output = output or default_hash_path()
+    if not no_bloom and bloom_path is None:
+        bloom_path = current_app.config.get('BREACHED_PASSWORDS_BLOOM') or None
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    opener = gzip.open if source.endswith('.gz') else open
+    started = time.perf_counter()
+    with opener(source, 'rt', encoding='ascii', errors='replace') as lines:
+        try:
+            written = build_hash_file(parse_hash_lines(lines, min_count), output, presorted=presorted)
+        except BreachedPasswordError as e:
+            raise click.ClickException(str(e))
+    click.echo(f"Wrote {written} hashes to {output} ({os.path.getsize(output) // 1024} KiB) "
+               f"in {time.perf_counter() - started:.1f}s")
+
+    if bloom_path and not no_bloom:
+        started = time.perf_counter()
+        bloom = build_bloom_file(output, bloom_path, fp_rate)
+        click.echo(f"Wrote Bloom filter to {bloom_path} ({bloom['bytes'] // 1024} KiB, "
+                   f"{bloom['probes']} probes) in {time.perf_counter() - started:.1f}s")
+
+    if not current_app.config.get('BREACHED_PASSWORDS_FILE'):
+        click.echo(f"Set BREACHED_PASSWORDS_FILE={output} to enable the check.")
+    breached_passwords.close()
+
+
+@breached_cli.command('status')
+def status():
+    """Show whether the breached-password check is enabled and how large its files are."""
+    stats = breached_passwords.stats()
+    if not stats['enabled']:
+        click.echo("Breached password check is disabled (BREACHED_PASSWORDS_FILE unset or unreadable).")
+        return
+    click.echo(f"Hash file: {breached_passwords.path} ({stats['records']} hashes, "
+               f"{stats['hash_file_bytes'] // 1024} KiB)")
+    if stats['bloom_file_bytes']:
+        click.echo(f"Bloom filter: {breached_passwords.bloom_path} ({stats['bloom_file_bytes'] // 1024} KiB)")
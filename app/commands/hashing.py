@@ -0,0 +1,109 @@
+import os
+import re
+import statistics
+import time
+
+import click
+from argon2 import PasswordHasher
+from flask import current_app
+from flask.cli import with_appcontext
+
+# Memory costs tried by calibrate-hash, in KiB (19 MiB is the OWASP minimum)
+MEMORY_STEPS = [19456, 32768, 65536, 131072, 262144, 524288, 1048576]
+
+
+def measure_hash_ms(time_cost, memory_cost, parallelism, repeat=3):
+    """Median wall time of one Argon2 hash with the given parameters."""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hasher.hash('calibration-password')
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def write_env_settings(path, settings):
+    """Set ``KEY=value`` lines in an env file, replacing existing keys and appending new ones."""
+    lines = []
+    if os.path.exists(path):
+        with open(path) as env_file:
+            lines = env_file.read().splitlines()
+
+    remaining = dict(settings)
+    for index, line in enumerate(lines):
+        match = re.match(r'\s*#?\s*([A-Z0-9_]+)\s*=', line)
+        if match and match.group(1) in remaining:
+            key = match.group(1)
+            lines[index] = f'{key}={remaining.pop(key)}'
+    if remaining:
+        lines.append('# Argon2 parameters from flask calibrate-hash')
+        lines.extend(f'{key}={value}' for key, value in remaining.items())
+
+    with open(path, 'w') as env_file:
+        env_file.write('\n'.join(lines) + '\n')
+
+
+@click.command('calibrate-hash')
+@click.option('--target-ms', default=250, show_default=True, type=int,
+              help='Latency budget for one password hash on this host.')
+@click.option('--max-memory', default=262144, show_default=True, type=int,
+              help='Largest memory cost to consider, in KiB.')
+@click.option('--parallelism', default=None, type=int,
+              help='Argon2 lanes (default: ARGON2_PARALLELISM).')
+@click.option('--max-time-cost', default=10, show_default=True, type=int)
+@click.option('--env-file', default='.env', show_default=True,
+              help='Env file the recommended ARGON2_* settings are written to.')
+@click.option('--write/--dry-run', default=True, show_default=True,
+              help='Write the recommendation or only print it.')
+@with_appcontext
+def calibrate_hash(target_ms, max_memory, parallelism, max_time_cost, env_file, write):
+    """
+    Benchmark Argon2 cost parameters and recommend the strongest within budget.
+
+    The largest memory cost that hashes within ``--target-ms`` wins, with the
+    most passes that still fit; ``--max-memory`` bounds RAM use while the
+    hashing pool is saturated.
+    """
+    if parallelism is None:
+        parallelism = current_app.config.get('ARGON2_PARALLELISM', 4)
+    workers = current_app.config.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+
+    click.echo(f"Target {target_ms} ms per hash, parallelism {parallelism}")
+    click.echo(f"{'memory KiB':>12} {'time cost':>10} {'median ms':>10}")
+
+    best = None
+    for memory_cost in (m for m in MEMORY_STEPS if m <= max_memory):
+        fitting = None
+        for time_cost in range(1, max_time_cost + 1):
+            elapsed_ms = measure_hash_ms(time_cost, memory_cost, parallelism)
+            click.echo(f"{memory_cost:>12} {time_cost:>10} {elapsed_ms:>10.1f}")
+            if elapsed_ms > target_ms:
+                break
+            fitting = (time_cost, elapsed_ms)
+        if fitting is None:
+            break  # Even one pass over this much memory is over budget
+        # RFC 9106: use as much memory as the budget allows, then as many passes
+        best = (memory_cost,) + fitting
+
+    if best is None:
+        raise click.ClickException(
+            f"No parameters hash within {target_ms} ms; raise --target-ms or lower --max-memory."
+        )
+
+    memory_cost, time_cost, elapsed_ms = best
+    settings = {
+        'ARGON2_TIME_COST': time_cost,
+        'ARGON2_MEMORY_COST': memory_cost,
+        'ARGON2_PARALLELISM': parallelism,
+    }
+    click.echo('')
+    click.echo(f"Recommended: time_cost={time_cost} memory_cost={memory_cost} KiB "
+               f"parallelism={parallelism} (~{elapsed_ms:.0f} ms)")
+    click.echo(f"With PASSWORD_HASH_WORKERS={workers} the pool sustains about "
+               f"{workers * 1000 / elapsed_ms:.0f} hashes/s and needs up to "
+               f"{workers * memory_cost // 1024} MiB while saturated.")
+
+    if write:
+        write_env_settings(env_file, settings)
+        click.echo(f"Wrote {', '.join(settings)} to {env_file}; existing hashes are upgraded on next login.")
@@ -0,0 +1,34 @@
+import click
+from flask.cli import AppGroup
+from app.utils.kv_store import KeyValueServer
+from app.utils.lockout import lockout_engine, minutes_until
+
+lockout_cli = AppGroup('lockout', help='Login lockout maintenance commands.')
+
+
+@lockout_cli.command('kv-server')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=6379, show_default=True, type=int)
+def kv_server(host, port):
+    """Run a local stand-in for the shared lockout key-value store."""
+    server = KeyValueServer(host, port)
+    click.echo(f"Lockout key-value stand-in listening on {host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@lockout_cli.command('status')
+@click.argument('ip_address')
+def status(ip_address):
+    """Show the lockout state of an IP address."""
+    backend = lockout_engine.backend
+    lockout_status = lockout_engine.status(ip_address)
+    click.echo(f"Backend: {backend.name}")
+    if lockout_status.locked:
+        click.echo(f"{ip_address} is locked for {minutes_until(lockout_status.unlock_at)} more minute(s)")
+    else:
+        click.echo(f"{ip_address} is not locked ({lockout_status.remaining_attempts} attempts remaining)")
@@ -0,0 +1,61 @@
+import signal
+import threading
+
+import click
+from flask.cli import AppGroup
+
+from app.utils.maintenance import DELETE_SWEEPS, TASK_NAMES, pending_counts, run_maintenance, run_worker
+
+maintenance_cli = AppGroup('maintenance', help='Batched cleanup of expired tokens and old log rows.')
+
+
+def print_results(results):
+    click.echo(f"{'task':>24} {'rows':>10} {'batches':>8} {'seconds':>8} {'rows/s':>10}")
+    for result in results:
+        note = '' if result.complete else '  (stopped early, rows remain)'
+        click.echo(f"{result.task:>24} {result.rows:>10,} {result.batches:>8} "
+                   f"{result.seconds:>8.2f} {result.rows_per_second:>10,.0f}{note}")
+
+
+@maintenance_cli.command('run')
+@click.option('--task', 'tasks', multiple=True, type=click.Choice(TASK_NAMES),
+              help='Run only this task (repeatable; default: all).')
+@click.option('--batch-size', default=None, type=int, help='Rows per batch (default: MAINTENANCE_BATCH_SIZE).')
+@click.option('--pause', default=None, type=float,
+              help='Seconds between batches (default: MAINTENANCE_BATCH_PAUSE).')
+@click.option('--max-seconds', default=None, type=float, help='Stop after this long; the next run continues.')
+def run(tasks, batch_size, pause, max_seconds):
+    """Deactivate expired reset tokens and delete old rows in committed batches."""
+
+    def progress(task, rows, elapsed):
+        rate = rows / elapsed if elapsed > 0 else 0
+        click.echo(f"  {task}: {rows:,} rows, {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+    results = run_maintenance(tasks=list(tasks) or None, max_seconds=max_seconds, progress=progress,
+                              batch_size=batch_size, pause=pause)
+    print_results(results)
+
+
+@maintenance_cli.command('status')
+def status():
+    """Show how many rows each sweep would delete now."""
+    for name, count in pending_counts().items():
+        click.echo(f"{name:>22}: {count:>10,}  {DELETE_SWEEPS[name][0]}")
+
+
+@maintenance_cli.command('work')
+@click.option('--interval', default=None, type=int,
+              help='Seconds between runs (default: MAINTENANCE_INTERVAL).')
+def work(interval):
+    """Run all maintenance tasks on a schedule until stopped."""
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        click.echo("Stopping after the current batch...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    totals = run_worker(interval=interval, stop_event=stop_event)
+    click.echo(', '.join(f"{name}: {rows:,}" for name, rows in totals.items()))
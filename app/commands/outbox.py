@@ -0,0 +1,77 @@
+import signal
+import threading
+
+import click
+from flask.cli import AppGroup
+
+from app.models.email_outbox import EmailOutbox
+from app.utils.email_outbox import run_worker
+from app.utils.smtp_sink import SMTPSink
+
+outbox_cli = AppGroup('outbox', help='Transactional email outbox commands.')
+
+
+@outbox_cli.command('work')
+@click.option('--once', is_flag=True, help='Deliver one batch and exit (e.g. from cron).')
+@click.option('--poll-interval', default=None, type=float,
+              help='Seconds between scans when idle (default: EMAIL_OUTBOX_POLL_INTERVAL).')
+def work(once, poll_interval):
+    """Deliver queued emails with retries, backoff and dead-lettering."""
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        click.echo("Stopping after the current batch...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    totals = run_worker(poll_interval=poll_interval, once=once, stop_event=stop_event)
+    click.echo(f"Sent {totals['sent']}, retrying {totals['retried']}, dead-lettered {totals['dead']}.")
+
+
+@outbox_cli.command('status')
+def status():
+    """Show message counts per status and the oldest pending message."""
+    counts = EmailOutbox.status_counts()
+    for state in ('pending', 'sending', 'sent', 'dead'):
+        click.echo(f"{state:>8}: {counts.get(state, 0)}")
+    oldest = EmailOutbox.query.filter_by(status='pending').order_by(EmailOutbox.created_at).first()
+    if oldest is not None:
+        click.echo(f"Oldest pending message queued at {oldest.created_at:%Y-%m-%d %H:%M:%S} UTC "
+                   f"({oldest.attempts} attempts, last error: {oldest.last_error or 'none'})")
+
+
+@outbox_cli.command('retry-dead')
+@click.option('--id', 'entry_id', default=None, type=int, help='Requeue only this message.')
+def retry_dead(entry_id):
+    """Move dead-lettered messages back to the queue."""
+    click.echo(f"Requeued {EmailOutbox.requeue_dead(entry_id)} messages.")
+
+
+@outbox_cli.command('purge')
+@click.option('--days', default=7, show_default=True, type=int)
+def purge(days):
+    """Delete delivered messages older than DAYS."""
+    click.echo(f"Deleted {EmailOutbox.purge_sent(days)} sent messages.")
+
+
+@outbox_cli.command('smtp-sink')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=1025, show_default=True, type=int)
+@click.option('--delay', default=0.0, show_default=True, type=float,
+              help='Seconds to stall on every message (simulate a slow server).')
+@click.option('--fail-rate', default=0.0, show_default=True, type=float,
+              help='Share of messages answered with a 451 temporary failure.')
+@click.option('--maildir', default=None, help='Also write each message to this directory as .eml.')
+def smtp_sink(host, port, delay, fail_rate, maildir):
+    """Run a local SMTP server that accepts and prints mail (MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=false)."""
+    sink = SMTPSink(host, port, delay=delay, fail_rate=fail_rate, maildir=maildir)
+    sink.on_message = lambda message: click.echo(
+        f"Received mail from {message.sender} to {', '.join(message.recipients)} ({len(message.data)} bytes)"
+    )
+    click.echo(f"SMTP sink listening on {host}:{port}")
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from app.models.login_rollup import LoginRollup
+
+rollups_cli = AppGroup('rollups', help='Login activity rollup maintenance commands.')
+
+
+@rollups_cli.command('rebuild')
+@click.option('--days', type=int, default=None,
+              help='Only rebuild the last N days (default: all history); days whose raw '
+                   'attempts were pruned keep their rollups.')
+@click.option('--include-today', is_flag=True,
+              help='Also rebuild the current day; only safe while no logins are being recorded.')
+def rebuild(days, include_today):
+    """Backfill hourly and daily login rollups from login_attempts (up to the start of today)."""
+    since = datetime.utcnow() - timedelta(days=days) if days else None
+    until = datetime.utcnow() + timedelta(days=1) if include_today else None
+
+    def report(day_start, attempts):
+        if attempts:
+            click.echo(f"{day_start:%Y-%m-%d}: {attempts} attempts")
+
+    total = LoginRollup.rebuild(since=since, until=until, progress=report)
+    click.echo(f"Rebuilt rollups from {total} login attempts.")
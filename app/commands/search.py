@@ -0,0 +1,18 @@
+import click
+from flask.cli import AppGroup
+from app.utils.user_search import drop_search_index, rebuild_search_index
+
+search_cli = AppGroup('search', help='Admin user search index commands.')
+
+
+@search_cli.command('rebuild')
+@click.option('--drop', is_flag=True, help='Drop the index and its triggers before rebuilding.')
+def rebuild(drop):
+    """Rebuild the users_fts search index from the users table."""
+    if drop:
+        drop_search_index()
+    indexed = rebuild_search_index()
+    if indexed < 0:
+        click.echo("FTS5 search is not available on this database; admin search uses prefix scans.")
+    else:
+        click.echo(f"Indexed {indexed} users.")
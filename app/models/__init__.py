@@ -1,6 +1,8 @@
 from .user import User, PasswordResetToken
 from .contact import Contact
 from .login_attempt import LoginAttempt
+from .login_rollup import LoginRollup, LoginRollupIP
 from .email_verification import EmailVerification
+from .email_outbox import EmailOutbox
 
-__all__ = ['User', 'PasswordResetToken', 'Contact', 'LoginAttempt', 'EmailVerification']
+__all__ = ['User', 'PasswordResetToken', 'Contact', 'LoginAttempt', 'LoginRollup', 'LoginRollupIP', 'EmailVerification', 'EmailOutbox']
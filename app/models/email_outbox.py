@@ -0,0 +1,148 @@
+from app import db
+from datetime import datetime, timedelta
+import json
+from email.utils import formataddr
+from flask_mail import Message
+from sqlalchemy import Index
+
+# Outbox row states
+OUTBOX_PENDING = 'pending'
+OUTBOX_SENDING = 'sending'
+OUTBOX_SENT = 'sent'
+OUTBOX_DEAD = 'dead'
+
+
+class EmailOutbox(db.Model):
+    """
+    Outgoing email waiting for the delivery worker.
+
+    Rows are added in the same transaction as the record that triggered the
+    email, so a message is queued exactly when that record is committed, and
+    ``flask outbox work`` sends them outside the request.
+    """
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(120), nullable=True)
+    recipients = db.Column(db.Text, nullable=False)  # JSON list
+    reply_to = db.Column(db.String(120), nullable=True)
+    body = db.Column(db.Text, nullable=True)
+    html = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(16), nullable=False, default=OUTBOX_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # The worker's "what is due" scan
+        Index('idx_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.id} {self.status} {self.subject!r}>'
+
+    @classmethod
+    def enqueue(cls, message):
+        """Queue a Flask-Mail message in the current session (the caller commits)."""
+        sender = formataddr(message.sender) if isinstance(message.sender, tuple) else message.sender
+        entry = cls(
+            subject=message.subject,
+            sender=sender,
+            recipients=json.dumps(list(message.recipients)),
+            reply_to=message.reply_to,
+            body=message.body,
+            html=message.html,
+            status=OUTBOX_PENDING,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+        db.session.add(entry)
+        return entry
+
+    def to_message(self):
+        """Rebuild the Flask-Mail message."""
+        return Message(
+            subject=self.subject,
+            sender=self.sender,
+            recipients=json.loads(self.recipients),
+            reply_to=self.reply_to,
+            body=self.body,
+            html=self.html,
+        )
+
+    @classmethod
+    def claim_due(cls, limit, lease_seconds):
+        """
+        Lease up to ``limit`` due messages to this worker.
+
+        Rows still marked sending after their lease expired (a crashed worker)
+        are due again. Each row is claimed with a conditional UPDATE, so
+        concurrent workers never send the same message twice.
+        """
+        now = datetime.utcnow()
+        candidates = db.session.query(cls.id).filter(
+            ((cls.status == OUTBOX_PENDING) & (cls.next_attempt_at <= now)) |
+            ((cls.status == OUTBOX_SENDING) & (cls.locked_until <= now))
+        ).order_by(cls.next_attempt_at, cls.id).limit(limit).all()
+
+        claimed = []
+        locked_until = now + timedelta(seconds=lease_seconds)
+        for (entry_id,) in candidates:
+            updated = db.session.query(cls).filter(
+                cls.id == entry_id,
+                ((cls.status == OUTBOX_PENDING) | ((cls.status == OUTBOX_SENDING) & (cls.locked_until <= now)))
+            ).update({'status': OUTBOX_SENDING, 'locked_until': locked_until}, synchronize_session=False)
+            if updated:
+                claimed.append(entry_id)
+        db.session.commit()
+        return cls.query.filter(cls.id.in_(claimed)).order_by(cls.id).all() if claimed else []
+
+    def mark_sent(self):
+        self.status = OUTBOX_SENT
+        self.attempts += 1
+        self.sent_at = datetime.utcnow()
+        self.locked_until = None
+        self.last_error = None
+
+    def mark_failed(self, error, retry_in=None):
+        """Record a failed attempt; schedule a retry in ``retry_in`` seconds or dead-letter it."""
+        self.attempts += 1
+        self.last_error = str(error)[:2000]
+        self.locked_until = None
+        if retry_in is None:
+            self.status = OUTBOX_DEAD
+        else:
+            self.status = OUTBOX_PENDING
+            self.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_in)
+
+    @classmethod
+    def requeue_dead(cls, entry_id=None):
+        """Move dead-lettered messages back to pending; returns how many."""
+        query = cls.query.filter_by(status=OUTBOX_DEAD)
+        if entry_id is not None:
+            query = query.filter_by(id=entry_id)
+        count = query.update({
+            'status': OUTBOX_PENDING,
+            'attempts': 0,
+            'next_attempt_at': datetime.utcnow(),
+        }, synchronize_session=False)
+        db.session.commit()
+        return count
+
+    @classmethod
+    def status_counts(cls):
+        """Number of messages per status."""
+        rows = db.session.query(cls.status, db.func.count(cls.id)).group_by(cls.status).all()
+        return {status: count for status, count in rows}
+
+    @classmethod
+    def purge_sent(cls, older_than_days=7, **kwargs):
+        """Delete delivered messages older than ``older_than_days`` in committed batches."""
+        from app.utils.maintenance import chunked_delete
+
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        return chunked_delete(cls, [cls.status == OUTBOX_SENT, cls.sent_at < cutoff], **kwargs).rows
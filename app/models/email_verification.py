@@ -1,3 +1,4 @@
+from flask import current_app
 from app import db
 from datetime import datetime, timedelta
 import secrets
@@ -20,6 +21,7 @@ class EmailVerification(db.Model):
         Index('idx_token', 'token'),
         Index('idx_user_email', 'user_id', 'email'),
         Index('idx_expires_at', 'expires_at'),
+        Index('idx_email_verification_created_at', 'created_at'),
     )
     
     # Relationship
@@ -30,7 +32,8 @@ class EmailVerification(db.Model):
         self.user_id = user_id
         self.email = email
         self.token = secrets.token_urlsafe(32)
-        self.expires_at = datetime.utcnow() + timedelta(hours=24)  # 24 hour expiration
+        max_age = current_app.config.get('EMAIL_VERIFICATION_TOKEN_MAX_AGE', 86400)  # 24 hours by default
+        self.expires_at = datetime.utcnow() + timedelta(seconds=max_age)
     
     def __repr__(self):
         return f'<EmailVerification {self.email} for user {self.user_id}>'
@@ -40,14 +43,16 @@ class EmailVerification(db.Model):
         return datetime.utcnow() > self.expires_at
     
     def verify(self):
-        """Mark this email as verified."""
+        """Mark this email as verified and record it on the user if it is still their address."""
         self.is_verified = True
         self.verified_at = datetime.utcnow()
+        if self.user and self.user.email == self.email:
+            self.user.mark_email_verified(self.email, self.verified_at)
         db.session.commit()
     
     @classmethod
-    def create_verification(cls, user_id, email):
-        """Create a new email verification entry."""
+    def create_verification(cls, user_id, email, commit=True):
+        """Create a new email verification entry (pass commit=False to commit it with other changes)."""
         # Remove any existing unverified tokens for this user/email combo
         existing = cls.query.filter_by(
             user_id=user_id, 
@@ -57,7 +62,8 @@ class EmailVerification(db.Model):
         
         verification = cls(user_id=user_id, email=email)
         db.session.add(verification)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return verification
     
     @classmethod
@@ -76,12 +82,12 @@ class EmailVerification(db.Model):
         return verification is not None
     
     @classmethod
-    def cleanup_expired_tokens(cls, days_old=7):
-        """Clean up expired verification tokens."""
+    def cleanup_expired_tokens(cls, days_old=7, **kwargs):
+        """Clean up expired verification tokens in committed batches (kwargs go to chunked_delete)."""
+        from app.utils.maintenance import chunked_delete
+
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-        expired_tokens = cls.query.filter(
+        return chunked_delete(cls, [
             cls.expires_at < cutoff_date,
             cls.is_verified == False
-        ).delete()
-        db.session.commit()
-        return expired_tokens
+        ], **kwargs).rows
@@ -2,6 +2,7 @@ from app import db
 from datetime import datetime, timedelta
 from sqlalchemy import Index
 from flask import current_app
+from app.models.login_rollup import LoginRollup
 
 class LoginAttempt(db.Model):
     __tablename__ = 'login_attempts'
@@ -17,11 +18,18 @@ class LoginAttempt(db.Model):
     __table_args__ = (
         Index('idx_ip_attempted_at', 'ip_address', 'attempted_at'),
         Index('idx_ip_success', 'ip_address', 'success'),
+        Index('idx_attempted_at', 'attempted_at'),
+        Index('idx_username_or_email_attempted_at', 'username_or_email', 'attempted_at'),
     )
     
     def __repr__(self):
         return f'<LoginAttempt {self.ip_address} at {self.attempted_at}>'
     
+    @classmethod
+    def for_user(cls, user):
+        """Query attempts made with a user's username or email (indexed lookup)."""
+        return cls.query.filter(cls.username_or_email.in_({user.username, user.email}))
+    
     @classmethod
     def get_failed_attempts_count(cls, ip_address, time_window_minutes=None):
         """Get count of failed login attempts for an IP within time window."""
@@ -64,21 +72,24 @@ class LoginAttempt(db.Model):
     
     @classmethod
     def record_attempt(cls, ip_address, username_or_email=None, success=False, user_agent=None):
-        """Record a login attempt."""
+        """Record a login attempt and update the activity rollups in the same transaction."""
         attempt = cls(
             ip_address=ip_address,
             username_or_email=username_or_email,
             success=success,
+            attempted_at=datetime.utcnow(),
             user_agent=user_agent
         )
         db.session.add(attempt)
+        if current_app.config.get('LOGIN_ROLLUPS_ENABLED', True):
+            LoginRollup.record(ip_address, success, attempt.attempted_at)
         db.session.commit()
         return attempt
     
     @classmethod
-    def cleanup_old_attempts(cls, days_old=30):
-        """Clean up old login attempts (for maintenance)."""
+    def cleanup_old_attempts(cls, days_old=30, **kwargs):
+        """Clean up old login attempts in committed batches (kwargs go to chunked_delete)."""
+        from app.utils.maintenance import chunked_delete
+
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-        old_attempts = cls.query.filter(cls.attempted_at < cutoff_date).delete()
-        db.session.commit()
-        return old_attempts
+        return chunked_delete(cls, [cls.attempted_at < cutoff_date], **kwargs).rows
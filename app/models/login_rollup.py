@@ -0,0 +1,210 @@
+from app import db
+from datetime import datetime, timedelta
+from sqlalchemy import Index, UniqueConstraint, func
+from app.utils.time_buckets import bucket_label, floor_to_bucket, parse_bucket_label
+
+# Resolutions maintained by the rollup tables
+ROLLUP_RESOLUTIONS = ('hour', 'day')
+
+
+def _upsert_increment(model, key_columns, values, amount=1):
+    """Insert a counter row or add ``amount`` to it if the key already exists."""
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    stmt = insert(model).values(attempts=amount, **values)
+    incremented = {'attempts': model.__table__.c.attempts + amount}
+    if dialect_name in ('mysql', 'mariadb'):
+        stmt = stmt.on_duplicate_key_update(**incremented)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_=incremented)
+    db.session.execute(stmt)
+
+
+class LoginRollup(db.Model):
+    """Login attempt counts per time bucket and success flag."""
+    __tablename__ = 'login_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    resolution = db.Column(db.String(8), nullable=False)  # 'hour' or 'day'
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    success = db.Column(db.Boolean, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('resolution', 'bucket_start', 'success', name='uq_login_rollup_bucket'),
+    )
+
+    KEY_COLUMNS = ['resolution', 'bucket_start', 'success']
+
+    def __repr__(self):
+        return f'<LoginRollup {self.resolution} {self.bucket_start} success={self.success}: {self.attempts}>'
+
+    @classmethod
+    def record(cls, ip_address, success, attempted_at):
+        """Add one attempt to every rollup bucket it falls into (caller commits)."""
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket_start = floor_to_bucket(attempted_at, resolution)
+            _upsert_increment(cls, cls.KEY_COLUMNS, {
+                'resolution': resolution,
+                'bucket_start': bucket_start,
+                'success': success,
+            })
+            _upsert_increment(LoginRollupIP, LoginRollupIP.KEY_COLUMNS, {
+                'resolution': resolution,
+                'bucket_start': bucket_start,
+                'ip_address': ip_address,
+                'success': success,
+            })
+
+    @classmethod
+    def get_counts(cls, resolution, since, session=None):
+        """
+        Get total and failed attempts per bucket starting at or after ``since``.
+
+        Returns:
+            Dictionary of bucket_start -> (total_attempts, failed_attempts)
+        """
+        session = session or db.session
+        rows = session.query(cls.bucket_start, cls.success, cls.attempts).filter(
+            cls.resolution == resolution,
+            cls.bucket_start >= since
+        )
+        counts = {}
+        for bucket_start, success, attempts in rows:
+            total_attempts, failed_attempts = counts.get(bucket_start, (0, 0))
+            total_attempts += attempts
+            if not success:
+                failed_attempts += attempts
+            counts[bucket_start] = (total_attempts, failed_attempts)
+        return counts
+
+    @classmethod
+    def rebuild(cls, since=None, until=None, progress=None, session=None):
+        """
+        Recompute rollups from raw login_attempts one day at a time.
+
+        Rollups outlive the raw rows that maintenance prunes or archives, so
+        only days that still have raw attempts are touched: ``since`` is
+        clamped to the oldest attempt, a day without attempts keeps its
+        rollups, and the oldest day (whose earlier rows may already be gone)
+        is only filled in when it has no rollups yet. A rebuilt day's rows
+        are deleted and re-inserted in one transaction.
+
+        By default the current day is left alone: live ``record`` increments
+        land in its buckets, and one committed between the delete and the
+        aggregate would be lost or counted twice.
+
+        Args:
+            since: Only rebuild buckets from this time on (defaults to, and never
+                earlier than, the oldest attempt)
+            until: Rebuild days starting before this time (defaults to the start of
+                the current day; pass a later time only while nothing records attempts)
+            progress: Optional callback receiving (day_start, attempts_in_day)
+            session: SQLAlchemy session to run on (defaults to ``db.session``)
+
+        Returns:
+            Number of raw attempts aggregated
+        """
+        from app.models.login_attempt import LoginAttempt
+
+        session = session or db.session
+        oldest = session.query(func.min(LoginAttempt.attempted_at)).scalar()
+        if oldest is None:
+            return 0
+        since = max(since, oldest) if since else oldest
+        day_start = floor_to_bucket(since, 'day')
+        oldest_day = floor_to_bucket(oldest, 'day')
+        end = until or floor_to_bucket(datetime.utcnow(), 'day')
+        dialect_name = session.get_bind().dialect.name
+        hour_label = bucket_label(LoginAttempt.attempted_at, 'hour', dialect_name)
+
+        total = 0
+        while day_start < end:
+            day_end = day_start + timedelta(days=1)
+            in_day = (LoginAttempt.attempted_at >= day_start, LoginAttempt.attempted_at < day_end)
+            existing = [session.query(model).filter(
+                model.bucket_start >= day_start,
+                model.bucket_start < day_end
+            ) for model in (cls, LoginRollupIP)]
+
+            ip_rows = session.query(
+                hour_label, LoginAttempt.ip_address, LoginAttempt.success, func.count(LoginAttempt.id)
+            ).filter(*in_day).group_by(hour_label, LoginAttempt.ip_address, LoginAttempt.success).all()
+            if not ip_rows or (day_start == oldest_day and existing[0].first() is not None):
+                ip_rows = []  # Pruned history: keep the day's rollups as they are
+            else:
+                for rollup_rows in existing:
+                    rollup_rows.delete(synchronize_session=False)
+
+            bucket_counts, ip_counts = {}, {}
+            for label, ip_address, success, attempts in ip_rows:
+                hour_start = parse_bucket_label(label, 'hour')
+                for resolution, bucket_start in (('hour', hour_start), ('day', day_start)):
+                    key = (resolution, bucket_start, success)
+                    bucket_counts[key] = bucket_counts.get(key, 0) + attempts
+                    ip_key = (resolution, bucket_start, ip_address, success)
+                    ip_counts[ip_key] = ip_counts.get(ip_key, 0) + attempts
+
+            if bucket_counts:
+                session.execute(cls.__table__.insert(), [
+                    {'resolution': r, 'bucket_start': b, 'success': s, 'attempts': n}
+                    for (r, b, s), n in bucket_counts.items()
+                ])
+                session.execute(LoginRollupIP.__table__.insert(), [
+                    {'resolution': r, 'bucket_start': b, 'ip_address': ip, 'success': s, 'attempts': n}
+                    for (r, b, ip, s), n in ip_counts.items()
+                ])
+            session.commit()
+
+            attempts_in_day = sum(n for (r, _, _), n in bucket_counts.items() if r == 'day')
+            total += attempts_in_day
+            if progress:
+                progress(day_start, attempts_in_day)
+            day_start = day_end
+        return total
+
+
+class LoginRollupIP(db.Model):
+    """Login attempt counts per time bucket, IP address and success flag."""
+    __tablename__ = 'login_rollup_ips'
+
+    id = db.Column(db.Integer, primary_key=True)
+    resolution = db.Column(db.String(8), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    ip_address = db.Column(db.String(45), nullable=False)
+    success = db.Column(db.Boolean, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('resolution', 'bucket_start', 'ip_address', 'success', name='uq_login_rollup_ip_bucket'),
+        Index('idx_rollup_ip_bucket_attempts', 'resolution', 'bucket_start', 'attempts'),
+    )
+
+    KEY_COLUMNS = ['resolution', 'bucket_start', 'ip_address', 'success']
+
+    def __repr__(self):
+        return f'<LoginRollupIP {self.resolution} {self.bucket_start} {self.ip_address}: {self.attempts}>'
+
+    @classmethod
+    def top_ips(cls, since, resolution='hour', limit=10, failed_only=True):
+        """
+        Get the IP addresses with the most attempts in buckets starting at or after ``since``.
+
+        Returns:
+            List of (ip_address, attempts) tuples, highest first
+        """
+        total = func.sum(cls.attempts).label('total')
+        query = db.session.query(cls.ip_address, total).filter(
+            cls.resolution == resolution,
+            cls.bucket_start >= since
+        )
+        if failed_only:
+            query = query.filter(cls.success == False)
+        return [(ip, int(attempts)) for ip, attempts in
+                query.group_by(cls.ip_address).order_by(total.desc()).limit(limit)]
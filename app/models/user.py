@@ -1,11 +1,9 @@
 from app import db
 from datetime import datetime
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError, HashingError
+from argon2.exceptions import HashingError
 import secrets
 from flask_login import UserMixin
-
-ph = PasswordHasher()
+from app.utils.password_hashing import HashingOverloaded, hashing_service
 
 
 class User(UserMixin, db.Model):
@@ -16,9 +14,18 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     active = db.Column(db.Boolean, default=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     last_login = db.Column(db.DateTime)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
+    # Denormalized from email_verifications so login needs no extra lookup
+    verified_email = db.Column(db.String(120), nullable=True)
+    email_verified_at = db.Column(db.DateTime, nullable=True)
+
+    # Case-insensitive prefix search in the admin panel (app/utils/user_search.py)
+    __table_args__ = (
+        db.Index('idx_users_username_lower', db.func.lower(username)),
+        db.Index('idx_users_email_lower', db.func.lower(email)),
+    )
 
     # Relationship with password reset tokens
     password_reset_tokens = db.relationship(
@@ -29,35 +36,80 @@ class User(UserMixin, db.Model):
     )
 
     def set_password(self, password):
-        """Hash and set password using Argon2."""
+        """Hash and set password using Argon2 on the bounded hashing pool."""
         try:
-            self.password_hash = ph.hash(password)
+            self.password_hash = hashing_service.hash(password)
         except HashingError:
             raise ValueError("Error hashing password")
 
     def check_password(self, password):
-        """Verify password against stored hash."""
-        try:
-            ph.verify(self.password_hash, password)
-            return True
-        except VerifyMismatchError:
+        """
+        Verify password against stored hash on the bounded hashing pool.
+
+        On success a hash made with outdated Argon2 parameters is replaced by
+        one using the current settings; the caller's next commit stores it.
+        """
+        if not hashing_service.verify(self.password_hash, password):
             return False
+        if hashing_service.needs_rehash(self.password_hash):
+            try:
+                self.password_hash = hashing_service.hash(password)
+            except (HashingError, HashingOverloaded):
+                pass  # Keep the old hash; the next login retries the upgrade
+        return True
+
+    @property
+    def email_verified(self):
+        """Whether the current email address has been verified."""
+        return self.email_verified_at is not None and self.verified_email == self.email
+
+    def mark_email_verified(self, email, verified_at=None):
+        """Record ``email`` as the user's verified address (caller commits)."""
+        self.verified_email = email
+        self.email_verified_at = verified_at or datetime.utcnow()
+
+    def refresh_email_verification(self):
+        """Re-derive the verified state from verification history after an email change."""
+        if self.email_verified:
+            return
+        from app.models.email_verification import EmailVerification
+
+        latest = (
+            EmailVerification.query.filter_by(
+                user_id=self.id, email=self.email, is_verified=True
+            )
+            .order_by(EmailVerification.verified_at.desc())
+            .first()
+        )
+        if latest:
+            self.mark_email_verified(self.email, latest.verified_at)
 
     def update_last_login(self):
         """Update last login timestamp."""
         self.last_login = datetime.utcnow()
         db.session.commit()
 
-    def generate_reset_token(self):
-        """Generate a password reset token."""
-        # Deactivate any existing tokens
-        for token in self.password_reset_tokens:
-            token.is_active = False
+    def generate_reset_token(self, commit=True):
+        """
+        Generate a password reset token (pass commit=False to commit it with other changes).
+
+        With SIGNED_TOKENS_ENABLED the token is signed and nothing is written.
+        """
+        from app.utils.signed_tokens import generate_reset_token, signed_tokens_enabled
+
+        if signed_tokens_enabled():
+            return generate_reset_token(self)
+
+        # Deactivate any existing tokens in one statement instead of loading them
+        PasswordResetToken.query.filter_by(user_id=self.id, is_active=True).update(
+            {"is_active": False}, synchronize_session=False
+        )
 
         # Create new token
         reset_token = PasswordResetToken(user_id=self.id)
         db.session.add(reset_token)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return reset_token.token
 
     def get_id(self):
@@ -95,10 +147,12 @@ class PasswordResetToken(db.Model):
         self.user_id = user_id
         self.token = secrets.token_urlsafe(32)
         self.created_at = datetime.utcnow()
-        # Token expires in 1 hour
+        # Token expires in PASSWORD_RESET_TOKEN_MAX_AGE seconds (1 hour by default)
         from datetime import timedelta
+        from flask import current_app
 
-        self.expires_at = self.created_at + timedelta(hours=1)
+        max_age = current_app.config.get("PASSWORD_RESET_TOKEN_MAX_AGE", 3600)
+        self.expires_at = self.created_at + timedelta(seconds=max_age)
 
     def is_valid(self):
         """Check if token is valid (active and not expired)."""
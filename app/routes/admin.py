@@ -8,13 +8,25 @@ from flask import (
     session,
     current_app,
     jsonify,
+    abort,
 )
 from flask_login import current_user, login_required
 from app import db
 from app.models.user import User
 from app.models.login_attempt import LoginAttempt
+from app.models.login_rollup import LoginRollupIP
 from app.models.email_verification import EmailVerification
-from app.models.contact import Contact
+from app.utils.db_routing import stick_to_primary, use_replica
+from app.utils.admin_stats import (
+    get_dashboard_stats,
+    get_login_activity,
+    parse_time_range,
+)
+from app.utils.pagination import get_pagination_mode, keyset_paginate
+from app.utils.email_rendering import SAMPLE_CONTEXTS, email_renderer
+from app.utils.maintenance import run_maintenance
+from app.utils.password_hashing import hashing_service
+from app.utils.user_search import search_users
 from datetime import datetime, timedelta
 from sqlalchemy import desc, func
 from functools import wraps
@@ -41,7 +53,14 @@ def admin_required(f):
             flash("Access denied. Admin privileges required.", "error")
             return redirect(url_for("main.home"))
 
-        return f(*args, **kwargs)
+        # Read views query the replica; after a change, this admin reads from
+        # the primary for a while so the result page shows it
+        if request.method in ("GET", "HEAD"):
+            use_replica()
+            return f(*args, **kwargs)
+        response = f(*args, **kwargs)
+        stick_to_primary()
+        return response
 
     return decorated_function
 
@@ -50,33 +69,8 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """Admin dashboard with overview statistics."""
-    # Get statistics
-    total_users = User.query.count()
-    active_users = User.query.filter_by(active=True).count()  # Changed from is_active
-    inactive_users = total_users - active_users
-
-    # Recent user registrations (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_registrations = User.query.filter(User.created_at >= thirty_days_ago).count()
-
-    # Login attempts statistics (last 24 hours)
-    twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-    recent_login_attempts = LoginAttempt.query.filter(
-        LoginAttempt.attempted_at >= twenty_four_hours_ago
-    ).count()
-    failed_login_attempts = LoginAttempt.query.filter(
-        LoginAttempt.attempted_at >= twenty_four_hours_ago,
-        LoginAttempt.success == False,
-    ).count()
-
-    # Email verification statistics
-    verified_emails = EmailVerification.query.filter_by(is_verified=True).count()
-    pending_verifications = EmailVerification.query.filter_by(is_verified=False).count()
-
-    # Contact form submissions (last 30 days)
-    recent_contacts = Contact.query.filter(
-        Contact.created_at >= thirty_days_ago
-    ).count()
+    # Get statistics in a single aggregate query
+    stats = get_dashboard_stats()
 
     # Recent activities
     recent_users = User.query.order_by(desc(User.created_at)).limit(5).all()
@@ -84,18 +78,6 @@ def dashboard():
         LoginAttempt.query.order_by(desc(LoginAttempt.attempted_at)).limit(10).all()
     )
 
-    stats = {
-        "total_users": total_users,
-        "active_users": active_users,
-        "inactive_users": inactive_users,
-        "recent_registrations": recent_registrations,
-        "recent_login_attempts": recent_login_attempts,
-        "failed_login_attempts": failed_login_attempts,
-        "verified_emails": verified_emails,
-        "pending_verifications": pending_verifications,
-        "recent_contacts": recent_contacts,
-    }
-
     return render_template(
         "admin/dashboard.html",
         stats=stats,
@@ -115,12 +97,10 @@ def users():
     if per_page not in [25, 50, 100]:
         per_page = 25
 
-    # Search functionality
-    search = request.args.get("search", "")
+    # Search functionality (indexed, ranked by relevance)
+    search = request.args.get("search", "").strip()
     if search:
-        users_query = User.query.filter(
-            (User.username.contains(search)) | (User.email.contains(search))
-        )
+        users_query = search_users(User.query, search)
     else:
         users_query = User.query
 
@@ -133,9 +113,22 @@ def users():
     elif status_filter == "admin":
         users_query = users_query.filter_by(is_admin=True)
 
-    users_pagination = users_query.order_by(desc(User.created_at)).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    # Search results keep their relevance order on numbered pages
+    if get_pagination_mode() == "cursor" and not search:
+        users_pagination = keyset_paginate(
+            users_query,
+            User.created_at,
+            User.id,
+            per_page,
+            cursor=request.args.get("cursor"),
+            estimate_total=status_filter == "all",
+        )
+    else:
+        if not search:
+            users_query = users_query.order_by(desc(User.created_at))
+        users_pagination = users_query.paginate(
+            page=page, per_page=per_page, error_out=False
+        )
 
     return render_template(
         "admin/users.html",
@@ -152,38 +145,53 @@ def user_detail(user_id):
     """View detailed information about a specific user."""
     user = User.query.get_or_404(user_id)
 
-    # Get user's login attempts
-    login_attempts = (
-        LoginAttempt.query.filter_by(username_or_email=user.username)
-        .order_by(desc(LoginAttempt.attempted_at))
-        .limit(20)
-        .all()
-    )
+    # Activity tabs are fetched as fragments by user_login_attempts and
+    # user_email_verifications when opened
+    return render_template("admin/user-detail.html", user=user)
 
-    # Also check by email
-    email_attempts = (
-        LoginAttempt.query.filter_by(username_or_email=user.email)
-        .order_by(desc(LoginAttempt.attempted_at))
-        .limit(20)
-        .all()
-    )
 
-    # Combine and deduplicate
-    all_attempts = list(set(login_attempts + email_attempts))
-    all_attempts.sort(key=lambda x: x.attempted_at, reverse=True)
+def _activity_page_size():
+    per_page = request.args.get("per_page", 20, type=int)
+    return per_page if per_page in [10, 20, 50] else 20
 
-    # Get user's email verifications
-    verifications = (
-        EmailVerification.query.filter_by(user_id=user.id)
-        .order_by(desc(EmailVerification.created_at))
-        .all()
+
+@admin_bp.route("/user/<int:user_id>/login-attempts")
+@admin_required
+def user_login_attempts(user_id):
+    """Login attempts tab fragment, newest first, one page per cursor."""
+    user = User.query.get_or_404(user_id)
+    pagination = keyset_paginate(
+        LoginAttempt.for_user(user),
+        LoginAttempt.attempted_at,
+        LoginAttempt.id,
+        _activity_page_size(),
+        cursor=request.args.get("cursor"),
+    )
+    return render_template(
+        "partials/admin/user-details/login-attempts-list.html",
+        user=user,
+        login_attempts=pagination.items,
+        pagination=pagination,
     )
 
+
+@admin_bp.route("/user/<int:user_id>/email-verifications")
+@admin_required
+def user_email_verifications(user_id):
+    """Email verifications tab fragment, newest first, one page per cursor."""
+    user = User.query.get_or_404(user_id)
+    pagination = keyset_paginate(
+        EmailVerification.query.filter_by(user_id=user.id),
+        EmailVerification.created_at,
+        EmailVerification.id,
+        _activity_page_size(),
+        cursor=request.args.get("cursor"),
+    )
     return render_template(
-        "admin/user-detail.html",
+        "partials/admin/user-details/email-verifications-list.html",
         user=user,
-        login_attempts=all_attempts[:20],
-        verifications=verifications,
+        verifications=pagination.items,
+        pagination=pagination,
     )
 
 
@@ -230,64 +238,98 @@ def toggle_admin_status(user_id):
 @admin_bp.route("/api/stats")
 @admin_required
 def api_stats():
-    """API endpoint for dashboard statistics."""
-    # Login attempts over time (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    daily_stats = []
-
-    for i in range(7):
-        day = seven_days_ago + timedelta(days=i)
-        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-
-        total_attempts = LoginAttempt.query.filter(
-            LoginAttempt.attempted_at >= day_start, LoginAttempt.attempted_at < day_end
-        ).count()
-
-        failed_attempts = LoginAttempt.query.filter(
-            LoginAttempt.attempted_at >= day_start,
-            LoginAttempt.attempted_at < day_end,
-            LoginAttempt.success == False,
-        ).count()
-
-        daily_stats.append(
-            {
-                "date": day.strftime("%Y-%m-%d"),
-                "total_attempts": total_attempts,
-                "failed_attempts": failed_attempts,
-                "success_attempts": total_attempts - failed_attempts,
-            }
-        )
+    """API endpoint for login activity over a selectable range and bucket size."""
+    bucket = request.args.get("bucket", "day")
+    try:
+        time_range = parse_time_range(request.args.get("range", "7d"))
+        activity = get_login_activity(time_range, bucket)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    return jsonify(daily_stats)
+    return jsonify(activity)
 
 
-@admin_bp.route("/cleanup", methods=["POST"])
+@admin_bp.route("/api/stats/top-ips")
 @admin_required
-def cleanup_logs():
-    """Clean up old logs and expired tokens."""
+def api_top_ips():
+    """API endpoint for the IP addresses with the most failed attempts."""
     try:
-        # Clean up old login attempts (older than 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        old_attempts = LoginAttempt.query.filter(
-            LoginAttempt.attempted_at < thirty_days_ago
-        ).delete()
+        time_range = parse_time_range(request.args.get("range", "24h"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+
+    resolution = "hour" if time_range <= timedelta(days=7) else "day"
+    since = datetime.utcnow() - time_range
+    top_ips = LoginRollupIP.top_ips(since, resolution=resolution, limit=limit)
+
+    return jsonify(
+        [{"ip_address": ip, "failed_attempts": attempts} for ip, attempts in top_ips]
+    )
+
+
+@admin_bp.route("/api/hashing/metrics")
+@admin_required
+def api_hashing_metrics():
+    """API endpoint for password hashing pool load, rejections and latency."""
+    return jsonify(hashing_service.metrics())
+
+
+@admin_bp.route("/email-preview")
+@admin_required
+def email_preview():
+    """List the email templates with links to preview each one."""
+    names = email_renderer.template_names()
+    selected = request.args.get("template")
+    if selected not in names:
+        selected = names[0] if names else None
+    return render_template(
+        "admin/email-preview.html",
+        templates=names,
+        selected=selected,
+        compile_ms=email_renderer.compile_ms,
+    )
+
 
-        # Clean up expired email verification tokens
-        expired_verifications = EmailVerification.cleanup_expired_tokens()
+@admin_bp.route("/email-preview/<name>")
+@admin_required
+def email_preview_render(name):
+    """Render one email with sample data, as HTML or (?format=txt) plain text."""
+    if name not in email_renderer.template_names():
+        abort(404)
+    text, html = email_renderer.render(name, **SAMPLE_CONTEXTS.get(name, {}))
+    if request.args.get("format") == "txt":
+        return text, 200, {"Content-Type": "text/plain; charset=utf-8"}
+    return html
 
-        # Clean up old contact submissions (older than 90 days)
-        ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-        old_contacts = Contact.query.filter(
-            Contact.created_at < ninety_days_ago
-        ).delete()
 
-        db.session.commit()
+@admin_bp.route("/cleanup", methods=["POST"])
+@admin_required
+def cleanup_logs():
+    """
+    Clean up old logs and expired tokens within a short time budget.
+
+    Runs the same batched sweeps as `flask maintenance run`, stopping after
+    MAINTENANCE_REQUEST_BUDGET seconds; large backlogs are left to the CLI
+    or maintenance worker.
+    """
+    try:
+        results = run_maintenance(
+            tasks=["login_attempts", "email_verifications", "contact_submissions"],
+            max_seconds=current_app.config.get("MAINTENANCE_REQUEST_BUDGET", 2),
+            pause=0,
+        )
+        rows = {result.task: result.rows for result in results}
 
         flash(
-            f"Cleanup completed: {old_attempts} login attempts, {expired_verifications} verification tokens, and {old_contacts} contact submissions removed.",
+            f"Cleanup completed: {rows.get('login_attempts', 0)} login attempts, {rows.get('email_verifications', 0)} verification tokens, and {rows.get('contact_submissions', 0)} contact submissions removed.",
             "success",
         )
+        if len(results) < 3 or not all(result.complete for result in results):
+            flash(
+                "More old records remain; run `flask maintenance run` or the maintenance worker to finish.",
+                "info",
+            )
 
     except Exception as e:
         db.session.rollback()
@@ -7,6 +7,7 @@ from flask import (
     flash,
     session,
     current_app,
+    jsonify,
 )
 from flask_login import login_user, logout_user, current_user, login_required
 from app import db
@@ -15,16 +16,16 @@ from app.models.email_verification import EmailVerification
 from app.routes.login_attempts import (
     check_ip_lockout,
     record_login_attempt,
-    get_remaining_attempts,
-    is_lockout_triggered,
+    get_lockout_status,
 )
 from app.routes.email_verification import (
     create_and_send_verification,
     check_email_verification_status,
 )
 from app.utils.hcaptcha_utils import verify_hcaptcha
+from app.utils.password_hashing import HashingOverloaded
 from app.utils.password_validator import PasswordValidator
-from argon2.exceptions import HashingError
+from app.utils.rate_limit import rate_limit
 import re
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
@@ -128,15 +129,15 @@ def login():
             record_login_attempt(username_or_email, success=False)
 
         # Check if this failure causes a lockout
-        if is_lockout_triggered():
+        lockout_status = get_lockout_status()
+        if lockout_status.locked:
             lockout_minutes = current_app.config.get("LOGIN_LOCKOUT_MINUTES", 15)
             return render_template(
                 "auth/login.html", locked_out=True, minutes_remaining=lockout_minutes
             )
         else:
-            attempts_remaining = get_remaining_attempts()
             flash(
-                f"Invalid username/email or password. {attempts_remaining} attempts remaining.",
+                f"Invalid username/email or password. {lockout_status.remaining_attempts} attempts remaining.",
                 "error",
             )
 
@@ -207,10 +208,12 @@ def signup():
             user = User(username=username, email=email)
             user.set_password(password)
             db.session.add(user)
-            db.session.commit()
+            db.session.flush()
 
-            # Create verification and send email
-            verification, email_sent = create_and_send_verification(user)
+            # Create verification and queue its email; commits the user with them
+            token, email_sent = create_and_send_verification(user)
+            if token is None:
+                raise RuntimeError("Could not create email verification")
 
             # Redirect to verification pending page
             if email_sent:
@@ -232,8 +235,9 @@ def signup():
                     )
                 )
 
-        except HashingError:
-            flash("Error creating account. Please try again.", "error")
+        except HashingOverloaded:
+            db.session.rollback()
+            raise  # 503 with Retry-After from the registered handler
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Signup error: {e}")
@@ -242,6 +246,42 @@ def signup():
     return render_template("auth/signup.html")
 
 
+@auth_bp.route("/password-strength", methods=["POST"])
+@rate_limit("PASSWORD_STRENGTH_RATE_LIMIT")
+def password_strength():
+    """Score a candidate password for the sign-up and reset forms."""
+    max_body = current_app.config.get("PASSWORD_STRENGTH_MAX_BODY", 4096)
+    if request.content_length is None:
+        return jsonify({"error": "Content-Length required."}), 411
+    if request.content_length > max_body:
+        return jsonify({"error": "Request body too large."}), 413
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("password", ""), str):
+        return jsonify({"error": "Expected a JSON object with a password."}), 400
+
+    password = data.get("password", "")
+    if len(password) > PasswordValidator.MAX_LENGTH:
+        return jsonify({
+            "error": f"Password must be at most {PasswordValidator.MAX_LENGTH} characters long."
+        }), 413
+
+    user_inputs = data.get("user_inputs")
+    if not isinstance(user_inputs, list):
+        user_inputs = []
+    user_inputs = [value for value in user_inputs[:5] if isinstance(value, str)]
+
+    info = PasswordValidator.get_strength_info(
+        password,
+        user_inputs,
+        budget_ms=current_app.config.get("PASSWORD_STRENGTH_BUDGET_MS", 150),
+    )
+    response = jsonify(info)
+    # Results are cached server-side; the response concerns a secret, so no HTTP caching
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
 @auth_bp.route("/logout")
 @login_required
 def logout():
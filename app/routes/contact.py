@@ -1,8 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
-from flask_mail import Message
-from app import db, mail
+from app import db
 from app.models.contact import Contact
 from app.utils.hcaptcha_utils import verify_hcaptcha
+from app.utils.email_outbox import queue_email
+from app.utils.email_rendering import build_email
 import re
 
 contact_bp = Blueprint('contact', __name__)
@@ -13,73 +14,31 @@ def is_valid_email(email):
     return re.match(pattern, email) is not None
 
 def send_contact_notification(contact_submission):
-    """Send email notification for new contact form submission."""
+    """Queue the admin notification and auto-reply for a contact form submission (the caller commits)."""
     if not current_app.config.get('MAIL_SERVER'):
         current_app.logger.warning("Email server not configured")
         return False
     
     try:
         # Email to admin
-        admin_msg = Message(
+        admin_msg = build_email(
+            'contact_notification',
             subject=f'[Contact Form Submission] {contact_submission.subject}',
-            sender=current_app.config.get('MAIL_USERNAME'),
             recipients=[current_app.config.get('MAIL_USERNAME')],  # Send to admin
-            reply_to=contact_submission.email  # Add reply-to parameter
+            reply_to=contact_submission.email,  # Add reply-to parameter
+            contact=contact_submission
         )
-        
-        admin_msg.body = f"""
-{contact_submission.message}
-"""
-        
-        admin_msg.html = f"""
-<html>
-<body>
-    <p>{contact_submission.message.replace(chr(10), '<br>')}</p>
-</body>
-</html>
-"""
-        
+
         # Auto-reply to user
-        user_msg = Message(
+        user_msg = build_email(
+            'contact_auto_reply',
             subject='Thank you for contacting us - Flask Template',
-            sender=current_app.config.get('MAIL_USERNAME'),
-            recipients=[contact_submission.email]
+            recipients=[contact_submission.email],
+            contact=contact_submission
         )
-        
-        user_msg.body = f"""Hello {contact_submission.name},
-
-Thank you for contacting us! We have received your message regarding "{contact_submission.subject}" and will get back to you as soon as possible.
-
-Your message:
-{contact_submission.message}
-
-We typically respond within 24-48 hours.
 
-Best regards,
-Flask Template Team
-"""
-        
-        user_msg.html = f"""
-<html>
-<body>
-    <h2>Thank you for contacting us!</h2>
-    <p>Hello <strong>{contact_submission.name}</strong>,</p>
-    
-    <p>Thank you for contacting us! We have received your message regarding "<strong>{contact_submission.subject}</strong>" and will get back to you as soon as possible.</p>
-    
-    <h3>Your message:</h3>
-    <p>{contact_submission.message.replace(chr(10), '<br>')}</p>
-    
-    <p>We typically respond within 24-48 hours.</p>
-    
-    <p>Best regards,<br>Flask Template Team</p>
-</body>
-</html>
-"""
-        
-        # Send both emails
-        mail.send(admin_msg)
-        mail.send(user_msg)
+        # Queue both emails (sent over one connection when there is no outbox)
+        queue_email(admin_msg, user_msg)
         return True
         
     except Exception as e:
@@ -163,10 +122,10 @@ def contact_page():
                 message=message
             )
             db.session.add(contact_submission)
-            db.session.commit()
             
-            # Send email notifications
+            # Queue email notifications in the same transaction as the submission
             email_sent = send_contact_notification(contact_submission)
+            db.session.commit()
             
             if email_sent:
                 flash('Thank you for your message! We have received your inquiry and sent you a confirmation email.', 'success')
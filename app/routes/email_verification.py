@@ -1,67 +1,39 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify
-from flask_mail import Message
-from app import db, mail
+from app import db
 from app.models.user import User
 from app.models.email_verification import EmailVerification
+from app.utils.email_outbox import queue_email
+from app.utils.email_rendering import build_email, format_duration
+from app.utils.signed_tokens import (
+    TOKEN_EXPIRED,
+    TOKEN_VALID,
+    generate_verification_token,
+    is_signed_token,
+    load_verification_token,
+    signed_tokens_enabled,
+)
 
 email_verification_bp = Blueprint('email_verification', __name__, url_prefix='/auth')
 
-def send_verification_email(user, verification):
-    """Send email verification email to user."""
+def send_verification_email(user, token):
+    """Queue the email verification email for a user (the caller commits)."""
     if not current_app.config.get('MAIL_SERVER'):
         current_app.logger.warning("Email server not configured for verification")
         return False
     
     try:
-        verification_url = url_for('email_verification.verify_email', token=verification.token, _external=True)
+        verification_url = url_for('email_verification.verify_email', token=token, _external=True)
         
-        msg = Message(
+        msg = build_email(
+            'verification',
             subject='Verify Your Email Address - Flask Template',
-            sender=current_app.config.get('MAIL_USERNAME'),
-            recipients=[user.email]
+            recipients=[user.email],
+            username=user.username,
+            verification_url=verification_url,
+            expires_in=format_duration(current_app.config.get('EMAIL_VERIFICATION_TOKEN_MAX_AGE', 86400))
         )
         
-        msg.body = f"""Hello {user.username},
-
-Thank you for registering with Flask Template! To complete your registration, please verify your email address by clicking the link below:
-
-{verification_url}
-
-This verification link will expire in 24 hours.
-
-If you didn't create an account, you can safely ignore this email.
-
-Best regards,
-Flask Template Team
-"""
-        
-        msg.html = f"""
-<html>
-<body>
-    <h2>Verify Your Email Address</h2>
-    <p>Hello <strong>{user.username}</strong>,</p>
-    
-    <p>Thank you for registering with Flask Template! To complete your registration, please verify your email address by clicking the button below:</p>
-    
-    <p style="text-align: center; margin: 30px 0;">
-        <a href="{verification_url}" style="background-color: #3B82F6; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; display: inline-block;">
-            Verify Email Address
-        </a>
-    </p>
-    
-    <p>Or copy and paste this link into your browser:</p>
-    <p><a href="{verification_url}">{verification_url}</a></p>
-    
-    <p><small>This verification link will expire in 24 hours.</small></p>
-    
-    <p>If you didn't create an account, you can safely ignore this email.</p>
-    
-    <p>Best regards,<br>Flask Template Team</p>
-</body>
-</html>
-"""
-        
-        mail.send(msg)
+        queue_email(msg)
         return True
         
     except Exception as e:
@@ -69,17 +41,28 @@ Flask Template Team
         return False
 
 def create_and_send_verification(user):
-    """Create verification token and send email."""
+    """
+    Create verification token and queue the email, committing both together.
+    
+    Returns:
+        tuple: (token, email_sent) or (None, False) on error
+    """
     try:
-        # Create verification record
-        verification = EmailVerification.create_verification(user.id, user.email)
+        if signed_tokens_enabled():
+            # Signed token: nothing to store
+            token = generate_verification_token(user)
+        else:
+            # Create verification record
+            token = EmailVerification.create_verification(user.id, user.email, commit=False).token
         
-        # Send verification email
-        email_sent = send_verification_email(user, verification)
+        # Queue verification email
+        email_sent = send_verification_email(user, token)
+        db.session.commit()
         
-        return verification, email_sent
+        return token, email_sent
         
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f"Error creating verification for user {user.id}: {e}")
         return None, False
 
@@ -110,12 +93,14 @@ def check_email_verification_status(user_or_identifier):
     if not user:
         return False, None, None
     
-    is_verified = EmailVerification.is_email_verified(user.id, user.email)
-    return is_verified, user.id, user.email
+    return user.email_verified, user.id, user.email
 
 @email_verification_bp.route('/verify-email/<token>')
 def verify_email(token):
     """Handle email verification."""
+    if is_signed_token(token):
+        return verify_signed_email(token)
+    
     verification = EmailVerification.get_by_token(token)
     
     if not verification:
@@ -135,6 +120,28 @@ def verify_email(token):
     flash('Email address verified successfully! You can now log in.', 'success')
     return redirect(url_for('auth.login'))
 
+def verify_signed_email(token):
+    """Handle email verification for a signed token (no email_verifications row)."""
+    status, user = load_verification_token(token)
+    
+    if status == TOKEN_EXPIRED:
+        flash('Verification token has expired. Please request a new one.', 'error')
+        return redirect(url_for('auth.login'))
+    
+    if status != TOKEN_VALID:
+        flash('Invalid verification token.', 'error')
+        return redirect(url_for('auth.login'))
+    
+    if user.email_verified:
+        flash('Email address has already been verified. You can now log in.', 'info')
+        return redirect(url_for('auth.login'))
+    
+    # Verify the email
+    user.mark_email_verified(user.email)
+    db.session.commit()
+    flash('Email address verified successfully! You can now log in.', 'success')
+    return redirect(url_for('auth.login'))
+
 @email_verification_bp.route('/check-verification-status', methods=['POST'])
 def check_verification_status():
     """Check if user's email has been verified (AJAX endpoint)."""
@@ -146,8 +153,9 @@ def check_verification_status():
         return jsonify({'verified': False, 'error': 'Invalid request'})
     
     try:
-        # Check if email is verified
-        is_verified = EmailVerification.is_email_verified(user_id, user_email)
+        # Check if email is verified (primary key lookup on users)
+        user = db.session.get(User, int(user_id))
+        is_verified = user is not None and user.email == user_email and user.email_verified
         return jsonify({'verified': is_verified})
     except Exception as e:
         current_app.logger.error(f"Error checking verification status: {e}")
@@ -169,12 +177,12 @@ def resend_verification():
         return redirect(url_for('auth.login'))
     
     # Check if already verified
-    if EmailVerification.is_email_verified(user.id, user.email):
+    if user.email_verified:
         flash('Email address is already verified. You can now log in.', 'info')
         return redirect(url_for('auth.login'))
     
     # Create new verification
-    verification, email_sent = create_and_send_verification(user)
+    token, email_sent = create_and_send_verification(user)
     
     # Clear any existing flash messages by redirecting to a clean verification pending page
     if email_sent:
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, current_app
 from app.models.login_attempt import LoginAttempt
+from app.utils.lockout import lockout_engine, minutes_until
 
 login_attempts_bp = Blueprint('login_attempts', __name__)
 
@@ -13,14 +14,17 @@ def get_client_ip():
     else:
         return request.remote_addr
 
+def get_lockout_status():
+    """Get locked state, remaining attempts and unlock time for current IP in one lookup."""
+    return lockout_engine.status(get_client_ip())
+
 def check_ip_lockout():
     """Check if current IP is locked out and return lockout info."""
-    client_ip = get_client_ip()
+    status = get_lockout_status()
     
-    if LoginAttempt.is_ip_locked(client_ip):
-        remaining_time = LoginAttempt.get_lockout_time_remaining(client_ip)
-        if remaining_time:
-            minutes = int(remaining_time.total_seconds() / 60) + 1
+    if status.locked:
+        minutes = minutes_until(status.unlock_at)
+        if minutes:
             return True, minutes
     
     return False, 0
@@ -30,23 +34,20 @@ def record_login_attempt(username_or_email, success=False):
     client_ip = get_client_ip()
     user_agent = request.headers.get('User-Agent')
     
-    return LoginAttempt.record_attempt(
+    attempt = LoginAttempt.record_attempt(
         ip_address=client_ip,
         username_or_email=username_or_email,
         success=success,
         user_agent=user_agent
     )
+    if not success:
+        lockout_engine.record_failure(client_ip, attempt.attempted_at)
+    return attempt
 
 def get_remaining_attempts():
     """Get the number of remaining login attempts for current IP."""
-    client_ip = get_client_ip()
-    failed_count = LoginAttempt.get_failed_attempts_count(client_ip)
-    max_attempts = current_app.config.get('MAX_LOGIN_ATTEMPTS', 5)
-    return max(0, max_attempts - failed_count)
+    return get_lockout_status().remaining_attempts
 
 def is_lockout_triggered():
     """Check if the current IP should be locked out after this attempt."""
-    client_ip = get_client_ip()
-    failed_count = LoginAttempt.get_failed_attempts_count(client_ip)
-    max_attempts = current_app.config.get('MAX_LOGIN_ATTEMPTS', 5)
-    return failed_count >= max_attempts
+    return get_lockout_status().locked
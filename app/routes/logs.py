@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, make_response
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, Response, stream_with_context
 from app import db
 from app.models.user import User
 from app.models.login_attempt import LoginAttempt
@@ -6,8 +6,8 @@ from app.models.email_verification import EmailVerification
 from app.models.contact import Contact
 from datetime import datetime, timedelta
 from sqlalchemy import desc
-import csv
-import io
+from app.utils.log_export import EXPORTS, generate_csv, gzip_chunks, iter_export_rows
+from app.utils.pagination import get_pagination_mode, keyset_paginate
 
 # Import admin_required from admin module
 from app.routes.admin import admin_required
@@ -26,26 +26,25 @@ def logs():
     if per_page not in [25, 50, 100]:
         per_page = 25
     
-    if log_type == 'login_attempts':
-        logs_query = LoginAttempt.query.order_by(desc(LoginAttempt.attempted_at))
-        logs_pagination = logs_query.paginate(page=page, per_page=per_page, error_out=False)
-        
-    elif log_type == 'user_registrations':
-        logs_query = User.query.order_by(desc(User.created_at))
-        logs_pagination = logs_query.paginate(page=page, per_page=per_page, error_out=False)
-        
-    elif log_type == 'email_verifications':
-        logs_query = EmailVerification.query.order_by(desc(EmailVerification.created_at))
-        logs_pagination = logs_query.paginate(page=page, per_page=per_page, error_out=False)
-        
-    elif log_type == 'contact_submissions':
-        logs_query = Contact.query.order_by(desc(Contact.created_at))
-        logs_pagination = logs_query.paginate(page=page, per_page=per_page, error_out=False)
-    
-    else:
+    sources = {
+        'login_attempts': (LoginAttempt, LoginAttempt.attempted_at),
+        'user_registrations': (User, User.created_at),
+        'email_verifications': (EmailVerification, EmailVerification.created_at),
+        'contact_submissions': (Contact, Contact.created_at),
+    }
+    if log_type not in sources:
         flash('Invalid log type.', 'error')
         return redirect(url_for('logs.logs'))
     
+    model, time_column = sources[log_type]
+    if get_pagination_mode() == 'cursor':
+        # Keyset pagination: no OFFSET scan or full COUNT, deep pages stay fast
+        logs_pagination = keyset_paginate(model.query, time_column, model.id, per_page,
+                                          cursor=request.args.get('cursor'), estimate_total=True)
+    else:
+        logs_query = model.query.order_by(desc(time_column))
+        logs_pagination = logs_query.paginate(page=page, per_page=per_page, error_out=False)
+    
     return render_template('admin/logs.html',
                          logs=logs_pagination.items,
                          pagination=logs_pagination,
@@ -54,61 +53,37 @@ def logs():
 @logs_bp.route('/export')
 @admin_required
 def export_logs():
-    """Export logs to CSV format."""
+    """Stream logs as CSV (optionally gzip-compressed, optionally with archived rows), filtered by date range and status."""
     log_type = request.args.get('type', 'login_attempts')
-    
-    # Create CSV output
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Define headers and data based on log type
-    if log_type == 'login_attempts':
-        writer.writerow(['Username/Email', 'IP Address', 'Success', 'Attempted At'])
-        logs = LoginAttempt.query.order_by(desc(LoginAttempt.attempted_at)).all()
-        for log in logs:
-            writer.writerow([
-                log.username_or_email or 'Unknown',
-                log.ip_address,
-                'Success' if log.success else 'Failed',
-                log.attempted_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-    elif log_type == 'user_registrations':
-        writer.writerow(['Username', 'Email', 'Active', 'Admin', 'Created At'])
-        logs = User.query.order_by(desc(User.created_at)).all()
-        for log in logs:
-            writer.writerow([
-                log.username,
-                log.email,
-                'Yes' if log.is_active else 'No',
-                'Yes' if log.is_admin else 'No',
-                log.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-    elif log_type == 'email_verifications':
-        writer.writerow(['Email', 'User', 'Verified', 'Expired', 'Created At'])
-        logs = EmailVerification.query.order_by(desc(EmailVerification.created_at)).all()
-        for log in logs:
-            writer.writerow([
-                log.email,
-                log.user.username if log.user else 'Unknown',
-                'Yes' if log.is_verified else 'No',
-                'Yes' if log.is_expired() else 'No',
-                log.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-    elif log_type == 'contact_submissions':
-        writer.writerow(['Name', 'Email', 'Subject', 'Message', 'Created At'])
-        logs = Contact.query.order_by(desc(Contact.created_at)).all()
-        for log in logs:
-            writer.writerow([
-                log.name,
-                log.email,
-                log.subject,
-                log.message,
-                log.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-    
-    # Create response
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = f'attachment; filename={log_type}_export.csv'
+    if log_type not in EXPORTS:
+        flash('Invalid log type.', 'error')
+        return redirect(url_for('logs.logs'))
+
+    filters = {
+        'status': request.args.get('status', ''),
+        'ip': request.args.get('ip', '').strip(),
+    }
+    try:
+        for key in ('start', 'end'):
+            value = request.args.get(key, '').strip()
+            filters[key] = datetime.strptime(value, '%Y-%m-%d') if value else None
+    except ValueError:
+        flash('Dates must be in YYYY-MM-DD format.', 'error')
+        return redirect(url_for('logs.logs', type=log_type))
+
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    include_archive = request.args.get('archive') == '1'
+    chunks = generate_csv(log_type, iter_export_rows(log_type, filters, batch_size=batch_size,
+                                                     include_archive=include_archive))
+    filename = f'{log_type}_export.csv'
+    if request.args.get('compress') == 'gzip':
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+
+    response = Response(stream_with_context(chunks), mimetype='text/csv')
+    if filename.endswith('.gz'):
+        response.mimetype = 'application/gzip'
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Accel-Buffering'] = 'no'  # Let reverse proxies pass chunks through
     
     return response
@@ -7,19 +7,21 @@ from flask import (
     flash,
     current_app,
 )
-from flask_mail import Message
-from app import db, mail
+from app import db
 from app.models.user import User, PasswordResetToken
 from app.utils.hcaptcha_utils import verify_hcaptcha
+from app.utils.email_outbox import queue_email
+from app.utils.email_rendering import build_email, format_duration
+from app.utils.password_hashing import HashingOverloaded
 from app.utils.password_validator import PasswordValidator
-from argon2.exceptions import HashingError
+from app.utils.signed_tokens import is_signed_token, load_reset_token
 import re
 
 password_reset_bp = Blueprint("password_reset", __name__, url_prefix="/password")
 
 
 def send_reset_email(user, token):
-    """Send password reset email."""
+    """Queue the password reset email (the caller commits)."""
     if not current_app.config.get("MAIL_SERVER"):
         current_app.logger.warning("Email server not configured")
         return False
@@ -29,50 +31,16 @@ def send_reset_email(user, token):
             "password_reset.reset_password", token=token, _external=True
         )
 
-        msg = Message(
+        msg = build_email(
+            "password_reset",
             subject="Password Reset Request - Flask Template",
-            sender=current_app.config.get("MAIL_USERNAME"),
             recipients=[user.email],
+            username=user.username,
+            reset_url=reset_url,
+            expires_in=format_duration(current_app.config.get("PASSWORD_RESET_TOKEN_MAX_AGE", 3600)),
         )
 
-        msg.body = f"""Hello {user.username},
-
-You requested a password reset for your Flask Template account.
-
-Click the link below to reset your password:
-{reset_url}
-
-This link will expire in 1 hour.
-
-If you didn't request this password reset, please ignore this email.
-
-Best regards,
-Flask Template Team
-"""
-
-        msg.html = f"""
-<html>
-<body>
-    <h2>Password Reset Request</h2>
-    <p>Hello <strong>{user.username}</strong>,</p>
-    
-    <p>You requested a password reset for your Flask Template account.</p>
-    
-    <p><a href="{reset_url}" style="background-color: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">Reset Your Password</a></p>
-    
-    <p>Or copy and paste this link into your browser:<br>
-    <a href="{reset_url}">{reset_url}</a></p>
-    
-    <p><em>This link will expire in 1 hour.</em></p>
-    
-    <p>If you didn't request this password reset, please ignore this email.</p>
-    
-    <p>Best regards,<br>Flask Template Team</p>
-</body>
-</html>
-"""
-
-        mail.send(msg)
+        queue_email(msg)
         return True
 
     except Exception as e:
@@ -111,14 +79,17 @@ def forgot_password():
         user = User.query.filter_by(email=email).first()
         if user and user.active:  # Changed from is_active
             try:
-                token = user.generate_reset_token()
-                if send_reset_email(user, token):
-                    current_app.logger.info(f"Password reset email sent to {email}")
+                token = user.generate_reset_token(commit=False)
+                queued = send_reset_email(user, token)
+                db.session.commit()
+                if queued:
+                    current_app.logger.info(f"Password reset email queued for {email}")
                 else:
                     current_app.logger.error(
                         f"Failed to send password reset email to {email}"
                     )
             except Exception as e:
+                db.session.rollback()
                 current_app.logger.error(
                     f"Error generating reset token for {email}: {e}"
                 )
@@ -137,10 +108,16 @@ def reset_password(token):
         )
         return redirect(url_for("main.home"))
 
-    reset_token = PasswordResetToken.find_valid_token(token)
-    if not reset_token:
+    if is_signed_token(token):
+        # Signed token: no row to look up or mark used; changing the password revokes it
+        reset_token = None
+        user = load_reset_token(token)
+    else:
+        reset_token = PasswordResetToken.find_valid_token(token)
+        user = reset_token.user if reset_token else None
+    if not user:
         flash("Invalid or expired reset link.", "error")
-        return redirect(url_for("password_reset.forgot-password"))
+        return redirect(url_for("password_reset.forgot_password"))
 
     if request.method == "POST":
         password = request.form.get("password")
@@ -157,7 +134,6 @@ def reset_password(token):
             errors.append("Password is required.")
         else:
             # Use zxcvbn validation with user context
-            user = reset_token.user
             user_inputs = (
                 [user.username, user.email.split("@")[0]]
                 if user.email
@@ -179,9 +155,9 @@ def reset_password(token):
 
         try:
             # Update user password
-            user = reset_token.user
             user.set_password(password)
-            reset_token.use_token()
+            if reset_token is not None:
+                reset_token.use_token()
             db.session.commit()
 
             flash(
@@ -190,8 +166,9 @@ def reset_password(token):
             )
             return redirect(url_for("auth.login"))
 
-        except HashingError:
-            flash("Error resetting password. Please try again.", "error")
+        except HashingOverloaded:
+            db.session.rollback()
+            raise  # 503 with Retry-After from the registered handler
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Password reset error: {e}")
@@ -11,6 +11,7 @@ from flask import (
 from flask_login import login_required, current_user
 from app import db
 from app.models.user import User
+from app.utils.password_hashing import HashingOverloaded
 import re
 
 profile_bp = Blueprint("profile", __name__, url_prefix="/profile")
@@ -101,7 +102,9 @@ def edit_profile():
         try:
             # Update user information
             current_user.username = username
-            current_user.email = email
+            if email != current_user.email:
+                current_user.email = email
+                current_user.refresh_email_verification()
 
             # Update password if provided
             if new_password:
@@ -112,6 +115,9 @@ def edit_profile():
             flash("Profile updated successfully!", "success")
             return redirect(url_for("profile.profile"))
 
+        except HashingOverloaded:
+            db.session.rollback()
+            raise  # 503 with Retry-After from the registered handler
         except Exception as e:
             db.session.rollback()
             flash(
@@ -67,6 +67,24 @@ function initializeTabSwitching() {
         });
     });
 
+    // Replace "load more" links with the next page of the activity list
+    document.addEventListener('click', function(e) {
+        const link = e.target.closest('[data-load-more]');
+        if (!link) return;
+        e.preventDefault();
+
+        const placeholder = link.closest('.load-more');
+        link.classList.add('pointer-events-none', 'opacity-50');
+        fetchFragment(link.href)
+            .then(html => {
+                placeholder.outerHTML = html;
+            })
+            .catch(() => {
+                link.classList.remove('pointer-events-none', 'opacity-50');
+                showAdminAlert('Failed to load more entries.', 'error');
+            });
+    });
+
     // Initialize first tab as active if tabs exist
     if (tabButtons.length > 0) {
         const firstTabId = tabButtons[0].id.replace('tab-', '');
@@ -96,6 +114,7 @@ function switchTab(tabName) {
     const selectedContent = document.getElementById('content-' + tabName);
     if (selectedContent) {
         selectedContent.classList.remove('hidden');
+        loadActivityList(selectedContent);
     }
     
     // Add active styles to selected tab button
@@ -106,6 +125,42 @@ function switchTab(tabName) {
     }
 }
 
+/**
+ * Fetch the first page of a tab's activity list the first time it is shown
+ * @param {HTMLElement} tabContent - The tab content element
+ */
+function loadActivityList(tabContent) {
+    const list = tabContent.querySelector('.activity-list[data-src]');
+    if (!list || list.dataset.loaded) return;
+    list.dataset.loaded = 'true';
+
+    fetchFragment(list.dataset.src)
+        .then(html => {
+            list.innerHTML = html;
+        })
+        .catch(() => {
+            delete list.dataset.loaded;
+            list.innerHTML = '<p class="text-center text-sm text-red-600 dark:text-red-400 py-6">Failed to load activity. Switch tabs to retry.</p>';
+        });
+}
+
+/**
+ * Fetch an HTML fragment
+ * @param {string} url - Fragment URL
+ * @returns {Promise<string>} - The fragment markup
+ */
+function fetchFragment(url) {
+    return fetch(url, {
+        headers: { 'X-Requested-With': 'XMLHttpRequest' }
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return response.text();
+    });
+}
+
 /**
  * Initialize pagination functionality for admin pages
  */
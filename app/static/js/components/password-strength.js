@@ -9,8 +9,16 @@ class PasswordStrengthChecker {
             showMeter: true,
             showFeedback: true,
             userInputs: [],
+            endpoint: '/auth/password-strength',
+            debounceMs: 250,
+            maxLength: 128,
             ...options
         };
+        this.debounceTimer = null;
+        this.controller = null;
+        this.lastKey = null;
+        this.lastResult = null;
+        this.retryAt = 0;
         
         if (this.passwordInput) {
             this.init();
@@ -54,7 +62,7 @@ class PasswordStrengthChecker {
     
     setupEventListeners() {
         this.passwordInput.addEventListener('input', (e) => {
-            this.checkStrength(e.target.value);
+            this.scheduleCheck(e.target.value);
         });
         
         this.passwordInput.addEventListener('focus', () => {
@@ -62,39 +70,105 @@ class PasswordStrengthChecker {
         });
     }
     
+    scheduleCheck(password) {
+        // Show the instant client-side estimate, then ask the server once typing pauses
+        clearTimeout(this.debounceTimer);
+        if (this.controller) {
+            this.controller.abort();
+            this.controller = null;
+        }
+        if (!password) {
+            this.updateDisplay(0, 'Enter a password', []);
+            return;
+        }
+        this.basicStrengthCheck(password);
+        this.debounceTimer = setTimeout(() => this.checkStrength(password), this.options.debounceMs);
+    }
+    
     async checkStrength(password) {
         if (!password) {
             this.updateDisplay(0, 'Enter a password', []);
             return;
         }
         
+        // The server refuses oversized passwords and rate-limits checks
+        if (password.length > this.options.maxLength || Date.now() < this.retryAt) {
+            this.basicStrengthCheck(password);
+            return;
+        }
+        
+        const key = JSON.stringify([password, this.options.userInputs]);
+        if (key === this.lastKey && this.lastResult) {
+            this.showResult(this.lastResult);
+            return;
+        }
+        
+        // Cancel the previous request so a slow response can't overwrite a newer one
+        if (this.controller) this.controller.abort();
+        const controller = new AbortController();
+        this.controller = controller;
+        
         try {
-            // Make request to backend for strength checking
-            const response = await fetch('/api/check-password-strength', {
+            const response = await fetch(this.options.endpoint, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'X-Requested-With': 'XMLHttpRequest',
                 },
                 body: JSON.stringify({
                     password: password,
                     user_inputs: this.options.userInputs
-                })
+                }),
+                signal: controller.signal
             });
             
             if (response.ok) {
                 const result = await response.json();
-                this.updateDisplay(
-                    result.score,
-                    `${result.strength} - Crack time: ${result.crack_time}`,
-                    result.feedback
-                );
+                if (result.strength === 'pending') {
+                    // zxcvbn missed its deadline; the server caches the score, so ask again shortly
+                    this.showRules(result.rules);
+                    this.debounceTimer = setTimeout(() => this.checkStrength(password), this.options.debounceMs * 2);
+                    return;
+                }
+                this.lastKey = key;
+                this.lastResult = result;
+                this.showResult(result);
             } else {
+                if (response.status === 429) {
+                    const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 10;
+                    this.retryAt = Date.now() + retryAfter * 1000;
+                }
                 // Fallback to basic client-side checking
                 this.basicStrengthCheck(password);
             }
         } catch (error) {
+            if (error.name === 'AbortError') return;
             // Fallback to basic client-side checking
             this.basicStrengthCheck(password);
+        } finally {
+            if (this.controller === controller) this.controller = null;
+        }
+    }
+    
+    showResult(result) {
+        // Server scores are 0-4; the meter fills one bar per level
+        const unmet = (result.rules || []).filter(rule => !rule.passed).map(rule => rule.message);
+        const feedback = {
+            warning: result.feedback.warning,
+            suggestions: unmet.concat(result.feedback.suggestions || [])
+        };
+        this.updateDisplay(
+            result.score + 1,
+            `${result.strength} - Crack time: ${result.crack_time}`,
+            feedback
+        );
+    }
+    
+    showRules(rules) {
+        const unmet = (rules || []).filter(rule => !rule.passed).map(rule => rule.message);
+        const feedbackEl = this.strengthContainer.querySelector('.password-feedback');
+        if (feedbackEl && unmet.length > 0) {
+            this.updateDisplay(1, 'Checking...', { suggestions: unmet });
         }
     }
     
@@ -189,6 +263,9 @@ class PasswordStrengthChecker {
     
     setUserInputs(inputs) {
         this.options.userInputs = inputs;
+        if (this.passwordInput.value) {
+            this.scheduleCheck(this.passwordInput.value);
+        }
     }
 }
 
@@ -13,6 +13,7 @@ export class PaginationHelper {
         this.options = {
             pageParam: 'page',
             perPageParam: 'per_page',
+            cursorParam: 'cursor',
             defaultPerPage: 25,
             maxPagesVisible: 5,
             showJumpToPage: true,
@@ -37,6 +38,14 @@ export class PaginationHelper {
             return '';
         }
 
+        if (pagination.mode === 'cursor') {
+            const buildCursorUrl = (cursor) => {
+                return this.core.buildCursorUrl(baseUrl, cursor, extraParams);
+            };
+            const cursorControls = this.controls.generateCursorControls(pagination, buildCursorUrl);
+            return this.core.generateContainer(pagination, cursorControls, position);
+        }
+
         const buildUrl = (page, perPage = null) => {
             return this.core.buildUrl(baseUrl, page, extraParams, perPage);
         };
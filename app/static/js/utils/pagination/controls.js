@@ -28,6 +28,32 @@ export class PaginationControls {
         `;
     }
 
+    /**
+     * Generate newer/older controls for cursor pagination
+     */
+    generateCursorControls(pagination, buildCursorUrl) {
+        const buttonClass = "inline-flex items-center px-3 py-2 text-sm font-medium";
+        const activeClass = "text-gray-500 dark:text-gray-400 bg-white dark:bg-gray-800 border border-gray-300 dark:border-gray-600 hover:bg-gray-50 dark:hover:bg-gray-700 hover:text-gray-700 dark:hover:text-gray-300 transition-colors duration-200";
+        const disabledClass = "text-gray-300 dark:text-gray-600 bg-gray-100 dark:bg-gray-800 border border-gray-200 dark:border-gray-700 cursor-not-allowed";
+
+        const newer = pagination.has_prev ?
+            `<a href="${buildCursorUrl(pagination.prev_cursor)}" class="${buttonClass} ${activeClass} rounded-l-lg"><i class="bi bi-chevron-left mr-1"></i>Newer</a>` :
+            `<span class="${buttonClass} ${disabledClass} rounded-l-lg"><i class="bi bi-chevron-left mr-1"></i>Newer</span>`;
+        const older = pagination.has_next ?
+            `<a href="${buildCursorUrl(pagination.next_cursor)}" class="${buttonClass} ${activeClass} rounded-r-lg">Older<i class="bi bi-chevron-right ml-1"></i></a>` :
+            `<span class="${buttonClass} ${disabledClass} rounded-r-lg">Older<i class="bi bi-chevron-right ml-1"></i></span>`;
+
+        return `
+            <div class="flex flex-col sm:flex-row items-center space-y-3 sm:space-y-0 sm:space-x-4">
+                ${this.generatePerPageSelector(pagination)}
+                <div class="flex items-center">
+                    ${newer}
+                    ${older}
+                </div>
+            </div>
+        `;
+    }
+
     /**
      * Generate items per page selector
      */
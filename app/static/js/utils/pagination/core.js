@@ -8,6 +8,7 @@ export class PaginationCore {
         this.options = {
             pageParam: 'page',
             perPageParam: 'per_page',
+            cursorParam: 'cursor',
             defaultPerPage: 25,
             maxPagesVisible: 5,
             ...options
@@ -35,10 +36,37 @@ export class PaginationCore {
         return url.toString();
     }
 
+    /**
+     * Build cursor pagination URL; a null cursor points at the newest entries
+     */
+    buildCursorUrl(baseUrl, cursor, extraParams = {}) {
+        const url = new URL(this.buildUrl(baseUrl, null, extraParams), window.location.origin);
+        url.searchParams.set('mode', 'cursor');
+        url.searchParams.delete(this.options.pageParam);
+        if (cursor) url.searchParams.set(this.options.cursorParam, cursor);
+        else url.searchParams.delete(this.options.cursorParam);
+
+        return url.toString();
+    }
+
     /**
      * Generate results info HTML
      */
     generateResultsInfo(pagination) {
+        if (pagination.mode === 'cursor') {
+            const estimate = pagination.estimated_total !== null && pagination.estimated_total !== undefined ? `
+                of about
+                <span class="font-medium text-gray-900 dark:text-white">${pagination.estimated_total}</span>` : '';
+
+            return `
+                <div class="text-sm text-gray-500 dark:text-gray-400">
+                    Showing
+                    <span class="font-medium text-gray-900 dark:text-white">${pagination.count ?? pagination.per_page}</span>
+                    entries${estimate}
+                </div>
+            `;
+        }
+
         const start = pagination.per_page * (pagination.page - 1) + 1;
         const end = pagination.page < pagination.pages ? 
             pagination.per_page * pagination.page : 
@@ -8,6 +8,7 @@ export class PaginationInteractions {
         this.options = {
             pageParam: 'page',
             perPageParam: 'per_page',
+            cursorParam: 'cursor',
             showJumpToPage: true,
             jumpToPageThreshold: 10,
             ...options
@@ -151,6 +152,7 @@ export class PaginationInteractions {
         const currentUrl = new URL(window.location);
         currentUrl.searchParams.set(this.options.perPageParam, perPage);
         currentUrl.searchParams.delete(this.options.pageParam); // Reset to page 1
+        currentUrl.searchParams.delete(this.options.cursorParam); // Restart from the newest entries
         
         this.showLoadingState(`Changing to ${perPage} items per page...`);
         window.location.href = currentUrl.toString();
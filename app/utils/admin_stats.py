@@ -0,0 +1,195 @@
+"""
+Aggregate statistics queries for the admin dashboard and stats API
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from flask import current_app
+from sqlalchemy import case, func, select, true
+
+from app.utils.time_buckets import BUCKET_SIZES, LABEL_FORMATS, bucket_label, floor_to_bucket
+
+
+def _count_if(condition):
+    """Conditional aggregate: number of rows matching ``condition``."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _sum_if(condition, column):
+    """Conditional aggregate: sum of ``column`` over rows matching ``condition``."""
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def rollups_enabled() -> bool:
+    """Whether login activity should be read from the rollup tables."""
+    return current_app.config.get('LOGIN_ROLLUPS_ENABLED', True)
+
+
+def get_dashboard_stats(session=None, now=None, use_rollups=None) -> Dict[str, Any]:
+    """
+    Compute all dashboard counters in a single round trip.
+
+    Each table is scanned once with conditional aggregation, and the per-table
+    aggregates are joined into one SELECT. Login activity comes from the last
+    24 hourly rollup buckets when rollups are enabled, so its cost does not
+    depend on the size of login_attempts.
+
+    Args:
+        session: SQLAlchemy session to run on (defaults to ``db.session``)
+        now: Reference time for the rolling windows (defaults to utcnow)
+        use_rollups: Read login activity from rollups (defaults to LOGIN_ROLLUPS_ENABLED)
+
+    Returns:
+        Dictionary of dashboard statistics
+    """
+    from app import db
+    from app.models.contact import Contact
+    from app.models.email_verification import EmailVerification
+    from app.models.login_attempt import LoginAttempt
+    from app.models.login_rollup import LoginRollup
+    from app.models.user import User
+
+    session = session or db.session
+    if use_rollups is None:
+        use_rollups = rollups_enabled()
+    now = now or datetime.utcnow()
+    thirty_days_ago = now - timedelta(days=30)
+    twenty_four_hours_ago = now - timedelta(hours=24)
+
+    users = select(
+        func.count(User.id).label('total_users'),
+        _count_if(User.active == True).label('active_users'),
+        _count_if(User.created_at >= thirty_days_ago).label('recent_registrations'),
+    ).subquery()
+
+    if use_rollups:
+        login_attempts = select(
+            func.coalesce(func.sum(LoginRollup.attempts), 0).label('recent_login_attempts'),
+            _sum_if(LoginRollup.success == False, LoginRollup.attempts).label('failed_login_attempts'),
+        ).where(
+            LoginRollup.resolution == 'hour',
+            LoginRollup.bucket_start > floor_to_bucket(twenty_four_hours_ago, 'hour'),
+        ).subquery()
+    else:
+        login_attempts = select(
+            func.count(LoginAttempt.id).label('recent_login_attempts'),
+            _count_if(LoginAttempt.success == False).label('failed_login_attempts'),
+        ).where(LoginAttempt.attempted_at >= twenty_four_hours_ago).subquery()
+
+    verifications = select(
+        _count_if(EmailVerification.is_verified == True).label('verified_emails'),
+        _count_if(EmailVerification.is_verified == False).label('pending_verifications'),
+    ).subquery()
+
+    contacts = select(
+        func.count(Contact.id).label('recent_contacts'),
+    ).where(Contact.created_at >= thirty_days_ago).subquery()
+
+    # Every subquery yields exactly one row, so joining them on true is a 1x1 product
+    combined = (
+        users.join(login_attempts, true())
+        .join(verifications, true())
+        .join(contacts, true())
+    )
+    row = session.execute(
+        select(users, login_attempts, verifications, contacts).select_from(combined)
+    ).mappings().one()
+
+    stats = {key: int(value or 0) for key, value in row.items()}
+    stats['inactive_users'] = stats['total_users'] - stats['active_users']
+    return stats
+
+
+MIN_RANGE = timedelta(hours=24)
+MAX_RANGE = timedelta(days=365)
+MAX_BUCKETS = 1500
+
+
+def get_login_activity(time_range, bucket, session=None, now=None, use_rollups=None) -> List[Dict[str, Any]]:
+    """
+    Count total and failed login attempts per time bucket.
+
+    Hour and day buckets are read from the rollup tables when enabled; minute
+    buckets (at most about a day of data) use one GROUP BY over raw attempts.
+
+    Args:
+        time_range: How far back to report, between MIN_RANGE and MAX_RANGE
+        bucket: One of BUCKET_SIZES
+        session: SQLAlchemy session to run on (defaults to ``db.session``)
+        now: Reference time (defaults to utcnow)
+        use_rollups: Read from rollups (defaults to LOGIN_ROLLUPS_ENABLED)
+
+    Returns:
+        One entry per bucket, oldest first, with empty buckets filled with zeros
+
+    Raises:
+        ValueError: If the range or bucket size is out of bounds
+    """
+    from app import db
+    from app.models.login_attempt import LoginAttempt
+    from app.models.login_rollup import ROLLUP_RESOLUTIONS, LoginRollup
+
+    if bucket not in BUCKET_SIZES:
+        raise ValueError(f"Bucket must be one of: {', '.join(BUCKET_SIZES)}.")
+    if not MIN_RANGE <= time_range <= MAX_RANGE:
+        raise ValueError("Range must be between 24h and 365d.")
+
+    step = BUCKET_SIZES[bucket]
+    bucket_count = int(time_range / step)
+    if bucket_count > MAX_BUCKETS:
+        raise ValueError(f"Range and bucket size would produce more than {MAX_BUCKETS} buckets.")
+
+    session = session or db.session
+    now = now or datetime.utcnow()
+    first_bucket = floor_to_bucket(now, bucket) - step * (bucket_count - 1)
+
+    python_format = LABEL_FORMATS[bucket]
+    if use_rollups is None:
+        use_rollups = rollups_enabled()
+
+    if use_rollups and bucket in ROLLUP_RESOLUTIONS:
+        counts = {
+            bucket_start.strftime(python_format): value
+            for bucket_start, value in LoginRollup.get_counts(bucket, first_bucket, session).items()
+        }
+    else:
+        label = bucket_label(LoginAttempt.attempted_at, bucket, session.get_bind().dialect.name)
+        rows = session.execute(
+            select(
+                label.label('bucket'),
+                func.count(LoginAttempt.id),
+                _count_if(LoginAttempt.success == False),
+            )
+            .where(LoginAttempt.attempted_at >= first_bucket)
+            .group_by(label)
+        ).all()
+        counts = {row[0]: (int(row[1]), int(row[2] or 0)) for row in rows}
+
+    activity = []
+    for index in range(bucket_count):
+        start = first_bucket + step * index
+        key = start.strftime(python_format)
+        total_attempts, failed_attempts = counts.get(key, (0, 0))
+        activity.append({
+            'date': key,
+            'start': start.isoformat(),
+            'total_attempts': total_attempts,
+            'failed_attempts': failed_attempts,
+            'success_attempts': total_attempts - failed_attempts,
+        })
+    return activity
+
+
+def parse_time_range(value) -> timedelta:
+    """
+    Parse a range such as ``24h``, ``7d`` or ``365d``.
+
+    Raises:
+        ValueError: If the value is not a number followed by h or d
+    """
+    match = re.fullmatch(r'(\d{1,4})([hd])', (value or '').strip().lower())
+    if not match:
+        raise ValueError("Range must look like 24h, 7d or 365d.")
+    amount, unit = int(match.group(1)), match.group(2)
+    return timedelta(hours=amount) if unit == 'h' else timedelta(days=amount)
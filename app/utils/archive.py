@@ -0,0 +1,322 @@
+"""
+Archive-then-prune for append-only log tables
+
+Rows older than the retention window are written to gzip-compressed JSON
+Lines files, one per day, under ``ARCHIVE_DIR`` (``instance/archive/`` by
+default)::
+
+    archive/login_attempts/2026-08/login_attempts-2026-08-14.jsonl.gz
+
+A day's rows are streamed in (time, id) order into a temporary file, the
+file is renamed into place and read back, and only when the rows in the
+file, the rows written and the rows still in the table agree are they
+deleted, in committed batches. A run interrupted after the file is written
+leaves the rows in place; the next run finds them in the existing file (still
+marked by a ``.pending`` file next to it) and deletes them without writing
+them again. When a time budget runs out part
+way through a day, the rows written so far are verified and deleted and the
+rest of the day goes into an extra part file (``...-2026-08-14.2.jsonl.gz``)
+on the next run, as do rows that turn up later for an archived day.
+
+``iter_archived_rows`` reads the files back newest first for log exports.
+"""
+import glob
+import gzip
+import json
+import os
+import re
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Iterator, Optional
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, select
+
+from app import db
+from app.models.contact import Contact
+from app.models.login_attempt import LoginAttempt
+from app.utils.maintenance import SweepResult, chunked_delete
+
+# Archived tables: name -> (model, time column, retention config key, default days)
+ARCHIVED_TABLES = OrderedDict([
+    ('login_attempts', (LoginAttempt, LoginAttempt.attempted_at, 'LOGIN_ATTEMPT_RETENTION_DAYS', 30)),
+    ('contact_submissions', (Contact, Contact.created_at, 'CONTACT_RETENTION_DAYS', 90)),
+])
+
+_FILENAME = re.compile(r'^(?P<table>[a-z_]+)-(?P<day>\d{4}-\d{2}-\d{2})(?:\.(?P<part>\d+))?\.jsonl\.gz$')
+
+
+# Outcome of archive_day: rows written and already archived, last (time, id)
+# covered, whether that was the end of the day, and the file written (or None)
+DayArchive = namedtuple('DayArchive', ['written', 'skipped', 'last_key', 'complete', 'path'])
+
+
+class ArchiveError(Exception):
+    """Raised when an archive file does not match the rows it was written from."""
+
+
+def archive_enabled():
+    """Whether maintenance archives aged rows before deleting them."""
+    return current_app.config.get('ARCHIVE_ENABLED', True) and not current_app.config.get('DISABLE_DATABASE')
+
+
+def archive_dir():
+    return current_app.config.get('ARCHIVE_DIR') or os.path.join(current_app.instance_path, 'archive')
+
+
+def _day_path(table, day, part=1):
+    suffix = '' if part == 1 else f'.{part}'
+    return os.path.join(archive_dir(), table, f'{day:%Y-%m}', f'{table}-{day:%Y-%m-%d}{suffix}.jsonl.gz')
+
+
+def archive_files(table):
+    """
+    Archive files for ``table``, oldest day first.
+
+    Returns:
+        List of (day, part, path)
+    """
+    files = []
+    for path in glob.glob(os.path.join(archive_dir(), table, '*', f'{table}-*.jsonl.gz')):
+        match = _FILENAME.match(os.path.basename(path))
+        if match and match.group('table') == table:
+            day = datetime.strptime(match.group('day'), '%Y-%m-%d').date()
+            files.append((day, int(match.group('part') or 1), path))
+    return sorted(files)
+
+
+def _encode(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _datetime_columns(model):
+    return {column.name for column in model.__table__.columns if isinstance(column.type, db.DateTime)}
+
+
+def read_archive_file(path, model):
+    """Decode one archive file into row objects (datetimes restored)."""
+    datetime_columns = _datetime_columns(model)
+    rows = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            for name in datetime_columns:
+                if record.get(name):
+                    record[name] = datetime.fromisoformat(record[name])
+            rows.append(SimpleNamespace(**record))
+    return rows
+
+
+def _pending_marker(path):
+    # Present while the rows in ``path`` may still be in the table
+    return path + '.pending'
+
+
+def _archived_keys(table, day, model, time_column):
+    """
+    (id, time) of archived rows for ``day`` that may not have been deleted
+    yet, and the next free part number.
+
+    Only parts still marked pending are read. The time is part of the key
+    because SQLite can hand out an archived id again once the rows above it
+    are deleted.
+    """
+    keys, part = set(), 1
+    for file_day, file_part, path in archive_files(table):
+        if file_day == day:
+            if os.path.exists(_pending_marker(path)):
+                keys.update((row.id, getattr(row, time_column.key)) for row in read_archive_file(path, model))
+            part = max(part, file_part + 1)
+    return keys, part
+
+
+def _clear_pending(table, day, path=None):
+    """Mark ``path`` (or every part for ``day``) as fully deleted from the table."""
+    paths = [path] if path else [file_path for file_day, _, file_path in archive_files(table) if file_day == day]
+    for file_path in paths:
+        if os.path.exists(_pending_marker(file_path)):
+            os.remove(_pending_marker(file_path))
+
+
+def _next_day(time_column, before, after=None):
+    """First day with rows before ``before`` (and at or after ``after``), or None."""
+    conditions = [time_column < before]
+    if after is not None:
+        conditions.append(time_column >= after)
+    oldest = db.session.query(func.min(time_column)).filter(*conditions).scalar()
+    return oldest.date() if oldest else None
+
+
+def _through(time_column, model, last_time, last_id):
+    """Rows at or before the keyset position (last_time, last_id) in (time, id) order."""
+    return or_(time_column < last_time, and_(time_column == last_time, model.id <= last_id))
+
+
+def archive_day(table, day, batch_size=1000, deadline=None, stop_event=None):
+    """
+    Write one day of ``table`` to a new archive file.
+
+    Rows are written in (time, id) order. Once ``deadline`` (a
+    ``time.perf_counter()`` value) passes or ``stop_event`` is set, the
+    batch in progress is finished and the rest of the day is left for the
+    next call.
+
+    Returns:
+        DayArchive; ``last_key`` is the (time, id) of the last row covered,
+        None when the day had no rows
+    """
+    model, time_column = ARCHIVED_TABLES[table][:2]
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    already_archived, part = _archived_keys(table, day, model, time_column)
+    columns = list(model.__table__.columns)
+
+    path = _day_path(table, day, part)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    written = skipped = 0
+    last_time = last_id = None
+    complete = True
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            while True:
+                query = select(*columns).where(time_column >= start, time_column < end)
+                if last_id is not None:
+                    query = query.where(or_(time_column > last_time,
+                                            and_(time_column == last_time, model.id > last_id)))
+                rows = db.session.execute(query.order_by(time_column, model.id).limit(batch_size)).all()
+                for row in rows:
+                    record = row._asdict()
+                    if (record['id'], record[time_column.key]) in already_archived:
+                        skipped += 1
+                        continue
+                    f.write(json.dumps({key: _encode(value) for key, value in record.items()}) + '\n')
+                    written += 1
+                if rows:
+                    last_time, last_id = getattr(rows[-1], time_column.key), rows[-1].id
+                if len(rows) < batch_size:
+                    break
+                if (deadline is not None and time.perf_counter() >= deadline) or \
+                        (stop_event is not None and stop_event.is_set()):
+                    complete = False
+                    break
+
+        if written:
+            open(_pending_marker(path), 'w').close()
+            os.replace(tmp_path, path)
+            if len(read_archive_file(path, model)) != written:
+                os.remove(path)
+                os.remove(_pending_marker(path))
+                raise ArchiveError(f"{path}: file does not contain the {written} rows written")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        db.session.rollback()  # End the read transaction before deleting
+
+    if last_id is None:
+        return DayArchive(0, 0, None, True, None)
+    in_table = db.session.query(func.count(model.id)).filter(
+        time_column >= start, time_column < end, _through(time_column, model, last_time, last_id)
+    ).scalar()
+    if in_table != written + skipped:
+        raise ArchiveError(f"{table} {day}: {in_table} rows in the table, {written + skipped} archived")
+    return DayArchive(written, skipped, (last_time, last_id), complete, path if written else None)
+
+
+def archive_and_prune(table, batch_size=None, pause=None, max_seconds=None, progress=None, stop_event=None):
+    """
+    Archive every whole day of ``table`` older than its retention window, then delete those rows.
+
+    ``max_seconds`` and ``stop_event`` are checked after every batch, so a
+    busy day can be archived and deleted over several runs.
+
+    Returns:
+        SweepResult with the number of rows archived and deleted
+    """
+    model, time_column, retention_key, default_days = ARCHIVED_TABLES[table]
+    batch_size = batch_size or current_app.config.get('MAINTENANCE_BATCH_SIZE', 1000)
+    retention_start = datetime.utcnow() - timedelta(days=current_app.config.get(retention_key, default_days))
+    cutoff = datetime.combine(retention_start.date(), datetime.min.time())  # Only whole days
+
+    started = time.perf_counter()
+    deadline = started + max_seconds if max_seconds is not None else None
+    rows = batches = 0
+    complete = True
+    day = _next_day(time_column, cutoff)
+    while day is not None:
+        if (deadline is not None and time.perf_counter() >= deadline) or \
+                (stop_event is not None and stop_event.is_set()):
+            complete = False
+            break
+        # Archive for at most half the time left so deleting what was written fits in the rest
+        archive_deadline = None
+        if deadline is not None:
+            archive_deadline = time.perf_counter() + (deadline - time.perf_counter()) / 2
+        written, skipped, last_key, day_complete, path = archive_day(table, day, batch_size, archive_deadline,
+                                                                     stop_event)
+        day_start = datetime.combine(day, datetime.min.time())
+        day_end = day_start + timedelta(days=1)
+        if last_key is not None:
+            remaining = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+            deleted = chunked_delete(model, [time_column >= day_start, time_column < day_end,
+                                             _through(time_column, model, *last_key)],
+                                     batch_size=batch_size, pause=pause, max_seconds=remaining,
+                                     task=table, stop_event=stop_event)
+            rows += deleted.rows
+            batches += deleted.batches
+            if deleted.complete and day_complete:
+                _clear_pending(table, day)
+            elif deleted.complete and path:
+                # Earlier pending parts may still hold rows past last_key
+                _clear_pending(table, day, path)
+            day_complete = day_complete and deleted.complete
+            current_app.logger.info(f"Archived {written} {table} rows for {day} ({skipped} already archived), "
+                                    f"deleted {deleted.rows}")
+            if progress:
+                progress(rows, time.perf_counter() - started)
+        if not day_complete:
+            complete = False
+            break
+        day = _next_day(time_column, cutoff, after=day_end)
+
+    return SweepResult(table, rows, batches, time.perf_counter() - started, complete)
+
+
+def iter_archived_rows(table, start: Optional[date] = None, end: Optional[date] = None,
+                       predicate=None) -> Iterator[SimpleNamespace]:
+    """
+    Yield archived rows newest first, like ``log_export.iter_rows``.
+
+    Args:
+        start, end: Inclusive day range (None: unbounded)
+        predicate: Optional function(row) -> bool for other filters
+    """
+    model, time_column = ARCHIVED_TABLES[table][:2]
+    days = OrderedDict()
+    for day, _, path in archive_files(table):
+        if (start is None or day >= start) and (end is None or day <= end):
+            days.setdefault(day, []).append(path)
+
+    for day in reversed(days):
+        # One day is loaded at a time to reverse it into newest-first order
+        rows = [row for path in days[day] for row in read_archive_file(path, model)]
+        rows.sort(key=lambda row: (getattr(row, time_column.key), row.id), reverse=True)
+        for row in rows:
+            if predicate is None or predicate(row):
+                yield row
+
+
+def archive_summary():
+    """Files, days, bytes and date range per archived table."""
+    summary = OrderedDict()
+    for table in ARCHIVED_TABLES:
+        files = archive_files(table)
+        summary[table] = {
+            'files': len(files),
+            'bytes': sum(os.path.getsize(path) for _, _, path in files),
+            'first_day': files[0][0] if files else None,
+            'last_day': files[-1][0] if files else None,
+        }
+    return summary
@@ -0,0 +1,336 @@
+"""
+Offline breached-password lookups against a memory-mapped SHA-1 list
+
+The hash file holds every breached SHA-1 digest, sorted, as an 18-byte suffix
+per record, followed by an index of where each 2-byte prefix starts and a
+trailer. A lookup reads the prefix's slot from the index and binary searches
+the (on average ~15k) suffixes in that range straight from the page cache,
+so workers share the file instead of each holding it as Python objects.
+
+An optional Bloom filter file answers "definitely not breached" for most
+passwords with ``k`` bit probes and no search at all.
+"""
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Iterable, Iterator, Optional
+
+HASH_MAGIC = b'BPWSHA1\x01'
+BLOOM_MAGIC = b'BPWBLM\x00\x01'
+PREFIX_BYTES = 2
+SUFFIX_BYTES = 20 - PREFIX_BYTES
+PREFIX_COUNT = 256 ** PREFIX_BYTES
+
+_INDEX = struct.Struct(f'<{PREFIX_COUNT + 1}Q')
+_TRAILER = struct.Struct('<8sQ')  # magic, record count
+_BLOOM_HEADER = struct.Struct('<8sQI')  # magic, bit count, probe count
+
+
+class BreachedPasswordError(Exception):
+    """Raised when a hash or Bloom filter file is missing or malformed."""
+
+
+def password_digest(password: str) -> bytes:
+    """SHA-1 digest of a password, as used by breach corpora."""
+    return hashlib.sha1(password.encode('utf-8', 'surrogatepass')).digest()
+
+
+def _bloom_positions(digest: bytes, bits: int, probes: int) -> Iterator[int]:
+    # SHA-1 output is uniform, so two slices of it serve as the double-hashing pair
+    h1 = int.from_bytes(digest[4:12], 'little')
+    h2 = int.from_bytes(digest[12:20], 'little') | 1
+    for i in range(probes):
+        yield (h1 + i * h2) % bits
+
+
+class HashFile:
+    """Read-only view of a built hash file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _INDEX.size + _TRAILER.size:
+                raise BreachedPasswordError(f"{path} is too small to be a breached password file")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count = _TRAILER.unpack_from(self._mmap, size - _TRAILER.size)
+        if magic != HASH_MAGIC or self.count * SUFFIX_BYTES + _INDEX.size + _TRAILER.size != size:
+            self._mmap.close()
+            raise BreachedPasswordError(f"{path} is not a breached password file")
+        self._index_offset = self.count * SUFFIX_BYTES
+        self._offset = struct.Struct('<Q')
+
+    def _prefix_start(self, prefix):
+        return self._offset.unpack_from(self._mmap, self._index_offset + prefix * 8)[0]
+
+    def contains(self, digest: bytes) -> bool:
+        """Binary search the digest's prefix bucket for its suffix."""
+        prefix = int.from_bytes(digest[:PREFIX_BYTES], 'big')
+        suffix = digest[PREFIX_BYTES:]
+        lo, hi = self._prefix_start(prefix), self._prefix_start(prefix + 1)
+        data = self._mmap
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mid * SUFFIX_BYTES
+            record = data[start:start + SUFFIX_BYTES]
+            if record < suffix:
+                lo = mid + 1
+            elif record > suffix:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def digests(self) -> Iterator[bytes]:
+        """Every digest in the file, in order."""
+        data = self._mmap
+        position = 0
+        for prefix in range(PREFIX_COUNT):
+            end = self._prefix_start(prefix + 1)
+            head = prefix.to_bytes(PREFIX_BYTES, 'big')
+            while position < end:
+                start = position * SUFFIX_BYTES
+                yield head + data[start:start + SUFFIX_BYTES]
+                position += 1
+
+    def close(self):
+        self._mmap.close()
+
+
+class BloomFile:
+    """Read-only view of a built Bloom filter file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _BLOOM_HEADER.size:
+            self._mmap.close()
+            raise BreachedPasswordError(f"{path} is not a Bloom filter file")
+        magic, self.bits, self.probes = _BLOOM_HEADER.unpack_from(self._mmap, 0)
+        if magic != BLOOM_MAGIC or len(self._mmap) != _BLOOM_HEADER.size + (self.bits + 7) // 8:
+            self._mmap.close()
+            raise BreachedPasswordError(f"{path} is not a Bloom filter file")
+
+    def might_contain(self, digest: bytes) -> bool:
+        data = self._mmap
+        for position in _bloom_positions(digest, self.bits, self.probes):
+            if not data[_BLOOM_HEADER.size + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self):
+        self._mmap.close()
+
+
+class BreachedPasswordChecker:
+    """
+    Membership test against a local breach corpus, configured from
+    BREACHED_PASSWORDS_FILE and BREACHED_PASSWORDS_BLOOM.
+
+    Files are mapped on first use in each process. A missing or unreadable
+    file disables the check (logged once) rather than failing signups.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.bloom_path = None
+        self._hashes = None
+        self._bloom = None
+        self._opened = False
+        self._lock = threading.Lock()
+        self.logger = None
+
+    def init_app(self, app):
+        """Apply BREACHED_PASSWORDS_* settings."""
+        self.close()
+        self.path = app.config.get('BREACHED_PASSWORDS_FILE') or None
+        self.bloom_path = app.config.get('BREACHED_PASSWORDS_BLOOM') or None
+        self.logger = app.logger
+        app.extensions['breached_passwords'] = self
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _open(self):
+        with self._lock:
+            if self._opened:
+                return
+            try:
+                self._hashes = HashFile(self.path)
+                if self.bloom_path:
+                    self._bloom = BloomFile(self.bloom_path)
+            except (OSError, BreachedPasswordError) as e:
+                if self.logger:
+                    self.logger.error(f"Breached password check disabled: {e}")
+                self.close()
+            self._opened = True
+
+    def is_breached(self, password: str) -> bool:
+        """Whether the password's SHA-1 appears in the breach corpus."""
+        if not self.path:
+            return False
+        if not self._opened:
+            self._open()
+        if self._hashes is None:
+            return False
+
+        digest = password_digest(password)
+        if self._bloom is not None and not self._bloom.might_contain(digest):
+            return False
+        return self._hashes.contains(digest)
+
+    def stats(self):
+        """Record count and file sizes, opening the files if needed."""
+        if self.path and not self._opened:
+            self._open()
+        return {
+            'enabled': self._hashes is not None,
+            'records': self._hashes.count if self._hashes else 0,
+            'hash_file_bytes': os.path.getsize(self.path) if self._hashes else 0,
+            'bloom_file_bytes': os.path.getsize(self.bloom_path) if self._bloom else 0,
+        }
+
+    def close(self):
+        """Unmap the files; the next lookup maps them again."""
+        for view in (self._hashes, self._bloom):
+            if view is not None:
+                view.close()
+        self._hashes = None
+        self._bloom = None
+        self._opened = False
+
+
+def parse_hash_lines(lines: Iterable[str], min_count=1) -> Iterator[bytes]:
+    """
+    Parse ``SHA1HEX[:COUNT]`` lines (the Pwned Passwords download format).
+
+    Lines with a count below ``min_count`` are skipped, as are blank and malformed lines.
+    """
+    for line in lines:
+        hex_digest, _, count = line.strip().partition(':')
+        if len(hex_digest) != 40:
+            continue
+        if count:
+            try:
+                if int(count) < min_count:
+                    continue
+            except ValueError:
+                continue
+        try:
+            yield bytes.fromhex(hex_digest)
+        except ValueError:
+            continue
+
+
+def _sorted_runs(digests: Iterator[bytes], run_size: int, workdir: str) -> Iterator[bytes]:
+    """Sort digests of any size with bounded memory: sorted runs on disk, then a merge."""
+    runs = []
+    while True:
+        chunk = [digest for _, digest in zip(range(run_size), digests)]
+        if not chunk:
+            break
+        chunk.sort()
+        run = tempfile.TemporaryFile(dir=workdir)
+        run.write(b''.join(chunk))
+        run.seek(0)
+        runs.append(run)
+
+    def read_run(run):
+        while True:
+            digest = run.read(20)
+            if len(digest) < 20:
+                run.close()
+                return
+            yield digest
+
+    return heapq.merge(*(read_run(run) for run in runs))
+
+
+def build_hash_file(digests: Iterable[bytes], output: str, presorted=False, run_size=5_000_000) -> int:
+    """
+    Write a sorted, de-duplicated hash file from SHA-1 digests.
+
+    Input that is already sorted (as the Pwned Passwords downloads are) is
+    streamed; otherwise it is sorted in runs of ``run_size`` digests.
+
+    Returns:
+        Number of records written
+    """
+    workdir = os.path.dirname(os.path.abspath(output))
+    digests = iter(digests)
+    if not presorted:
+        digests = _sorted_runs(digests, run_size, workdir)
+
+    counts = [0] * (PREFIX_COUNT + 1)
+    written = 0
+    previous = None
+    partial = output + '.partial'
+    with open(partial, 'wb') as f:
+        buffer = []
+        for digest in digests:
+            if previous is not None and digest <= previous:
+                if digest == previous:
+                    continue
+                f.close()
+                os.remove(partial)
+                raise BreachedPasswordError("Input is not sorted; build without --presorted")
+            previous = digest
+            buffer.append(digest[PREFIX_BYTES:])
+            counts[int.from_bytes(digest[:PREFIX_BYTES], 'big') + 1] += 1
+            written += 1
+            if len(buffer) >= 65536:
+                f.write(b''.join(buffer))
+                buffer.clear()
+        f.write(b''.join(buffer))
+
+        # counts[p + 1] holds bucket sizes; turn them into start offsets
+        for prefix in range(PREFIX_COUNT):
+            counts[prefix + 1] += counts[prefix]
+        f.write(_INDEX.pack(*counts))
+        f.write(_TRAILER.pack(HASH_MAGIC, written))
+    os.replace(partial, output)
+    return written
+
+
+def build_bloom_file(hash_path: str, output: str, false_positive_rate=0.01) -> dict:
+    """
+    Write a Bloom filter covering every digest in a built hash file.
+
+    Returns:
+        Dictionary with bits, probes and bytes of the filter
+    """
+    hashes = HashFile(hash_path)
+    try:
+        count = max(hashes.count, 1)
+        bits = max(8, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+        probes = max(1, round(bits / count * math.log(2)))
+        filter_bits = bytearray((bits + 7) // 8)
+        for digest in hashes.digests():
+            for position in _bloom_positions(digest, bits, probes):
+                filter_bits[position >> 3] |= 1 << (position & 7)
+    finally:
+        hashes.close()
+
+    partial = output + '.partial'
+    with open(partial, 'wb') as f:
+        f.write(_BLOOM_HEADER.pack(BLOOM_MAGIC, bits, probes))
+        f.write(filter_bits)
+    os.replace(partial, output)
+    return {'bits': bits, 'probes': probes, 'bytes': _BLOOM_HEADER.size + len(filter_bits)}
+
+
+# Initialize breached password checker instance
+breached_passwords = BreachedPasswordChecker()
+
+
+def init_breached_passwords(app):
+    """Initialize the breached password checker with the Flask app."""
+    breached_passwords.init_app(app)
@@ -0,0 +1,103 @@
+"""
+Read/write routing between the primary database and a read replica
+
+Admin pages and log exports scan large tables. With READ_REPLICA_ENABLED,
+the SELECTs of GET requests to ``admin_required`` views go to a separate
+read-only engine, so they no longer hold connections (or, on SQLite,
+locks) on the engine that login attempts and other writes use. Only
+reads are routed. Flushes, INSERT/UPDATE/DELETE statements and raw SQL
+always go to the primary, as does everything outside those views.
+
+The replica is READ_REPLICA_URL. Left empty with a SQLite primary, it is
+the primary file opened through its own pool with ``PRAGMA query_only``.
+SQLite and PostgreSQL replica connections are set read-only, so a misrouted
+write fails instead of diverging.
+
+Read-your-writes: a replica may lag behind the primary. After an admin
+POST, that admin's reads stay on the primary for READ_REPLICA_STICKY_SECONDS
+(tracked in their session), so the page they are redirected to shows the
+change they just made.
+"""
+import time
+
+from flask import current_app, g, has_app_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql import Select
+
+PRIMARY_UNTIL_KEY = '_db_primary_until'
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to the read replica while a request has opted in."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) and has_app_context() \
+                and g.get('db_use_replica'):
+            replica = current_app.extensions.get('read_replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_url(app):
+    """The replica URL, or None when routing is disabled or there is no replica."""
+    if app.config.get('DISABLE_DATABASE') or not app.config.get('READ_REPLICA_ENABLED'):
+        return None
+    url = app.config.get('READ_REPLICA_URL')
+    if url:
+        return url
+    primary = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if primary.startswith('sqlite:///') and ':memory:' not in primary:
+        return primary
+    app.logger.warning("READ_REPLICA_ENABLED without READ_REPLICA_URL needs a SQLite file database; "
+                       "reads stay on the primary")
+    return None
+
+
+def use_replica():
+    """Route this request's reads to the replica unless the user recently wrote."""
+    if session.get(PRIMARY_UNTIL_KEY, 0) > time.time():
+        return False
+    g.db_use_replica = True
+    return True
+
+
+def stick_to_primary(seconds=None):
+    """Keep this user's reads on the primary for a while, e.g. after a write."""
+    g.db_use_replica = False
+    if current_app.extensions.get('read_replica') is None:
+        return
+    seconds = current_app.config.get('READ_REPLICA_STICKY_SECONDS', 10) if seconds is None else seconds
+    session[PRIMARY_UNTIL_KEY] = time.time() + seconds
+
+
+def init_read_routing(app):
+    """Create the read replica engine (call after db.init_app)."""
+    from app.utils.sqlite_tuning import apply_pragmas, sqlite_pragmas
+
+    url = replica_url(app)
+    app.extensions['read_replica'] = None
+    if url is None:
+        return
+
+    options = {key: value for key, value in app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).items()
+               if key.startswith('pool_') or key == 'max_overflow'}
+    engine = create_engine(url, **options)
+    if engine.dialect.name == 'sqlite':
+        pragmas = sqlite_pragmas(app.config)
+        # Journal mode and sync settings belong to the writer; only read-side pragmas here
+        read_pragmas = {name: pragmas[name] for name in ('busy_timeout', 'cache_size', 'mmap_size')}
+        read_pragmas['query_only'] = 'ON'
+
+        @event.listens_for(engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, read_pragmas)
+    elif engine.dialect.name == 'postgresql':
+        @event.listens_for(engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY')
+            cursor.close()
+
+    app.extensions['read_replica'] = engine
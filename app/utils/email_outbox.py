@@ -0,0 +1,190 @@
+"""
+Transactional email outbox: queue in the request, deliver from a worker
+"""
+import random
+import smtplib
+import threading
+
+from flask import current_app
+from sqlalchemy import event
+
+from app import db
+from app.utils.mail_transport import mail_transport
+
+# Session.info key for messages waiting on the commit when there is no outbox
+PENDING_EMAILS_KEY = 'pending_emails'
+
+
+def outbox_enabled() -> bool:
+    """Whether emails are queued for the worker instead of sent inline."""
+    return (current_app.config.get('EMAIL_OUTBOX_ENABLED', False)
+            and not current_app.config.get('DISABLE_DATABASE', False))
+
+
+def queue_email(*messages):
+    """
+    Queue messages in the current transaction; they go out only if it commits.
+
+    With the outbox enabled the messages are added to the session as outbox
+    rows for the worker. Otherwise they are held on the session and sent over
+    one pooled SMTP connection right after the caller's commit, so a failed
+    commit never leaves a user holding a token for a row that was not saved.
+    Without a database there is no transaction to wait for: they are sent now.
+    """
+    if outbox_enabled():
+        from app.models.email_outbox import EmailOutbox
+
+        for message in messages:
+            EmailOutbox.enqueue(message)
+    elif current_app.config.get('DISABLE_DATABASE', False):
+        _send_now(messages)
+    else:
+        _register_listeners()
+        db.session.info.setdefault(PENDING_EMAILS_KEY, []).extend(messages)
+
+
+def _send_now(messages):
+    for error in mail_transport.send_many(messages):
+        if error is not None:
+            raise error
+
+
+_listeners_registered = False
+
+
+def _register_listeners():
+    """Send a session's pending emails once it commits and drop them if it rolls back."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    _listeners_registered = True
+
+    from sqlalchemy.orm import Session
+
+    def send_pending(session):
+        messages = session.info.pop(PENDING_EMAILS_KEY, None)
+        if not messages:
+            return
+        try:
+            _send_now(messages)
+        except Exception as e:
+            # The transaction is already committed; report instead of failing the caller
+            current_app.logger.error(f"Failed to send {len(messages)} email(s) after commit: {e}")
+
+    def drop_pending(session, previous_transaction):
+        session.info.pop(PENDING_EMAILS_KEY, None)
+
+    event.listen(Session, 'after_commit', send_pending)
+    event.listen(Session, 'after_soft_rollback', drop_pending)
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Seconds before retry number ``attempts``: exponential backoff with jitter.
+
+    The delay doubles from EMAIL_OUTBOX_BACKOFF_SECONDS up to
+    EMAIL_OUTBOX_BACKOFF_MAX, and a random half of it is added so messages
+    that failed together do not all retry together.
+    """
+    base = current_app.config.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 30)
+    cap = current_app.config.get('EMAIL_OUTBOX_BACKOFF_MAX', 3600)
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_permanent_failure(error) -> bool:
+    """SMTP 5xx replies about the message or its recipients will not succeed on retry."""
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False  # Our credentials, not the message; retry once they are fixed
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+def _record_failure(entry, error, max_attempts):
+    if is_permanent_failure(error) or entry.attempts + 1 >= max_attempts:
+        entry.mark_failed(error)
+        current_app.logger.error(f"Email {entry.id} dead-lettered after {entry.attempts} attempts: {error}")
+    else:
+        entry.mark_failed(error, retry_in=retry_delay(entry.attempts + 1))
+        current_app.logger.warning(f"Email {entry.id} failed (attempt {entry.attempts}), will retry: {error}")
+
+
+def deliver_due(batch_size=None) -> dict:
+    """
+    Send one batch of due outbox messages over one pooled SMTP connection.
+
+    Each result is committed as soon as it is known, so a crash resends at
+    most the message in flight.
+
+    Returns:
+        Dictionary with claimed, sent, retried and dead counts
+    """
+    from app.models.email_outbox import EmailOutbox, OUTBOX_DEAD, OUTBOX_SENT
+
+    config = current_app.config
+    batch_size = batch_size or config.get('EMAIL_OUTBOX_BATCH_SIZE', 50)
+    max_attempts = config.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 6)
+    entries = EmailOutbox.claim_due(batch_size, config.get('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+    stats = {'claimed': len(entries), 'sent': 0, 'retried': 0, 'dead': 0}
+    if not entries:
+        return stats
+
+    handled = set()
+    try:
+        with mail_transport.connection() as send:
+            for entry in entries:
+                try:
+                    send(entry.to_message())
+                    entry.mark_sent()
+                except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                    raise  # The connection is gone; fail the rest of the batch below
+                except Exception as e:
+                    _record_failure(entry, e, max_attempts)
+                db.session.commit()
+                handled.add(entry.id)
+    except Exception as e:
+        # Could not connect or lost the connection: every unsent message is retried
+        for entry in entries:
+            if entry.id not in handled:
+                _record_failure(entry, e, max_attempts)
+        db.session.commit()
+
+    for entry in entries:
+        if entry.status == OUTBOX_SENT:
+            stats['sent'] += 1
+        elif entry.status == OUTBOX_DEAD:
+            stats['dead'] += 1
+        else:
+            stats['retried'] += 1
+    return stats
+
+
+def run_worker(poll_interval=None, once=False, stop_event=None):
+    """
+    Deliver outbox messages until stopped.
+
+    Full batches are followed immediately by the next one; otherwise the
+    worker sleeps ``poll_interval`` seconds between scans.
+    """
+    poll_interval = poll_interval or current_app.config.get('EMAIL_OUTBOX_POLL_INTERVAL', 5)
+    batch_size = current_app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 50)
+    stop_event = stop_event or threading.Event()
+    totals = {'claimed': 0, 'sent': 0, 'retried': 0, 'dead': 0}
+    while not stop_event.is_set():
+        try:
+            stats = deliver_due(batch_size)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Email outbox worker error: {e}")
+            stats = {'claimed': 0}
+        finally:
+            db.session.remove()
+        for key in totals:
+            totals[key] += stats.get(key, 0)
+        if once:
+            break
+        if stats['claimed'] < batch_size:
+            stop_event.wait(poll_interval)
+    mail_transport.close_all()
+    return totals
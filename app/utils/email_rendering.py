@@ -0,0 +1,238 @@
+"""
+Email rendering from Jinja templates under app/templates/email/
+
+Each email is a pair of templates, ``<name>.txt`` and ``<name>.html``. HTML
+templates are styled with classes from ``email.css``; since most mail
+clients ignore <style> blocks, the loader copies those rules into ``style``
+attributes when it reads a template's source. That happens once, before the
+template is compiled, and the compiled template is cached for the life of
+the process, so sending only pays for evaluating it.
+"""
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from flask import current_app
+from flask_mail import Message
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+STYLESHEET = 'email.css'
+
+_SAMPLE_CONTACT = {
+    'name': 'Jane Doe',
+    'email': 'jane@example.com',
+    'subject': 'Question about <your> service',
+    'message': 'Hello,\nI would like to know more about your service.\n\nThanks!',
+}
+
+# Example context for each email, used by the admin preview and `flask bench email`
+SAMPLE_CONTEXTS = {
+    'verification': {
+        'username': 'janedoe',
+        'verification_url': 'https://example.com/auth/verify-email/sample-token',
+        'expires_in': '24 hours',
+    },
+    'password_reset': {
+        'username': 'janedoe',
+        'reset_url': 'https://example.com/password/reset-password/sample-token',
+        'expires_in': '1 hour',
+    },
+    'contact_notification': {'contact': _SAMPLE_CONTACT},
+    'contact_auto_reply': {'contact': _SAMPLE_CONTACT},
+}
+
+_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_SELECTOR = re.compile(r'^([a-z][a-z0-9]*)?(?:\.([a-zA-Z0-9_-]+))?$')
+_START_TAG = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)?(/?)>')
+_CLASS_ATTR = re.compile(r'\sclass="([^"]*)"')
+_STYLE_ATTR = re.compile(r'\sstyle="([^"]*)"')
+
+
+def parse_stylesheet(css: str) -> List[Tuple[str, str, str]]:
+    """
+    Parse ``tag``, ``.class`` and ``tag.class`` rules.
+
+    Returns:
+        List of (tag or '', class or '', declarations), least specific first
+    """
+    rules = []
+    for selectors, declarations in _RULE.findall(_COMMENT.sub('', css)):
+        declarations = ' '.join(declarations.split()).strip().rstrip(';')
+        for selector in selectors.split(','):
+            match = _SELECTOR.match(selector.strip())
+            if not match or not declarations:
+                continue  # Only simple selectors can be inlined
+            rules.append((match.group(1) or '', match.group(2) or '', declarations))
+    # Tag rules, then class rules, then tag.class rules; inline styles always win
+    return sorted(rules, key=lambda rule: (bool(rule[1]), bool(rule[0] and rule[1])))
+
+
+def inline_css(html: str, rules: List[Tuple[str, str, str]]) -> str:
+    """Copy matching stylesheet rules into each start tag's ``style`` attribute."""
+
+    def style_tag(match):
+        tag, attributes, self_closing = match.group(1).lower(), match.group(2) or '', match.group(3)
+        class_match = _CLASS_ATTR.search(attributes)
+        classes = set(class_match.group(1).split()) if class_match else set()
+        declarations = [
+            rule_declarations for rule_tag, rule_class, rule_declarations in rules
+            if (not rule_tag or rule_tag == tag) and (not rule_class or rule_class in classes)
+        ]
+        if not declarations:
+            return match.group(0)
+
+        style_match = _STYLE_ATTR.search(attributes)
+        if style_match:
+            declarations.append(style_match.group(1).strip().rstrip(';'))
+            attributes = _STYLE_ATTR.sub('', attributes)
+        if class_match:
+            attributes = _CLASS_ATTR.sub('', attributes)
+        # Later declarations override earlier ones for the same property
+        properties = {}
+        for declaration in '; '.join(declarations).split(';'):
+            prop, _, value = declaration.partition(':')
+            if value.strip():
+                properties.pop(prop.strip().lower(), None)
+                properties[prop.strip().lower()] = value.strip()
+        style = '; '.join(f'{prop}: {value}' for prop, value in properties.items())
+        return f'<{match.group(1)}{attributes} style="{style}"{self_closing}>'
+
+    return _START_TAG.sub(style_tag, html)
+
+
+class InliningLoader(FileSystemLoader):
+    """Template loader that inlines ``email.css`` into HTML templates as it reads them."""
+
+    def __init__(self, searchpath):
+        super().__init__(searchpath)
+        self._rules = None
+        self._stylesheet_mtime = None
+
+    def _stylesheet_mtime_now(self):
+        path = os.path.join(self.searchpath[0], STYLESHEET)
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    def _stylesheet_rules(self):
+        path = os.path.join(self.searchpath[0], STYLESHEET)
+        mtime = self._stylesheet_mtime_now()
+        if self._rules is None or mtime != self._stylesheet_mtime:
+            css = ''
+            if mtime is not None:
+                with open(path, encoding='utf-8') as f:
+                    css = f.read()
+            self._rules = parse_stylesheet(css)
+            self._stylesheet_mtime = mtime
+        return self._rules
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        if not template.endswith('.html'):
+            return source, filename, uptodate
+        source = inline_css(source, self._stylesheet_rules())
+        stylesheet_mtime = self._stylesheet_mtime
+        # With auto_reload, editing email.css also recompiles the HTML templates
+        return source, filename, lambda: uptodate() and self._stylesheet_mtime_now() == stylesheet_mtime
+
+
+class EmailRenderer:
+    """
+    Renders ``email/<name>.txt`` and ``email/<name>.html`` pairs.
+
+    Uses its own Jinja environment: templates are loaded (and CSS-inlined)
+    and compiled on first use, then kept in an unbounded cache. With
+    ``auto_reload`` (debug mode) edited templates are picked up on the next
+    render; otherwise the files are not checked again.
+    """
+
+    def __init__(self):
+        self.env = None
+        self.compile_ms = {}
+
+    def init_app(self, app):
+        """Create the email template environment."""
+        self.env = Environment(
+            loader=InliningLoader(os.path.join(app.root_path, 'templates', 'email')),
+            autoescape=select_autoescape(['html']),
+            undefined=StrictUndefined,
+            auto_reload=bool(app.debug or app.config.get('TEMPLATES_AUTO_RELOAD')),
+            cache_size=-1,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        self.compile_ms = {}
+        app.extensions['email_renderer'] = self
+
+    def template_names(self) -> List[str]:
+        """Names of emails with both a text and an HTML template."""
+        files = set(self.env.list_templates(extensions=['txt', 'html']))
+        return sorted(
+            name[:-4] for name in files
+            if name.endswith('.txt') and f'{name[:-4]}.html' in files and not name.startswith('_')
+        )
+
+    def get_templates(self, name):
+        """The compiled (text, html) templates for an email, compiling them on first use."""
+        started = time.perf_counter()
+        templates = self.env.get_template(f'{name}.txt'), self.env.get_template(f'{name}.html')
+        self.compile_ms.setdefault(name, round((time.perf_counter() - started) * 1000, 2))
+        return templates
+
+    def render(self, name, /, **context) -> Tuple[str, str]:
+        """Render an email's (text, html) bodies."""
+        text_template, html_template = self.get_templates(name)
+        return text_template.render(**context), html_template.render(**context)
+
+    def render_many(self, name, contexts: Iterable[Dict]) -> Iterable[Tuple[str, str]]:
+        """Render one email for many recipients, looking the templates up once."""
+        text_template, html_template = self.get_templates(name)
+        for context in contexts:
+            yield text_template.render(**context), html_template.render(**context)
+
+    def clear(self):
+        """Drop compiled templates (they are rebuilt on next use)."""
+        self.env.cache.clear()
+        self.compile_ms = {}
+
+
+# Initialize email renderer instance
+email_renderer = EmailRenderer()
+
+
+def init_email_rendering(app):
+    """Initialize the email renderer with the Flask app."""
+    email_renderer.init_app(app)
+
+
+def format_duration(seconds: int) -> str:
+    """
+    Human-readable token lifetime, e.g. '45 minutes', '1 hour', '1 hour 30 minutes'.
+
+    Rounds down to whole minutes (at least one), so an email does not promise
+    more time than the link has.
+    """
+    hours, minutes = divmod(max(int(seconds) // 60, 1), 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if minutes:
+        parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
+    return ' '.join(parts)
+
+
+def build_email(name, /, subject, recipients, sender=None, reply_to=None, **context) -> Message:
+    """
+    Build a Flask-Mail message from the ``name`` email templates.
+
+    ``sender`` defaults to MAIL_USERNAME, as the inline emails did.
+    """
+    text, html = email_renderer.render(name, **context)
+    return Message(
+        subject=subject,
+        sender=sender or current_app.config.get('MAIL_USERNAME'),
+        recipients=list(recipients),
+        reply_to=reply_to,
+        body=text,
+        html=html,
+    )
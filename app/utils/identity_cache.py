@@ -0,0 +1,148 @@
+"""
+Process-local identity cache for Flask-Login's user_loader
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+class IdentityCache:
+    """
+    TTL + LRU cache of ``User`` column values keyed by user id.
+
+    A hit rebuilds the user from the cached values and attaches it to the
+    request's session with ``merge(load=False)``, so authenticated requests
+    skip the users table entirely. Relationships still lazy-load from the
+    database when used.
+
+    Updates and deletes of a ``User`` flushed through the ORM evict the entry
+    once the transaction commits, in this process only. Other workers (and bulk
+    ``query.update()`` calls) are bounded by the TTL, which is therefore the
+    longest a deactivated account can keep using an existing session.
+    """
+
+    def __init__(self, ttl=30, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a load that raced one is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Apply IDENTITY_CACHE_* settings and hook User change events."""
+        self.enabled = app.config.get('IDENTITY_CACHE_ENABLED', True)
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', 30)
+        self.max_entries = app.config.get('IDENTITY_CACHE_SIZE', 1024)
+        _register_listeners(self)
+        app.extensions['identity_cache'] = self
+
+    def load_user(self, user_id):
+        """Get a session-bound ``User`` by id, from the cache when possible."""
+        from app import db
+        from app.models.user import User
+
+        if not self.enabled:
+            return db.session.get(User, user_id)
+
+        values = self._get(user_id)
+        if values is not None:
+            self.hits += 1
+            user = User.__mapper__.class_manager.new_instance()
+            for key, value in values.items():
+                set_committed_value(user, key, value)
+            make_transient_to_detached(user)
+            return db.session.merge(user, load=False)
+
+        self.misses += 1
+        generation = self._generation
+        user = db.session.get(User, user_id)
+        if user is not None:
+            values = {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+            self._put(user_id, values, generation)
+        return user
+
+    def invalidate(self, user_id):
+        """Evict one user."""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Evict every user."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def _get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= now:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return values
+
+    def _put(self, user_id, values, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_listeners_registered = False
+
+
+def _register_listeners(cache):
+    """Evict users changed in a session once that session commits."""
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    _listeners_registered = True
+
+    from sqlalchemy.orm import Session
+    from app.models.user import User
+
+    def remember_change(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault('identity_cache_changed', set()).add(target.id)
+
+    def evict_changed(session):
+        for user_id in session.info.pop('identity_cache_changed', ()):
+            cache.invalidate(user_id)
+
+    def forget_changed(session, previous_transaction):
+        session.info.pop('identity_cache_changed', None)
+
+    event.listen(User, 'after_update', remember_change)
+    event.listen(User, 'after_delete', remember_change)
+    event.listen(Session, 'after_commit', evict_changed)
+    event.listen(Session, 'after_soft_rollback', forget_changed)
+
+
+# Initialize identity cache instance
+identity_cache = IdentityCache()
+
+
+def init_identity_cache(app):
+    """Initialize the identity cache with the Flask app."""
+    identity_cache.init_app(app)
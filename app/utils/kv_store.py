@@ -0,0 +1,271 @@
+"""
+Minimal key-value store client and local stand-in server
+
+The client speaks the Redis wire protocol (RESP), so it works against Redis,
+Valkey, KeyDB and similar stores without extra dependencies. The stand-in
+server implements just the commands the client uses and is meant for local
+development and offline testing only.
+"""
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class KeyValueError(Exception):
+    """Raised when the key-value store returns an error reply."""
+
+
+def _encode_command(args) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [f'*{len(args)}\r\n'.encode()]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(f'${len(arg)}\r\n'.encode() + arg + b'\r\n')
+    return b''.join(parts)
+
+
+def _read_reply(stream) -> Any:
+    """Read a single RESP reply from a buffered stream."""
+    line = stream.readline()
+    if not line:
+        raise ConnectionError('Connection closed by key-value store')
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b'+':
+        return payload.decode()
+    if prefix == b'-':
+        return KeyValueError(payload.decode())
+    if prefix == b':':
+        return int(payload)
+    if prefix == b'$':
+        length = int(payload)
+        if length == -1:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2].decode()
+    if prefix == b'*':
+        length = int(payload)
+        if length == -1:
+            return None
+        return [_read_reply(stream) for _ in range(length)]
+    raise KeyValueError(f'Unexpected reply prefix {prefix!r}')
+
+
+class KeyValueClient:
+    """Thread-safe RESP client keeping one connection per thread."""
+
+    def __init__(self, url: str = 'redis://127.0.0.1:6379/0', timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.db = int((parsed.path or '/0').lstrip('/') or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = sock.makefile('rb')
+        self._local.sock, self._local.stream = sock, stream
+        if self.password:
+            self._call([('AUTH', self.password)])
+        if self.db:
+            self._call([('SELECT', self.db)])
+
+    def close(self):
+        """Close this thread's connection."""
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            try:
+                self._local.stream.close()
+                sock.close()
+            finally:
+                self._local.sock = self._local.stream = None
+
+    def _call(self, commands: List[Tuple]) -> List[Any]:
+        self._local.sock.sendall(b''.join(_encode_command(cmd) for cmd in commands))
+        replies = [_read_reply(self._local.stream) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, KeyValueError):
+                raise reply
+        return replies
+
+    def pipeline(self, *commands: Tuple) -> List[Any]:
+        """Send several commands in one round trip and return their replies."""
+        if getattr(self._local, 'sock', None) is None:
+            self._connect()
+        try:
+            return self._call(list(commands))
+        except (OSError, ConnectionError):
+            self.close()
+            raise
+
+    def transaction(self, *commands: Tuple) -> List[Any]:
+        """Run commands atomically with MULTI/EXEC in one round trip."""
+        replies = self.pipeline(('MULTI',), *commands, ('EXEC',))
+        return replies[-1]
+
+    def execute(self, *args) -> Any:
+        """Run a single command."""
+        return self.pipeline(args)[0]
+
+
+class _Status(str):
+    """Simple-string reply such as OK or PONG."""
+
+
+OK = _Status('OK')
+
+
+class _Store:
+    """In-memory keyspace with per-key expiry used by the stand-in server."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+
+    def _alive(self, key) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+            return False
+        return key in self.data
+
+    def execute(self, args: List[str]) -> Any:
+        command, args = args[0].upper(), args[1:]
+        handler = getattr(self, f'cmd_{command.lower()}', None)
+        if handler is None:
+            return KeyValueError(f"ERR unknown command '{command}'")
+        try:
+            return handler(*args)
+        except (TypeError, ValueError):
+            return KeyValueError(f"ERR wrong arguments for '{command}'")
+
+    def cmd_ping(self, *args):
+        return args[0] if args else _Status('PONG')
+
+    def cmd_select(self, db):
+        return OK
+
+    def cmd_auth(self, *args):
+        return OK
+
+    def cmd_get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        self.data[key] = value
+        self.expires.pop(key, None)
+        options = [option.upper() for option in options]
+        if 'EX' in options:
+            seconds = int(options[options.index('EX') + 1])
+            self.expires[key] = time.monotonic() + seconds
+        return OK
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, 1)
+
+    def cmd_incrby(self, key, amount):
+        value = int(self.data[key]) if self._alive(key) else 0
+        value += int(amount)
+        self.data[key] = str(value)
+        return value
+
+    def cmd_expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.monotonic() + int(seconds)
+        return 1
+
+    def cmd_ttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires_at = self.expires.get(key)
+        return -1 if expires_at is None else max(0, int(expires_at - time.monotonic()))
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        self.expires.clear()
+        return OK
+
+
+def _encode_reply(reply) -> bytes:
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, KeyValueError):
+        return f'-{reply}\r\n'.encode()
+    if isinstance(reply, bool):
+        return f':{int(reply)}\r\n'.encode()
+    if isinstance(reply, int):
+        return f':{reply}\r\n'.encode()
+    if isinstance(reply, list):
+        return f'*{len(reply)}\r\n'.encode() + b''.join(_encode_reply(item) for item in reply)
+    if isinstance(reply, _Status):
+        return f'+{reply}\r\n'.encode()
+    data = str(reply).encode()
+    return f'${len(data)}\r\n'.encode() + data + b'\r\n'
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        queued = None
+        while True:
+            try:
+                request = _read_reply(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            if not isinstance(request, list) or not request:
+                return
+
+            command = request[0].upper()
+            store = self.server.store
+            if command == 'MULTI':
+                queued, reply = [], OK
+            elif command == 'EXEC':
+                with store.lock:
+                    reply = [store.execute(args) for args in (queued or [])]
+                queued = None
+            elif command == 'DISCARD':
+                queued, reply = None, OK
+            elif queued is not None:
+                queued.append(request)
+                reply = _Status('QUEUED')
+            else:
+                with store.lock:
+                    reply = store.execute(request)
+            self.wfile.write(_encode_reply(reply))
+
+
+class KeyValueServer(socketserver.ThreadingTCPServer):
+    """Local stand-in for a shared key-value store (development and testing only)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 6379):
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+
+    def start_background(self) -> threading.Thread:
+        """Serve from a daemon thread and return it."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,297 @@
+"""
+Lockout engine for login attempt tracking with pluggable counting backends
+"""
+import logging
+import threading
+from collections import OrderedDict, deque, namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func
+
+from app.utils.kv_store import KeyValueClient, KeyValueError
+
+logger = logging.getLogger(__name__)
+
+LockoutStatus = namedtuple('LockoutStatus', ['locked', 'remaining_attempts', 'unlock_at'])
+
+
+def minutes_until(unlock_at: Optional[datetime]) -> int:
+    """Round the time left until ``unlock_at`` up to whole minutes."""
+    if unlock_at is None:
+        return 0
+    seconds = (unlock_at - datetime.utcnow()).total_seconds()
+    return int(seconds / 60) + 1 if seconds > 0 else 0
+
+
+class LockoutBackend:
+    """Interface for counting failed login attempts per IP address."""
+
+    name = None
+
+    def __init__(self, max_attempts=5, window_minutes=15):
+        self.max_attempts = max_attempts
+        self.window = timedelta(minutes=window_minutes)
+
+    def record_failure(self, ip_address, attempted_at=None):
+        """Record a failed attempt for an IP address."""
+        raise NotImplementedError
+
+    def status(self, ip_address) -> LockoutStatus:
+        """Get (locked, remaining_attempts, unlock_at) for an IP address."""
+        raise NotImplementedError
+
+    def load_from_database(self):
+        """Seed backend state from the login_attempts table, if it keeps any."""
+        return 0
+
+    def clear(self):
+        """Drop all tracked state."""
+
+    def _status_from(self, failed_count, last_failed_at) -> LockoutStatus:
+        """Build a status from a failure count and the newest failure time."""
+        if failed_count >= self.max_attempts and last_failed_at is not None:
+            unlock_at = last_failed_at + self.window
+            if unlock_at > datetime.utcnow():
+                return LockoutStatus(True, 0, unlock_at)
+        return LockoutStatus(False, max(0, self.max_attempts - failed_count), None)
+
+
+class SQLLockoutBackend(LockoutBackend):
+    """
+    Count failures straight from the login_attempts table.
+
+    Always consistent across workers and nodes, at the cost of one aggregate
+    query per check.
+    """
+
+    name = 'sql'
+
+    def record_failure(self, ip_address, attempted_at=None):
+        """Nothing to do: the attempt row is the counter."""
+
+    def status(self, ip_address) -> LockoutStatus:
+        from app import db
+        from app.models.login_attempt import LoginAttempt
+
+        cutoff = datetime.utcnow() - self.window
+        failed_count, last_failed_at = db.session.query(
+            func.count(LoginAttempt.id), func.max(LoginAttempt.attempted_at)
+        ).filter(
+            LoginAttempt.ip_address == ip_address,
+            LoginAttempt.success == False,
+            LoginAttempt.attempted_at >= cutoff
+        ).one()
+        return self._status_from(failed_count, last_failed_at)
+
+
+class MemoryLockoutBackend(LockoutBackend):
+    """
+    Per-IP sliding-window counter of failed login attempts kept in process memory.
+
+    Each tracked IP holds at most ``max_attempts`` failure timestamps, which is
+    all that is needed to decide whether the window is full. Entries expire once
+    their newest failure falls out of the window, and the number of tracked IPs
+    is capped so a spray of unique addresses cannot grow memory without bound.
+    Counters are private to the worker process, so each worker only sees the
+    failures it handled itself plus what was loaded at startup.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_attempts=5, window_minutes=15, max_entries=10000):
+        super().__init__(max_attempts, window_minutes)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Drop all tracked state."""
+        with self._lock:
+            self._entries.clear()
+
+    def load_from_database(self):
+        """
+        Seed the counters from failed attempts still inside the lockout window.
+
+        Returns:
+            Number of failed attempts loaded
+        """
+        from app import db
+        from app.models.login_attempt import LoginAttempt
+
+        cutoff = datetime.utcnow() - self.window
+        rows = db.session.query(LoginAttempt.ip_address, LoginAttempt.attempted_at).filter(
+            LoginAttempt.success == False,
+            LoginAttempt.attempted_at >= cutoff
+        ).order_by(LoginAttempt.attempted_at)
+
+        self.clear()
+        loaded = 0
+        for ip_address, attempted_at in rows:
+            self.record_failure(ip_address, attempted_at)
+            loaded += 1
+        return loaded
+
+    def record_failure(self, ip_address, attempted_at=None):
+        """Record a failed attempt for an IP address."""
+        attempted_at = attempted_at or datetime.utcnow()
+        with self._lock:
+            failures = self._entries.get(ip_address)
+            if failures is None:
+                failures = deque(maxlen=self.max_attempts)
+                self._entries[ip_address] = failures
+            else:
+                self._entries.move_to_end(ip_address)
+            failures.append(attempted_at)
+            self._evict(attempted_at - self.window)
+
+    def status(self, ip_address) -> LockoutStatus:
+        """
+        Get the lockout state of an IP address in one lookup.
+
+        Returns:
+            LockoutStatus of (locked, remaining_attempts, unlock_at)
+        """
+        now = datetime.utcnow()
+        cutoff = now - self.window
+        with self._lock:
+            failures = self._entries.get(ip_address)
+            if not failures:
+                return LockoutStatus(False, self.max_attempts, None)
+
+            recent = [attempted_at for attempted_at in failures if attempted_at >= cutoff]
+            if not recent:
+                del self._entries[ip_address]
+                return LockoutStatus(False, self.max_attempts, None)
+
+        return self._status_from(len(recent), recent[-1])
+
+    def _evict(self, cutoff):
+        """Drop expired entries from the least recently updated end, then enforce the size cap."""
+        while self._entries:
+            ip_address, failures = next(iter(self._entries.items()))
+            if failures and failures[-1] >= cutoff:
+                break
+            del self._entries[ip_address]
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class KeyValueLockoutBackend(LockoutBackend):
+    """
+    Share failure counters between workers and nodes through a key-value store.
+
+    The window is split into fixed buckets, each an atomically incremented key
+    that expires on its own, so a check is one MGET and a failure one MULTI/EXEC
+    round trip. Counting whole buckets can hold an IP up to one bucket longer
+    than the exact window. If the store is unreachable the check falls back to
+    the SQL backend rather than failing open.
+    """
+
+    name = 'kv'
+
+    def __init__(self, max_attempts=5, window_minutes=15, url='redis://127.0.0.1:6379/0',
+                 prefix='lockout', buckets=15, timeout=0.5):
+        super().__init__(max_attempts, window_minutes)
+        self.client = KeyValueClient(url, timeout=timeout)
+        self.prefix = prefix
+        self.bucket_seconds = max(1, int(self.window.total_seconds()) // buckets)
+        self.fallback = SQLLockoutBackend(max_attempts, window_minutes)
+
+    def _bucket_keys(self, ip_address, now):
+        window_seconds = int(self.window.total_seconds())
+        current = int(now.timestamp()) // self.bucket_seconds
+        first = (int(now.timestamp()) - window_seconds) // self.bucket_seconds
+        return [f'{self.prefix}:{ip_address}:{bucket}' for bucket in range(first, current + 1)]
+
+    def record_failure(self, ip_address, attempted_at=None):
+        attempted_at = attempted_at or datetime.utcnow()
+        bucket = int(attempted_at.replace(tzinfo=timezone.utc).timestamp()) // self.bucket_seconds
+        bucket_key = f'{self.prefix}:{ip_address}:{bucket}'
+        ttl = int(self.window.total_seconds()) + self.bucket_seconds
+        try:
+            self.client.transaction(
+                ('INCR', bucket_key),
+                ('EXPIRE', bucket_key, ttl),
+                ('SET', f'{self.prefix}:{ip_address}:last', attempted_at.isoformat(), 'EX', ttl),
+            )
+        except (OSError, ConnectionError, KeyValueError) as e:
+            logger.warning(f"Lockout store unavailable, failure not shared: {e}")
+
+    def status(self, ip_address) -> LockoutStatus:
+        now = datetime.now(timezone.utc)
+        keys = self._bucket_keys(ip_address, now) + [f'{self.prefix}:{ip_address}:last']
+        try:
+            values = self.client.execute('MGET', *keys)
+        except (OSError, ConnectionError, KeyValueError) as e:
+            logger.warning(f"Lockout store unavailable, using SQL backend: {e}")
+            return self.fallback.status(ip_address)
+
+        failed_count = sum(int(value) for value in values[:-1] if value)
+        last_failed_at = datetime.fromisoformat(values[-1]) if values[-1] else None
+        return self._status_from(failed_count, last_failed_at)
+
+    def clear(self):
+        """Shared state is left to expire on its own."""
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (SQLLockoutBackend, MemoryLockoutBackend, KeyValueLockoutBackend)
+}
+
+
+class LockoutEngine:
+    """Login lockout facade that delegates to the configured backend."""
+
+    def __init__(self):
+        self.backend = MemoryLockoutBackend()
+
+    def init_app(self, app):
+        """Build the backend selected by LOCKOUT_BACKEND."""
+        name = app.config.get('LOCKOUT_BACKEND', 'sql')
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown LOCKOUT_BACKEND '{name}', expected one of {sorted(BACKENDS)}")
+
+        options = {
+            'max_attempts': app.config.get('MAX_LOGIN_ATTEMPTS', 5),
+            'window_minutes': app.config.get('LOGIN_LOCKOUT_MINUTES', 15),
+        }
+        if name == 'memory':
+            options['max_entries'] = app.config.get('LOCKOUT_MAX_TRACKED_IPS', 10000)
+        elif name == 'kv':
+            options['url'] = app.config.get('LOCKOUT_KV_URL', 'redis://127.0.0.1:6379/0')
+            options['prefix'] = app.config.get('LOCKOUT_KV_PREFIX', 'lockout')
+
+        self.backend = BACKENDS[name](**options)
+        app.extensions['lockout_engine'] = self
+
+    def record_failure(self, ip_address, attempted_at=None):
+        """Record a failed attempt for an IP address."""
+        self.backend.record_failure(ip_address, attempted_at)
+
+    def status(self, ip_address) -> LockoutStatus:
+        """Get the lockout state of an IP address in one lookup."""
+        return self.backend.status(ip_address)
+
+    def load_from_database(self):
+        """Seed backend state from recent failed attempts."""
+        return self.backend.load_from_database()
+
+    def clear(self):
+        """Drop all tracked state."""
+        self.backend.clear()
+
+
+# Initialize lockout engine instance
+lockout_engine = LockoutEngine()
+
+
+def init_lockout(app):
+    """Initialize the lockout engine with the Flask app."""
+    lockout_engine.init_app(app)
@@ -0,0 +1,247 @@
+"""
+Streaming CSV export of admin log tables
+"""
+import csv
+import io
+import zlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from app import db
+from app.models.contact import Contact
+from app.models.email_verification import EmailVerification
+from app.models.login_attempt import LoginAttempt
+from app.models.user import User
+from app.utils.archive import ARCHIVED_TABLES, iter_archived_rows
+from app.utils.pagination import is_nullable, older_than
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+ExportSpec = namedtuple('ExportSpec', ['model', 'time_column', 'header', 'columns', 'format_row', 'joins'])
+
+
+def _yes_no(value):
+    return 'Yes' if value else 'No'
+
+
+def _timestamp(value):
+    return value.strftime(DATE_FORMAT) if value else ''
+
+
+EXPORTS = {
+    'login_attempts': ExportSpec(
+        model=LoginAttempt,
+        time_column=LoginAttempt.attempted_at,
+        header=['Username/Email', 'IP Address', 'Success', 'Attempted At'],
+        columns=[LoginAttempt.username_or_email, LoginAttempt.ip_address,
+                 LoginAttempt.success, LoginAttempt.attempted_at],
+        format_row=lambda row: [
+            row.username_or_email or 'Unknown',
+            row.ip_address,
+            'Success' if row.success else 'Failed',
+            _timestamp(row.attempted_at),
+        ],
+        joins=(),
+    ),
+    'user_registrations': ExportSpec(
+        model=User,
+        time_column=User.created_at,
+        header=['Username', 'Email', 'Active', 'Admin', 'Created At'],
+        columns=[User.username, User.email, User.active, User.is_admin, User.created_at],
+        format_row=lambda row: [
+            row.username,
+            row.email,
+            _yes_no(row.active),
+            _yes_no(row.is_admin),
+            _timestamp(row.created_at),
+        ],
+        joins=(),
+    ),
+    'email_verifications': ExportSpec(
+        model=EmailVerification,
+        time_column=EmailVerification.created_at,
+        header=['Email', 'User', 'Verified', 'Expired', 'Created At'],
+        columns=[EmailVerification.email, User.username.label('username'),
+                 EmailVerification.is_verified, EmailVerification.expires_at,
+                 EmailVerification.created_at],
+        format_row=lambda row: [
+            row.email,
+            row.username or 'Unknown',
+            _yes_no(row.is_verified),
+            _yes_no(datetime.utcnow() > row.expires_at),
+            _timestamp(row.created_at),
+        ],
+        joins=((User, EmailVerification.user_id == User.id),),
+    ),
+    'contact_submissions': ExportSpec(
+        model=Contact,
+        time_column=Contact.created_at,
+        header=['Name', 'Email', 'Subject', 'Message', 'Created At'],
+        columns=[Contact.name, Contact.email, Contact.subject, Contact.message, Contact.created_at],
+        format_row=lambda row: [
+            row.name,
+            row.email,
+            row.subject,
+            row.message,
+            _timestamp(row.created_at),
+        ],
+        joins=(),
+    ),
+}
+
+
+def build_filters(log_type, filters: Dict[str, Any]) -> List:
+    """
+    Translate export filter parameters into SQL conditions.
+
+    Supported keys: ``start`` and ``end`` (dates, end inclusive) for every log
+    type, ``status`` (success/failed) and ``ip`` for login attempts, ``status``
+    (active/inactive/admin) for users, ``status`` (verified/pending) for email
+    verifications and ``status`` (read/unread) for contact submissions.
+    """
+    spec = EXPORTS[log_type]
+    model = spec.model
+    conditions = []
+
+    if filters.get('start'):
+        conditions.append(spec.time_column >= filters['start'])
+    if filters.get('end'):
+        conditions.append(spec.time_column < filters['end'] + timedelta(days=1))
+
+    status = filters.get('status')
+    if log_type == 'login_attempts':
+        if status == 'success':
+            conditions.append(model.success == True)
+        elif status == 'failed':
+            conditions.append(model.success == False)
+        if filters.get('ip'):
+            conditions.append(model.ip_address == filters['ip'])
+    elif log_type == 'user_registrations':
+        if status == 'active':
+            conditions.append(model.active == True)
+        elif status == 'inactive':
+            conditions.append(model.active == False)
+        elif status == 'admin':
+            conditions.append(model.is_admin == True)
+    elif log_type == 'email_verifications':
+        if status == 'verified':
+            conditions.append(model.is_verified == True)
+        elif status == 'pending':
+            conditions.append(model.is_verified == False)
+    elif log_type == 'contact_submissions':
+        if status == 'read':
+            conditions.append(model.is_read == True)
+        elif status == 'unread':
+            conditions.append(model.is_read == False)
+
+    return conditions
+
+
+def iter_rows(log_type, filters: Optional[Dict[str, Any]] = None, batch_size=1000) -> Iterator:
+    """
+    Yield export rows newest first using keyset iteration over (time, id).
+    Rows with a NULL time come last, in one trailing pass ordered by id.
+
+    Each batch is a fresh bounded query that selects only the exported columns,
+    so memory stays flat regardless of table size and no ORM objects are built.
+    Every batch seeks the time index from the previous batch's last row.
+    """
+    spec = EXPORTS[log_type]
+    model_id = spec.model.id
+    time_column = spec.time_column
+    conditions = build_filters(log_type, filters or {})
+
+    def batches(bound, order_by):
+        last = None
+        while True:
+            query = select(*spec.columns, model_id.label('_id'), time_column.label('_time'))
+            for target, onclause in spec.joins:
+                query = query.outerjoin(target, onclause)
+            query = query.where(*conditions, *bound(last)).order_by(*order_by).limit(batch_size)
+
+            rows = db.session.execute(query).all()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+
+    def timed(last):
+        if last is None:
+            return (time_column.isnot(None),)
+        return older_than(time_column, model_id, last._time, last._id)
+
+    def untimed(last):
+        if last is None:
+            return (time_column.is_(None),)
+        return (time_column.is_(None), model_id < last._id)
+
+    yield from batches(timed, (time_column.desc(), model_id.desc()))
+    if is_nullable(time_column):
+        yield from batches(untimed, (model_id.desc(),))
+
+
+def archive_predicate(log_type, filters: Dict[str, Any]):
+    """The non-date filters of ``build_filters`` as a check on archived rows."""
+    status = filters.get('status')
+    ip = filters.get('ip')
+
+    def matches(row):
+        if log_type == 'login_attempts':
+            if (status == 'success' and not row.success) or (status == 'failed' and row.success):
+                return False
+            if ip and row.ip_address != ip:
+                return False
+        elif log_type == 'contact_submissions':
+            if (status == 'read' and not row.is_read) or (status == 'unread' and row.is_read):
+                return False
+        return True
+
+    return matches
+
+
+def iter_export_rows(log_type, filters: Optional[Dict[str, Any]] = None, batch_size=1000,
+                     include_archive=False) -> Iterator:
+    """
+    Yield export rows newest first: the live table, then (optionally) the archive.
+
+    Archived rows are older than everything maintenance has left in the table,
+    so appending them keeps the newest-first order.
+    """
+    filters = filters or {}
+    yield from iter_rows(log_type, filters, batch_size=batch_size)
+    if include_archive and log_type in ARCHIVED_TABLES:
+        yield from iter_archived_rows(
+            log_type,
+            start=filters['start'].date() if filters.get('start') else None,
+            end=filters['end'].date() if filters.get('end') else None,
+            predicate=archive_predicate(log_type, filters),
+        )
+
+
+def generate_csv(log_type, rows: Iterator, flush_bytes=64 * 1024) -> Iterator[str]:
+    """Encode rows as CSV text, yielding chunks of roughly ``flush_bytes``."""
+    spec = EXPORTS[log_type]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(spec.header)
+    for row in rows:
+        writer.writerow(spec.format_row(row))
+        if buffer.tell() >= flush_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterator[str], level=6) -> Iterator[bytes]:
+    """Compress a stream of text chunks into a gzip stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
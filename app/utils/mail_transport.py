@@ -0,0 +1,212 @@
+"""
+Pooled SMTP transport over Flask-Mail
+"""
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from flask_mail import Connection
+
+
+class MailPoolTimeout(Exception):
+    """Raised when no SMTP connection became free within MAIL_POOL_TIMEOUT."""
+
+
+class _PooledConnection:
+    """A Flask-Mail connection plus the bookkeeping the pool needs."""
+
+    def __init__(self, state, timeout):
+        self.connection = Connection(state)
+        self.connection.num_emails = 0
+        self.connection.host = None if state.suppress else self.connection.configure_host()
+        if self.connection.host is not None and self.connection.host.sock is not None:
+            self.connection.host.sock.settimeout(timeout)
+        self.created_at = self.last_used = time.monotonic()
+        self.messages = 0
+
+    def is_alive(self):
+        """NOOP round trip; False if the server dropped the connection."""
+        host = self.connection.host
+        if host is None:
+            return True
+        try:
+            return host.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def close(self):
+        host = self.connection.host
+        self.connection.host = None
+        if host is not None:
+            try:
+                host.quit()
+            except (smtplib.SMTPException, OSError):
+                host.close()
+
+
+class MailTransport:
+    """
+    Small pool of authenticated SMTP connections shared by a process.
+
+    Opening an SMTP connection costs a TCP connect, STARTTLS handshake and
+    AUTH round trip, which used to be paid by every ``mail.send()``. Here
+    connections are reused: at most ``pool_size`` are open at once, one idle
+    for more than ``health_check_after`` seconds is checked with NOOP before
+    use, and one idle for more than ``idle_timeout`` (servers drop idle
+    clients after a few minutes) or that has sent ``max_messages`` is closed
+    instead of reused.
+    """
+
+    def __init__(self, pool_size=2, idle_timeout=60, health_check_after=10, max_messages=100,
+                 checkout_timeout=30, socket_timeout=30):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.max_messages = max_messages
+        self.checkout_timeout = checkout_timeout
+        self.socket_timeout = socket_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def init_app(self, app):
+        """Apply MAIL_POOL_* settings."""
+        self.close_all()
+        self.pool_size = app.config.get('MAIL_POOL_SIZE', 2)
+        self.idle_timeout = app.config.get('MAIL_POOL_IDLE_TIMEOUT', 60)
+        self.health_check_after = app.config.get('MAIL_POOL_HEALTH_CHECK_AFTER', 10)
+        self.max_messages = app.config.get('MAIL_POOL_MAX_MESSAGES', 100)
+        self.checkout_timeout = app.config.get('MAIL_POOL_TIMEOUT', 30)
+        self.socket_timeout = app.config.get('MAIL_TIMEOUT', 30)
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        app.extensions['mail_transport'] = self
+
+    def _checkout(self):
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise MailPoolTimeout(f"No SMTP connection free after {self.checkout_timeout}s")
+        try:
+            self.prune()
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    pooled = _PooledConnection(current_app.extensions['mail'], self.socket_timeout)
+                    self.opened += 1
+                    return pooled
+                if time.monotonic() - pooled.last_used < self.health_check_after or pooled.is_alive():
+                    self.reused += 1
+                    return pooled
+                self._discard(pooled)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, pooled, healthy=True):
+        try:
+            if healthy and pooled.messages < self.max_messages:
+                pooled.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(pooled)
+            else:
+                self._discard(pooled)
+        finally:
+            self._slots.release()
+
+    def _discard(self, pooled):
+        self.discarded += 1
+        pooled.close()
+
+    def prune(self):
+        """Close idle connections past ``idle_timeout``."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [pooled for pooled in self._idle if pooled.last_used < cutoff]
+            self._idle = [pooled for pooled in self._idle if pooled.last_used >= cutoff]
+        for pooled in expired:
+            self._discard(pooled)
+
+    def close_all(self):
+        """Close every idle connection (e.g. at worker shutdown)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            pooled.close()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out one pooled connection for a run of sends.
+
+        Yields a ``send(message)`` function. A connection the server dropped
+        while idle is replaced and the message retried once. SMTP error
+        replies for one message are raised to the caller but leave the
+        connection usable (smtplib resets the transaction); any other error
+        leaving the block closes it.
+        """
+        holder = [self._checkout()]
+        healthy = True
+
+        def send(message):
+            try:
+                self._send(holder[0], message)
+            except smtplib.SMTPServerDisconnected:
+                self._discard(holder[0])
+                holder[0] = _PooledConnection(current_app.extensions['mail'], self.socket_timeout)
+                self.opened += 1
+                self._send(holder[0], message)
+
+        try:
+            yield send
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            raise
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self._checkin(holder[0], healthy)
+
+    def send_many(self, messages):
+        """
+        Send messages over one pooled connection.
+
+        Returns:
+            List with None for each sent message or the SMTP error it was rejected with
+        """
+        results = []
+        with self.connection() as send:
+            for message in messages:
+                try:
+                    send(message)
+                    results.append(None)
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                    results.append(e)
+        return results
+
+    def send(self, message):
+        """Send one message over a pooled connection, raising on failure."""
+        with self.connection() as send:
+            send(message)
+
+    def _send(self, pooled, message):
+        message.send(pooled.connection)
+        pooled.messages += 1
+
+    def stats(self):
+        """Connections opened, reused and discarded, and how many are idle."""
+        with self._lock:
+            idle = len(self._idle)
+        return {'opened': self.opened, 'reused': self.reused, 'discarded': self.discarded, 'idle': idle}
+
+
+# Initialize mail transport instance
+mail_transport = MailTransport()
+
+
+def init_mail_transport(app):
+    """Initialize the pooled mail transport with the Flask app."""
+    mail_transport.init_app(app)
@@ -0,0 +1,250 @@
+"""
+Batched maintenance sweeps for expired tokens and old log rows
+
+A single ``DELETE ... WHERE created_at < cutoff`` over a large table holds
+SQLite's write lock until every matching row is gone, stalling logins and
+sign-ups for the duration. Sweeps here delete in bounded batches instead:
+select up to ``batch_size`` matching ids, delete them, commit, pause, repeat.
+Each commit releases the lock so other writers get in between batches.
+Token deactivation is a single set-based UPDATE rather than a loop over ORM
+objects.
+
+Run with ``flask maintenance run`` (e.g. from cron) or keep a
+``flask maintenance work`` process running.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app import db
+
+
+class SweepResult(namedtuple('SweepResult', ['task', 'rows', 'batches', 'seconds', 'complete'])):
+    __slots__ = ()
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def chunked_delete(model, criteria, batch_size=None, pause=None, max_seconds=None, progress=None,
+                   task=None, stop_event=None):
+    """
+    Delete rows of ``model`` matching ``criteria`` in committed batches.
+
+    Args:
+        model: Model class with an integer ``id`` primary key
+        criteria: List of filter expressions
+        batch_size: Rows per batch (default: MAINTENANCE_BATCH_SIZE)
+        pause: Seconds to sleep between batches (default: MAINTENANCE_BATCH_PAUSE)
+        max_seconds: Stop after this long even if rows remain (None: run to completion)
+        progress: Optional callback(rows_so_far, elapsed_seconds) after each batch
+        task: Name reported in the result
+        stop_event: Optional threading.Event checked between batches
+
+    Returns:
+        SweepResult; ``complete`` is False when max_seconds or stop_event cut the sweep short
+    """
+    batch_size = batch_size or current_app.config.get('MAINTENANCE_BATCH_SIZE', 1000)
+    pause = current_app.config.get('MAINTENANCE_BATCH_PAUSE', 0.05) if pause is None else pause
+    started = time.perf_counter()
+    rows = batches = 0
+    complete = True
+
+    while True:
+        ids = [row[0] for row in db.session.query(model.id).filter(*criteria).limit(batch_size)]
+        if not ids:
+            break
+        rows += model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        batches += 1
+        elapsed = time.perf_counter() - started
+        if progress:
+            progress(rows, elapsed)
+        if len(ids) < batch_size:
+            break
+        if (max_seconds is not None and elapsed >= max_seconds) or (stop_event and stop_event.is_set()):
+            complete = False
+            break
+        if pause:
+            if stop_event:
+                stop_event.wait(pause)
+            else:
+                time.sleep(pause)
+
+    return SweepResult(task or model.__tablename__, rows, batches, time.perf_counter() - started, complete)
+
+
+def bulk_update(model, criteria, values, task=None):
+    """Set ``values`` on every row matching ``criteria`` in one UPDATE statement."""
+    started = time.perf_counter()
+    rows = model.query.filter(*criteria).update(values, synchronize_session=False)
+    db.session.commit()
+    return SweepResult(task or model.__tablename__, rows, 1, time.perf_counter() - started, True)
+
+
+def _days_ago(config_key, default):
+    return datetime.utcnow() - timedelta(days=current_app.config.get(config_key, default))
+
+
+def _login_attempts_criteria():
+    from app.models.login_attempt import LoginAttempt
+
+    return LoginAttempt, [LoginAttempt.attempted_at < _days_ago('LOGIN_ATTEMPT_RETENTION_DAYS', 30)]
+
+
+def _email_verifications_criteria():
+    from app.models.email_verification import EmailVerification
+
+    return EmailVerification, [
+        EmailVerification.expires_at < _days_ago('EMAIL_VERIFICATION_RETENTION_DAYS', 7),
+        EmailVerification.is_verified == False,
+    ]
+
+
+def _password_reset_tokens_criteria():
+    from app.models.user import PasswordResetToken
+
+    return PasswordResetToken, [
+        PasswordResetToken.expires_at < _days_ago('PASSWORD_RESET_RETENTION_DAYS', 7),
+    ]
+
+
+def _contact_submissions_criteria():
+    from app.models.contact import Contact
+
+    return Contact, [Contact.created_at < _days_ago('CONTACT_RETENTION_DAYS', 90)]
+
+
+def _email_outbox_criteria():
+    from app.models.email_outbox import OUTBOX_SENT, EmailOutbox
+
+    return EmailOutbox, [
+        EmailOutbox.status == OUTBOX_SENT,
+        EmailOutbox.sent_at < _days_ago('EMAIL_OUTBOX_RETENTION_DAYS', 7),
+    ]
+
+
+def _login_rollup_ips_criteria():
+    from app.models.login_rollup import LoginRollupIP
+
+    return LoginRollupIP, [
+        LoginRollupIP.resolution == 'hour',
+        LoginRollupIP.bucket_start < _days_ago('LOGIN_ROLLUP_IP_HOURLY_RETENTION_DAYS', 7),
+    ]
+
+
+def deactivate_expired_reset_tokens():
+    """Mark expired password reset tokens inactive (one UPDATE)."""
+    from app.models.user import PasswordResetToken
+
+    return bulk_update(
+        PasswordResetToken,
+        [PasswordResetToken.is_active == True, PasswordResetToken.expires_at < datetime.utcnow()],
+        {'is_active': False},
+        task='deactivate_reset_tokens',
+    )
+
+
+# Deletion sweeps: name -> (description, function returning (model, criteria))
+DELETE_SWEEPS = OrderedDict([
+    ('login_attempts', ('Login attempts older than LOGIN_ATTEMPT_RETENTION_DAYS', _login_attempts_criteria)),
+    ('email_verifications', ('Unverified email tokens expired EMAIL_VERIFICATION_RETENTION_DAYS ago',
+                             _email_verifications_criteria)),
+    ('password_reset_tokens', ('Password reset tokens expired PASSWORD_RESET_RETENTION_DAYS ago',
+                               _password_reset_tokens_criteria)),
+    ('contact_submissions', ('Contact submissions older than CONTACT_RETENTION_DAYS', _contact_submissions_criteria)),
+    ('email_outbox', ('Sent emails older than EMAIL_OUTBOX_RETENTION_DAYS', _email_outbox_criteria)),
+    ('login_rollup_ips', ('Hourly per-IP login rollups older than LOGIN_ROLLUP_IP_HOURLY_RETENTION_DAYS',
+                          _login_rollup_ips_criteria)),
+])
+
+TASK_NAMES = ['deactivate_reset_tokens'] + list(DELETE_SWEEPS)
+
+
+def sweep(name, **kwargs):
+    """
+    Run one deletion sweep by name (kwargs are passed to chunked_delete).
+
+    Login attempts and contact submissions are archived before they are
+    deleted unless ARCHIVE_ENABLED is off.
+    """
+    from app.utils.archive import ARCHIVED_TABLES, archive_and_prune, archive_enabled
+
+    if name in ARCHIVED_TABLES and archive_enabled():
+        return archive_and_prune(name, **kwargs)
+    model, criteria = DELETE_SWEEPS[name][1]()
+    return chunked_delete(model, criteria, task=name, **kwargs)
+
+
+def pending_counts():
+    """Rows each deletion sweep would remove (or archive) right now."""
+    counts = OrderedDict()
+    for name, (_, criteria_for) in DELETE_SWEEPS.items():
+        model, criteria = criteria_for()
+        counts[name] = db.session.query(model.id).filter(*criteria).count()
+    return counts
+
+
+def run_maintenance(tasks=None, max_seconds=None, progress=None, stop_event=None, **kwargs):
+    """
+    Run maintenance tasks in order.
+
+    Args:
+        tasks: Names from TASK_NAMES (default: all)
+        max_seconds: Overall time budget shared by the sweeps (None: run to completion)
+        progress: Optional callback(task, rows_so_far, elapsed_seconds)
+        stop_event: Optional threading.Event; stops between batches once set
+        kwargs: batch_size / pause overrides for chunked_delete
+
+    Returns:
+        List of SweepResult, one per task that ran
+    """
+    started = time.perf_counter()
+    results = []
+    for name in tasks or TASK_NAMES:
+        if stop_event is not None and stop_event.is_set():
+            break
+        remaining = None
+        if max_seconds is not None:
+            remaining = max_seconds - (time.perf_counter() - started)
+            if remaining <= 0:
+                break
+        if name == 'deactivate_reset_tokens':
+            result = deactivate_expired_reset_tokens()
+        else:
+            report = (lambda rows, elapsed, name=name: progress(name, rows, elapsed)) if progress else None
+            result = sweep(name, max_seconds=remaining, progress=report, stop_event=stop_event, **kwargs)
+        if result.rows:
+            current_app.logger.info(f"Maintenance {name}: {result.rows} rows in {result.seconds:.2f}s "
+                                    f"({result.rows_per_second:.0f} rows/s)")
+        results.append(result)
+    return results
+
+
+def run_worker(interval=None, once=False, stop_event=None):
+    """
+    Run every maintenance task, then sleep ``interval`` seconds, until stopped.
+
+    Returns:
+        Total rows affected per task
+    """
+    interval = interval or current_app.config.get('MAINTENANCE_INTERVAL', 3600)
+    stop_event = stop_event or threading.Event()
+    totals = OrderedDict((name, 0) for name in TASK_NAMES)
+    while not stop_event.is_set():
+        try:
+            for result in run_maintenance(stop_event=stop_event):
+                totals[result.task] += result.rows
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Maintenance worker error: {e}")
+        finally:
+            db.session.remove()
+        if once:
+            break
+        stop_event.wait(interval)
+    return totals
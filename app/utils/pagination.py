@@ -0,0 +1,194 @@
+"""
+Keyset (cursor) pagination for large admin listings
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from flask import current_app, request
+from sqlalchemy import func, or_
+
+from app import db
+
+
+def get_pagination_mode() -> str:
+    """Pagination mode for admin listings: 'offset' (numbered pages) or 'cursor'."""
+    mode = request.args.get('mode') or current_app.config.get('ADMIN_PAGINATION_MODE', 'offset')
+    return 'cursor' if mode == 'cursor' else 'offset'
+
+
+def encode_cursor(timestamp: Optional[datetime], row_id: int, direction: str) -> str:
+    """Encode a position (the timestamp may be NULL) and direction as an opaque URL-safe cursor."""
+    payload = json.dumps([timestamp.isoformat() if timestamp is not None else None, row_id, direction],
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]):
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Returns:
+        Tuple of (timestamp, row_id, direction), or None if missing or malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in ('next', 'prev'):
+            return None
+        return (datetime.fromisoformat(timestamp) if timestamp is not None else None), int(row_id), direction
+    except (ValueError, TypeError, json.JSONDecodeError):
+        return None
+
+
+class CursorPagination:
+    """
+    One page of a keyset-paginated query, newest first.
+
+    Exposes the attributes the shared pagination partial reads from
+    Flask-SQLAlchemy's Pagination where they still make sense. There is no
+    page number or exact count: ``total`` is an estimate when one was requested
+    and cheap to get, otherwise a lower bound.
+    """
+
+    mode = 'cursor'
+
+    def __init__(self, items, per_page, has_next, has_prev, next_cursor, prev_cursor, estimated_total=None):
+        self.items = items
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.estimated_total = estimated_total
+
+    @property
+    def total(self):
+        if self.estimated_total is not None:
+            return self.estimated_total
+        return len(self.items) + (1 if self.has_next else 0)
+
+    def to_dict(self):
+        """Pagination metadata for JSON responses."""
+        return {
+            'mode': self.mode,
+            'per_page': self.per_page,
+            'count': len(self.items),
+            'has_next': self.has_next,
+            'has_prev': self.has_prev,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+            'estimated_total': self.estimated_total,
+        }
+
+
+def estimate_row_count(id_column) -> int:
+    """Estimate a table's row count from its primary key range (two index lookups)."""
+    low, high = db.session.query(func.min(id_column), func.max(id_column)).one()
+    return 0 if high is None else high - low + 1
+
+
+def is_nullable(column) -> bool:
+    """Whether a mapped column (or column expression) can hold NULL."""
+    return bool(getattr(column.expression, 'nullable', True))
+
+
+def older_than(time_column, id_column, timestamp, row_id):
+    """
+    Conditions for rows older than (timestamp, row_id) in (time, id) order; NULL times never match.
+
+    Written as ``time <= ts AND (time < ts OR id < row_id)`` so the leading
+    bound is a range the time index can seek to; an ``OR time IS NULL`` branch
+    would turn every query into a scan from the top of the index.
+    """
+    return (time_column <= timestamp, or_(time_column < timestamp, id_column < row_id))
+
+
+def newer_than(time_column, id_column, timestamp, row_id):
+    """Conditions for rows newer than (timestamp, row_id); see ``older_than``."""
+    return (time_column >= timestamp, or_(time_column > timestamp, id_column > row_id))
+
+
+def _fetch_phases(phases, limit):
+    """Run ``phases`` (ordered, limit-less queries) in turn until ``limit`` rows are collected."""
+    rows = []
+    for phase in phases:
+        if len(rows) >= limit:
+            break
+        rows.extend(phase.limit(limit - len(rows)).all())
+    return rows
+
+
+def keyset_paginate(query, time_column, id_column, per_page, cursor=None, estimate_total=False):
+    """
+    Paginate ``query`` by (time_column, id_column) descending without OFFSET or COUNT.
+
+    Every page is an index range scan that starts right after the previous
+    page's boundary row, so deep pages cost the same as the first one.
+    For nullable time columns, rows with a NULL timestamp come last, ordered
+    by id; they are walked in a separate phase so the timed range stays seekable.
+
+    Args:
+        query: ORM query with filters applied (any ordering is replaced)
+        time_column: Timestamp column to order by
+        id_column: Primary key column breaking ties
+        per_page: Page size
+        cursor: Opaque cursor from a previous page, or None for the newest rows
+        estimate_total: Add an estimated total (only meaningful for unfiltered queries)
+
+    Returns:
+        CursorPagination
+    """
+    position = decode_cursor(cursor)
+    query = query.order_by(None)
+
+    nullable = is_nullable(time_column)
+    timed = query.filter(time_column.isnot(None)) if nullable else query
+    untimed = query.filter(time_column.is_(None))
+    newest_first = (time_column.desc(), id_column.desc())
+    oldest_first = (time_column.asc(), id_column.asc())
+    limit = per_page + 1
+
+    if position is None:
+        direction = 'next'
+        phases = [timed.order_by(*newest_first)]
+        if nullable:
+            phases.append(untimed.order_by(id_column.desc()))
+    else:
+        timestamp, row_id, direction = position
+        if direction == 'next':
+            if timestamp is None:
+                phases = [untimed.filter(id_column < row_id).order_by(id_column.desc())]
+            else:
+                phases = [timed.filter(*older_than(time_column, id_column, timestamp, row_id))
+                          .order_by(*newest_first)]
+                if nullable:
+                    phases.append(untimed.order_by(id_column.desc()))
+        else:
+            if timestamp is None:
+                phases = [untimed.filter(id_column > row_id).order_by(id_column.asc()),
+                          timed.order_by(*oldest_first)]
+            else:
+                phases = [timed.filter(*newer_than(time_column, id_column, timestamp, row_id))
+                          .order_by(*oldest_first)]
+    rows = _fetch_phases(phases, limit)
+
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    if direction == 'prev':
+        items.reverse()
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = position is not None, has_more
+
+    def cursor_for(item, cursor_direction):
+        return encode_cursor(getattr(item, time_column.key), getattr(item, id_column.key), cursor_direction)
+
+    next_cursor = cursor_for(items[-1], 'next') if items and has_next else None
+    prev_cursor = cursor_for(items[0], 'prev') if items and has_prev else None
+    estimated_total = estimate_row_count(id_column) if estimate_total else None
+
+    return CursorPagination(items, per_page, has_next, has_prev, next_cursor, prev_cursor, estimated_total)
@@ -0,0 +1,221 @@
+"""
+Bounded Argon2 hashing service with admission control
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from argon2 import DEFAULT_MEMORY_COST, DEFAULT_PARALLELISM, DEFAULT_TIME_COST, PasswordHasher
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+from flask import jsonify, render_template, request
+
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full; the request should be retried later."""
+
+    def __init__(self, retry_after=5):
+        super().__init__('Password hashing is at capacity')
+        self.retry_after = retry_after
+
+
+class LatencyStats:
+    """Count, total and recent-sample percentiles of a duration in milliseconds."""
+
+    def __init__(self, window=1024):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    def to_dict(self):
+        recent = sorted(self._recent)
+
+        def percentile(p):
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))], 2) if recent else 0.0
+
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(self.max_ms, 2),
+        }
+
+
+class HashingService:
+    """
+    Runs Argon2 hash/verify calls on a bounded thread pool.
+
+    argon2-cffi releases the GIL while hashing, so a pool sized to the CPU
+    count hashes in parallel while request threads wait. At most
+    ``max_workers + max_queue`` calls are admitted at once; beyond that
+    callers get ``HashingOverloaded`` immediately, which the app turns into a
+    503 with Retry-After, instead of every worker thread queueing behind a
+    burst of login attempts. With ``max_workers`` of 0 hashing runs inline.
+    """
+
+    def __init__(self, max_workers=0, max_queue=0, retry_after=5):
+        self.hasher = PasswordHasher()
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._inline = False
+        self._configure(max_workers, max_queue)
+        self.rejected = 0
+        self.hash_latency = LatencyStats()
+        self.queue_wait = LatencyStats()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _configure(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        # The pool is started on first use in each process (see _pool)
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._in_flight = 0
+
+    def _after_fork(self):
+        """
+        Forget the parent's pool in a forked child: its threads do not exist
+        here, so work submitted to it would never run.
+        """
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._in_flight = 0
+
+    def _pool(self):
+        """This process's executor and admission semaphore, created on first use."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='argon2')
+                self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+                self._in_flight = 0
+                self._pid = os.getpid()
+            return self._executor, self._slots
+
+    @contextmanager
+    def inline(self):
+        """
+        Hash on the calling thread for the duration, e.g. while the app is
+        created, so a preloading gunicorn master never starts pool threads.
+        """
+        previous, self._inline = self._inline, True
+        try:
+            yield
+        finally:
+            self._inline = previous
+
+    def init_app(self, app):
+        """Apply ARGON2_* cost and PASSWORD_HASH_* pool settings and register the 503 handler."""
+        self.hasher = PasswordHasher(
+            time_cost=app.config.get('ARGON2_TIME_COST', DEFAULT_TIME_COST),
+            memory_cost=app.config.get('ARGON2_MEMORY_COST', DEFAULT_MEMORY_COST),
+            parallelism=app.config.get('ARGON2_PARALLELISM', DEFAULT_PARALLELISM),
+        )
+        if self._executor and self._pid == os.getpid():
+            self._executor.shutdown(wait=False)
+        workers = app.config.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+        self._configure(workers, app.config.get('PASSWORD_HASH_MAX_QUEUE', 8))
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 5)
+        app.register_error_handler(HashingOverloaded, _overloaded_response)
+        app.extensions['hashing_service'] = self
+
+    def hash(self, password):
+        """Hash a password with Argon2."""
+        return self._run(self.hasher.hash, password)
+
+    def verify(self, password_hash, password):
+        """Verify a password against an Argon2 hash; False on mismatch."""
+        try:
+            return self._run(self.hasher.verify, password_hash, password)
+        except VerifyMismatchError:
+            return False
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with different parameters than the current ones."""
+        try:
+            return self.hasher.check_needs_rehash(password_hash)
+        except InvalidHashError:
+            return True
+
+    def _run(self, func, *args):
+        if not self.max_workers or self._inline:
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._observe(self.hash_latency, started)
+
+        executor, slots = self._pool()
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingOverloaded(self.retry_after)
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            self._observe(self.queue_wait, submitted, started)
+            try:
+                return func(*args)
+            finally:
+                self._observe(self.hash_latency, started)
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return executor.submit(timed).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            slots.release()
+
+    def _observe(self, stats, started, finished=None):
+        elapsed_ms = ((finished or time.perf_counter()) - started) * 1000
+        with self._lock:
+            stats.observe(elapsed_ms)
+
+    def metrics(self):
+        """Pool configuration, current load, rejections and latency summaries."""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'queued': max(0, self._in_flight - self.max_workers),
+                'rejected': self.rejected,
+                'hash_latency': self.hash_latency.to_dict(),
+                'queue_wait': self.queue_wait.to_dict(),
+            }
+
+
+def _overloaded_response(error):
+    """503 with Retry-After for requests shed by the hashing service."""
+    if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        response = jsonify({'error': 'Server busy, please retry shortly.', 'retry_after': error.retry_after})
+    else:
+        response = render_template('errors/503.html', retry_after=error.retry_after)
+    return response, 503, {'Retry-After': str(error.retry_after)}
+
+
+# Initialize hashing service instance (inline until configured by the app)
+hashing_service = HashingService()
+
+
+def init_hashing(app):
+    """Initialize the hashing service with the Flask app."""
+    hashing_service.init_app(app)
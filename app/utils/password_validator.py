@@ -1,15 +1,200 @@
 """
 Password validation utility using zxcvbn for strength checking
 """
-from zxcvbn import zxcvbn
+import hashlib
+import hmac
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from typing import Tuple, List, Dict, Any
 
+from app.utils.breached_passwords import breached_passwords
+
+# Character rules checked before zxcvbn, compiled once
+CHARACTER_RULES = [
+    ('uppercase', re.compile(r'[A-Z]'), "Password must contain at least one uppercase letter."),
+    ('lowercase', re.compile(r'[a-z]'), "Password must contain at least one lowercase letter."),
+    ('digit', re.compile(r'\d'), "Password must contain at least one digit."),
+    ('special', re.compile(r'[^A-Za-z0-9]'), "Password must contain at least one special character."),
+]
+
+BREACHED_MESSAGE = "This password has appeared in a data breach. Please choose a different one."
+
+# zxcvbn result fields that are safe to cache (the rest echo parts of the password)
+_CACHED_FIELDS = ('score', 'guesses', 'guesses_log10', 'crack_times_seconds',
+                  'crack_times_display', 'feedback', 'calc_time')
+
+
+_zxcvbn = None
+_zxcvbn_lock = threading.Lock()
+
+
+def get_zxcvbn():
+    """
+    Import zxcvbn on first use.
+
+    Importing it builds ranked frequency dictionaries that take tens of
+    megabytes per process, which most requests (and serverless cold starts)
+    never need. Set ZXCVBN_PRELOAD to load them in ``create_app`` instead, so a
+    preloading gunicorn master shares them with its workers copy-on-write.
+    """
+    global _zxcvbn
+    if _zxcvbn is None:
+        with _zxcvbn_lock:
+            if _zxcvbn is None:
+                from zxcvbn import zxcvbn
+                _zxcvbn = zxcvbn
+    return _zxcvbn
+
+
+def _current_rss_kib() -> int:
+    """Resident set size of this process in KiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def preload_zxcvbn() -> Dict[str, Any]:
+    """
+    Load the zxcvbn dictionaries now and measure the cost.
+
+    Returns:
+        Dictionary with load_ms, rss_before_kib, rss_after_kib and whether it was already loaded
+    """
+    already_loaded = _zxcvbn is not None
+    rss_before = _current_rss_kib()
+    started = time.perf_counter()
+    get_zxcvbn()('warm-up', user_inputs=[])
+    return {
+        'already_loaded': already_loaded,
+        'load_ms': round((time.perf_counter() - started) * 1000, 1),
+        'rss_before_kib': rss_before,
+        'rss_after_kib': _current_rss_kib(),
+    }
+
+
+class StrengthScorer:
+    """
+    zxcvbn scoring with a bounded input size and an LRU of results.
+
+    zxcvbn's cost grows steeply with length (and it refuses input over 72
+    characters), so only the first ``max_scored_length`` characters are
+    scored. Characters appended to a password can only add guesses, which
+    makes the prefix score a lower bound on the real one.
+
+    Results are cached under an HMAC of (password, user_inputs) with a key
+    generated per process, and only the fields that do not echo the password
+    are kept, so neither raw passwords nor reversible digests are held.
+
+    ``score_within`` runs zxcvbn on a small pool with a deadline for callers
+    that must answer quickly; at most ``max_workers`` scorings run at once.
+    """
+
+    def __init__(self, max_scored_length=48, max_input_length=100, max_entries=1024, max_workers=2):
+        self.max_scored_length = max_scored_length
+        self.max_input_length = max_input_length
+        self.max_entries = max_entries
+        self.max_workers = max_workers
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def _normalize(self, password, user_inputs):
+        password = password[:self.max_scored_length]
+        user_inputs = [str(value)[:self.max_input_length] for value in (user_inputs or []) if value]
+        return password, user_inputs
+
+    def _cache_key(self, password, user_inputs):
+        message = '\0'.join([password] + list(user_inputs)).encode('utf-8', 'surrogatepass')
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def _cached(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def score(self, password: str, user_inputs: List[str] = None) -> Dict[str, Any]:
+        """
+        Score a password with zxcvbn.
+
+        Returns:
+            zxcvbn result limited to score, guesses, crack times, feedback and calc_time
+        """
+        password, user_inputs = self._normalize(password, user_inputs)
+        key = self._cache_key(password, user_inputs)
+        result = self._cached(key)
+        if result is not None:
+            return result
+
+        full_result = get_zxcvbn()(password, user_inputs=user_inputs)
+        result = {field: full_result[field] for field in _CACHED_FIELDS if field in full_result}
+
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def score_within(self, password: str, user_inputs: List[str] = None, budget_ms: float = 100):
+        """
+        Score a password, giving up after ``budget_ms``.
+
+        A scoring that misses the deadline keeps running and fills the cache,
+        so a repeated request for the same password is answered from it.
+
+        Returns:
+            Same as ``score``, or None if the budget ran out or every worker is busy
+        """
+        normalized = self._normalize(password, user_inputs)
+        result = self._cached(self._cache_key(*normalized))
+        if result is not None:
+            return result
+
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='zxcvbn')
+        try:
+            future = self._executor.submit(self.score, *normalized)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=budget_ms / 1000)
+        except TimeoutError:
+            return None
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Initialize strength scorer instance
+strength_scorer = StrengthScorer()
+
+
 class PasswordValidator:
     """Password validator with zxcvbn strength checking and basic requirements."""
     
     # Minimum password requirements
     MIN_LENGTH = 8
+    MAX_LENGTH = 128  # Bounds hashing and rule-check work per request
     MIN_SCORE = 2  # zxcvbn score (0-4), 2 = fair strength
     
     @classmethod
@@ -33,24 +218,25 @@ class PasswordValidator:
         # Basic length check
         if len(password) < cls.MIN_LENGTH:
             errors.append(f"Password must be at least {cls.MIN_LENGTH} characters long.")
+        elif len(password) > cls.MAX_LENGTH:
+            return False, [f"Password must be at most {cls.MAX_LENGTH} characters long."], {}
         
         # Check for basic character requirements
-        if not re.search(r'[A-Z]', password):
-            errors.append("Password must contain at least one uppercase letter.")
-        
-        if not re.search(r'[a-z]', password):
-            errors.append("Password must contain at least one lowercase letter.")
-        
-        if not re.search(r'\d', password):
-            errors.append("Password must contain at least one digit.")
-        
-        # Add special character requirement
-        if not re.search(r'[^A-Za-z0-9]', password):
-            errors.append("Password must contain at least one special character.")
+        for _, pattern, message in CHARACTER_RULES:
+            if not pattern.search(password):
+                errors.append(message)
+
+        # The password is rejected either way; skip the expensive zxcvbn pass
+        if errors:
+            return False, errors, {}
+
+        # Local breach corpus lookup (microseconds, no network)
+        if breached_passwords.is_breached(password):
+            return False, [BREACHED_MESSAGE], {}
 
         # Use zxcvbn for advanced strength checking
         try:
-            result = zxcvbn(password, user_inputs=user_inputs)
+            result = strength_scorer.score(password, user_inputs)
             
             # Check minimum score requirement
             if result['score'] < cls.MIN_SCORE:
@@ -79,23 +265,67 @@ class PasswordValidator:
             return is_valid, errors, {}
     
     @classmethod
-    def get_strength_info(cls, password: str, user_inputs: List[str] = None) -> Dict[str, Any]:
+    def check_rules(cls, password: str) -> List[Dict[str, Any]]:
+        """
+        Check the length and character requirements one by one.
+        
+        Returns:
+            List of dictionaries with rule, message and passed for each requirement
+        """
+        rules = [{
+            'rule': 'length',
+            'message': f"Password must be {cls.MIN_LENGTH}-{cls.MAX_LENGTH} characters long.",
+            'passed': cls.MIN_LENGTH <= len(password) <= cls.MAX_LENGTH,
+        }]
+        for rule, pattern, message in CHARACTER_RULES:
+            rules.append({'rule': rule, 'message': message, 'passed': bool(pattern.search(password))})
+        if breached_passwords.enabled:
+            rules.append({
+                'rule': 'not_breached',
+                'message': BREACHED_MESSAGE,
+                'passed': len(password) > cls.MAX_LENGTH or not breached_passwords.is_breached(password),
+            })
+        return rules
+    
+    @classmethod
+    def get_strength_info(cls, password: str, user_inputs: List[str] = None, budget_ms: float = None) -> Dict[str, Any]:
         """
         Get detailed password strength information for client-side display.
         
+        Args:
+            password: The password to check
+            user_inputs: List of user-specific inputs (username, email, name, etc.)
+            budget_ms: Give up on zxcvbn after this long and report strength 'pending'
+        
         Returns:
-            Dictionary with strength score, feedback, and crack time estimates
+            Dictionary with strength score, feedback, crack time estimates and rule results
         """
         if not password:
             return {
                 'score': 0,
                 'strength': 'empty',
                 'crack_time': 'instantly',
-                'feedback': {'warning': 'Password is required', 'suggestions': []}
+                'feedback': {'warning': 'Password is required', 'suggestions': []},
+                'rules': cls.check_rules(''),
+                'meets_requirements': False
             }
         
+        rules = cls.check_rules(password)
+        meets_rules = all(rule['passed'] for rule in rules)
         try:
-            result = zxcvbn(password, user_inputs=user_inputs or [])
+            if budget_ms is None:
+                result = strength_scorer.score(password, user_inputs)
+            else:
+                result = strength_scorer.score_within(password, user_inputs, budget_ms)
+            if result is None:
+                return {
+                    'score': None,
+                    'strength': 'pending',
+                    'crack_time': 'unknown',
+                    'feedback': {'warning': '', 'suggestions': []},
+                    'rules': rules,
+                    'meets_requirements': False
+                }
             
             strength_labels = {
                 0: 'very weak',
@@ -110,8 +340,10 @@ class PasswordValidator:
                 'strength': strength_labels[result['score']],
                 'crack_time': result['crack_times_display']['offline_slow_hashing_1e4_per_second'],
                 'feedback': result.get('feedback', {'warning': '', 'suggestions': []}),
-                'guesses': result.get('guesses', 0),
-                'calc_time': result.get('calc_time', 0)
+                'guesses': int(result.get('guesses', 0)),
+                'calc_time_ms': round(result['calc_time'].total_seconds() * 1000, 1) if 'calc_time' in result else 0,
+                'rules': rules,
+                'meets_requirements': meets_rules and result['score'] >= cls.MIN_SCORE
             }
             
         except Exception:
@@ -119,7 +351,9 @@ class PasswordValidator:
                 'score': 1,
                 'strength': 'unknown',
                 'crack_time': 'unknown',
-                'feedback': {'warning': 'Unable to analyze password strength', 'suggestions': []}
+                'feedback': {'warning': 'Unable to analyze password strength', 'suggestions': []},
+                'rules': rules,
+                'meets_requirements': False
             }
 
 def validate_password(password: str, user_inputs: List[str] = None) -> Tuple[bool, str]:
@@ -0,0 +1,86 @@
+"""
+Per-client request rate limiting for JSON endpoints
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import wraps
+
+from flask import current_app, jsonify
+
+
+class RateLimiter:
+    """
+    Sliding-window request counter keyed by client.
+
+    Like the memory lockout backend, state is private to the worker process
+    and the number of tracked clients is capped, so a spray of unique
+    addresses cannot grow memory without bound.
+    """
+
+    def __init__(self, limit=30, window_seconds=60, max_keys=10000):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key) -> float:
+        """
+        Count one request for ``key``.
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until it would be
+        """
+        now = time.monotonic()
+        cutoff = now - self.window_seconds
+        with self._lock:
+            hits = self._entries.get(key)
+            if hits is None:
+                hits = deque()
+                self._entries[key] = hits
+            else:
+                self._entries.move_to_end(key)
+            while hits and hits[0] <= cutoff:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return hits[0] + self.window_seconds - now
+            hits.append(now)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        return 0
+
+    def clear(self):
+        """Drop all tracked clients."""
+        with self._lock:
+            self._entries.clear()
+
+
+def rate_limit(config_key, default=30, window_seconds=60):
+    """
+    Limit a view to ``app.config[config_key]`` requests per client IP per window.
+
+    Requests over the limit get a 429 JSON response with Retry-After. A limit
+    of 0 disables the check.
+    """
+    limiter = RateLimiter(default, window_seconds)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            from app.routes.login_attempts import get_client_ip
+
+            limiter.limit = current_app.config.get(config_key, default)
+            if limiter.limit:
+                wait = limiter.hit(get_client_ip())
+                if wait:
+                    retry_after = max(1, math.ceil(wait))
+                    response = jsonify({'error': 'Too many requests, please slow down.', 'retry_after': retry_after})
+                    return response, 429, {'Retry-After': str(retry_after)}
+            return view(*args, **kwargs)
+
+        wrapped.limiter = limiter
+        return wrapped
+
+    return decorator
@@ -0,0 +1,124 @@
+"""
+Stateless password reset and email verification tokens
+
+With SIGNED_TOKENS_ENABLED the links sent by email carry a timestamped
+payload signed with SECRET_KEY instead of a random id stored in
+``password_reset_tokens`` / ``email_verifications``, so issuing and checking
+them needs no table writes or token lookups, only a primary-key load of the
+user. Each payload includes a fingerprint of the state the token acts on,
+which revokes it when that state changes:
+
+- password reset: the current password hash, so the link stops working once
+  the password has been changed (by this link or otherwise);
+- email verification: the address, so the link stops working if the user
+  changes their email before clicking it.
+
+Signed tokens contain a '.', which database tokens (``secrets.token_urlsafe``)
+never do, so links issued in either mode keep working after switching.
+"""
+import hashlib
+import hmac
+import os
+
+from flask import current_app
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+from app import db
+
+PASSWORD_RESET_SALT = 'password-reset'
+EMAIL_VERIFICATION_SALT = 'email-verification'
+
+# Outcomes of load_verification_token
+TOKEN_VALID = 'valid'
+TOKEN_EXPIRED = 'expired'
+TOKEN_INVALID = 'invalid'
+
+
+def signed_tokens_enabled():
+    """Whether new tokens should be issued as signed tokens."""
+    return current_app.config.get('SIGNED_TOKENS_ENABLED', False)
+
+
+def is_signed_token(token):
+    """Whether ``token`` was issued by this module rather than stored in a table."""
+    return '.' in token
+
+
+def _serializer(salt):
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=salt)
+
+
+def fingerprint(value):
+    """Short keyed digest of ``value``; reveals nothing about it to the token holder."""
+    key = current_app.config['SECRET_KEY']
+    if isinstance(key, str):
+        key = key.encode()
+    return hmac.new(key, value.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def _load(token, salt, max_age):
+    """
+    Verify a token's signature and age and load its user.
+
+    Returns:
+        Tuple of (status, user, fingerprint); user and fingerprint are None
+        unless the status is TOKEN_VALID
+    """
+    from app.models.user import User
+
+    try:
+        user_id, bound = _serializer(salt).loads(token, max_age=max_age)
+    except SignatureExpired:
+        return TOKEN_EXPIRED, None, None
+    except (BadSignature, TypeError, ValueError):
+        return TOKEN_INVALID, None, None
+    user = db.session.get(User, user_id)
+    if user is None:
+        return TOKEN_INVALID, None, None
+    return TOKEN_VALID, user, bound
+
+
+def generate_reset_token(user):
+    """Signed password reset token, valid until the password changes or it expires."""
+    return _serializer(PASSWORD_RESET_SALT).dumps([user.id, fingerprint(user.password_hash)])
+
+
+def load_reset_token(token):
+    """
+    The user a signed reset token was issued to, or None if it is invalid,
+    expired or already used (the password hash no longer matches).
+    """
+    max_age = current_app.config.get('PASSWORD_RESET_TOKEN_MAX_AGE', 3600)
+    status, user, bound = _load(token, PASSWORD_RESET_SALT, max_age)
+    if status != TOKEN_VALID or not hmac.compare_digest(bound, fingerprint(user.password_hash)):
+        return None
+    return user
+
+
+def generate_verification_token(user):
+    """Signed email verification token for the user's current address."""
+    return _serializer(EMAIL_VERIFICATION_SALT).dumps([user.id, fingerprint(user.email)])
+
+
+def load_verification_token(token):
+    """
+    Returns:
+        Tuple of (status, user): TOKEN_VALID with the user, or TOKEN_EXPIRED /
+        TOKEN_INVALID (also when the user's email has changed) with None
+    """
+    max_age = current_app.config.get('EMAIL_VERIFICATION_TOKEN_MAX_AGE', 86400)
+    status, user, bound = _load(token, EMAIL_VERIFICATION_SALT, max_age)
+    if status != TOKEN_VALID:
+        return status, None
+    if not hmac.compare_digest(bound, fingerprint(user.email)):
+        return TOKEN_INVALID, None
+    return TOKEN_VALID, user
+
+
+def init_signed_tokens(app):
+    """Warn when signed tokens are enabled without a fixed SECRET_KEY."""
+    if app.config.get('SIGNED_TOKENS_ENABLED') and not os.environ.get('SECRET_KEY'):
+        app.logger.warning(
+            "SIGNED_TOKENS_ENABLED without SECRET_KEY: links stop working on restart "
+            "and are rejected by other worker processes"
+        )
@@ -0,0 +1,188 @@
+"""
+Local SMTP stand-in for development and tests
+
+Accepts mail on a local port and keeps it in memory (optionally writing each
+message to a directory), with knobs to simulate a slow or failing server.
+Only the plain SMTP commands Flask-Mail uses are implemented: no TLS or AUTH,
+so point the app at it with MAIL_USE_TLS=false and no MAIL_PASSWORD.
+"""
+import os
+import random
+import socket
+import socketserver
+import threading
+import time
+from collections import namedtuple
+from email import message_from_bytes
+from email.policy import default as default_policy
+
+ReceivedMessage = namedtuple('ReceivedMessage', ['sender', 'recipients', 'data', 'received_at'])
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+        self.wfile.flush()
+
+    def handle(self):
+        sink = self.server.sink
+        sink.connections += 1
+        with sink._lock:
+            sink._clients.add(self.request)
+        try:
+            self._converse(sink)
+        finally:
+            with sink._lock:
+                sink._clients.discard(self.request)
+
+    def _converse(self, sink):
+        sender, recipients = None, []
+        if sink.connect_delay:
+            time.sleep(sink.connect_delay)
+        self.reply(f'220 {sink.hostname} SMTP sink ready')
+        while True:
+            line = self.rfile.readline(65536)
+            if not line:
+                return
+            command, _, argument = line.decode('ascii', 'replace').strip().partition(' ')
+            command = command.upper()
+
+            if command in ('EHLO', 'HELO'):
+                self.reply(f'250 {sink.hostname}')
+            elif command == 'MAIL':
+                sender, recipients = argument.partition(':')[2].strip().strip('<>'), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipient = argument.partition(':')[2].strip().strip('<>')
+                if sink.reject_recipient and sink.reject_recipient in recipient:
+                    self.reply('550 Mailbox unavailable')
+                else:
+                    recipients.append(recipient)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                if not recipients:
+                    self.reply('503 Need RCPT first')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = self._read_data()
+                if sink.delay:
+                    time.sleep(sink.delay)
+                if sink.fail_rate and random.random() < sink.fail_rate:
+                    self.reply('451 Temporary failure, try again later')
+                else:
+                    sink.store(ReceivedMessage(sender, recipients, data, time.time()))
+                    self.reply('250 OK queued')
+                sender, recipients = None, []
+            elif command == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def _read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline(1 << 20)
+            if not line or line in (b'.\r\n', b'.\n'):
+                break
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b'..') else line)
+        return b''.join(lines)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """
+    In-process SMTP server that records what it receives.
+
+    ``connect_delay`` seconds are spent before the greeting (standing in for
+    a TLS handshake and login), ``delay`` on every DATA command, ``fail_rate`` of
+    messages get a 451 temporary failure, and recipients containing
+    ``reject_recipient`` get a 550.
+    """
+
+    def __init__(self, host='127.0.0.1', port=1025, delay=0.0, fail_rate=0.0,
+                 reject_recipient=None, maildir=None, connect_delay=0.0):
+        self.host = host
+        self.port = port
+        self.hostname = 'localhost'
+        self.delay = delay
+        self.connect_delay = connect_delay
+        self.connections = 0
+        self.fail_rate = fail_rate
+        self.reject_recipient = reject_recipient
+        self.maildir = maildir
+        self.on_message = None  # Optional callback for each received message
+        self.messages = []
+        self._lock = threading.Lock()
+        self._clients = set()
+        self._server = None
+        self._thread = None
+
+    def store(self, message):
+        with self._lock:
+            self.messages.append(message)
+            count = len(self.messages)
+        if self.maildir:
+            os.makedirs(self.maildir, exist_ok=True)
+            path = os.path.join(self.maildir, f'{int(message.received_at * 1000)}-{count}.eml')
+            with open(path, 'wb') as f:
+                f.write(message.data)
+        if self.on_message:
+            self.on_message(message)
+
+    def parsed(self, index=-1):
+        """A received message as an ``email.message.EmailMessage``."""
+        return message_from_bytes(self.messages[index].data, policy=default_policy)
+
+    def start(self):
+        """Serve in a background thread; returns the bound port (pass port=0 for any free one)."""
+        self._server = _Server((self.host, self.port), _SMTPHandler)
+        self._server.sink = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name='smtp-sink')
+        self._thread.start()
+        return self.port
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted."""
+        self._server = _Server((self.host, self.port), _SMTPHandler)
+        self._server.sink = self
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def drop_connections(self):
+        """Close every client connection, as a server dropping idle clients would."""
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        self.drop_connections()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,56 @@
+"""
+Time bucket helpers shared by login statistics and rollups
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+# Time bucket resolutions for login activity
+BUCKET_SIZES = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+# Bucket label format per resolution (strftime syntax)
+LABEL_FORMATS = {
+    'minute': '%Y-%m-%d %H:%M',
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+}
+
+_DIALECT_FORMATS = {
+    'postgresql': {
+        'minute': 'YYYY-MM-DD HH24:MI',
+        'hour': 'YYYY-MM-DD HH24:00',
+        'day': 'YYYY-MM-DD',
+    },
+    'mysql': {
+        'minute': '%Y-%m-%d %H:%i',
+        'hour': '%Y-%m-%d %H:00',
+        'day': '%Y-%m-%d',
+    },
+}
+
+
+def bucket_label(column, bucket, dialect_name):
+    """SQL expression formatting a timestamp column as its bucket label."""
+    if dialect_name == 'postgresql':
+        return func.to_char(column, _DIALECT_FORMATS['postgresql'][bucket])
+    if dialect_name in ('mysql', 'mariadb'):
+        return func.date_format(column, _DIALECT_FORMATS['mysql'][bucket])
+    return func.strftime(LABEL_FORMATS[bucket], column)
+
+
+def parse_bucket_label(label, bucket) -> datetime:
+    """Turn a bucket label produced by ``bucket_label`` back into its start time."""
+    return datetime.strptime(label, LABEL_FORMATS[bucket])
+
+
+def floor_to_bucket(moment, bucket):
+    """Truncate a datetime to the start of its bucket."""
+    if bucket == 'minute':
+        return moment.replace(second=0, microsecond=0)
+    if bucket == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
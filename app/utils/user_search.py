@@ -0,0 +1,202 @@
+"""
+Indexed user search for the admin panel
+
+On SQLite the ``users_fts`` FTS5 table (trigram tokenizer) mirrors the
+username and email columns of ``users`` and is kept in sync by triggers, so
+substring searches are index lookups. Queries shorter than a
+trigram, and databases without FTS5, use prefix range scans on the
+``lower(username)``/``lower(email)`` expression indexes instead of
+``LIKE '%term%'``. Like the trigram tokenizer, every comparison ignores case.
+
+Substring matches are ranked exact match first, then username prefix, email
+prefix, and finally by username length (a term covering more of a short
+username is the closer match). bm25 is not used: on fields this short it
+reduces to the same length ordering but costs a doclist scan per row.
+"""
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import case, column, func, literal_column, select, table, text
+
+from app import db
+from app.models.user import User
+
+FTS_TABLE = 'users_fts'
+
+# Trigram tokens are three characters; shorter terms cannot be matched by FTS5
+MIN_FTS_TERM_LENGTH = 3
+
+_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        username, email, content='users', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, email)
+        VALUES ('delete', old.id, old.username, old.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF username, email ON users BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, email)
+        VALUES ('delete', old.id, old.username, old.email);
+        INSERT INTO {FTS_TABLE}(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+]
+
+_FTS_DROP = [
+    'DROP TRIGGER IF EXISTS users_fts_insert',
+    'DROP TRIGGER IF EXISTS users_fts_delete',
+    'DROP TRIGGER IF EXISTS users_fts_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+_fts_table = table(FTS_TABLE, column('rowid'))
+
+# Engine URL -> whether the FTS table is usable there
+_fts_state = {}
+
+
+def _search_backend() -> str:
+    return current_app.config.get('USER_SEARCH_BACKEND', 'auto')
+
+
+def create_search_index(rebuild=False, engine=None) -> bool:
+    """
+    Create the FTS5 table and sync triggers if the database supports them.
+
+    A freshly created table is populated from ``users``; pass ``rebuild`` to
+    repopulate an existing one. ``engine`` defaults to the app's engine.
+
+    Returns:
+        True if FTS search is available
+    """
+    engine = engine or db.engine
+    if engine.dialect.name != 'sqlite' or _search_backend() == 'prefix':
+        _fts_state[str(engine.url)] = False
+        return False
+
+    try:
+        with engine.begin() as connection:
+            existed = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first() is not None
+            for statement in _FTS_DDL:
+                connection.execute(text(statement))
+            if rebuild or not existed:
+                connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    except Exception as e:
+        # SQLite builds without FTS5 or the trigram tokenizer (< 3.34)
+        current_app.logger.warning(f"User search index unavailable, using prefix search: {e}")
+        _fts_state[str(engine.url)] = False
+        return False
+
+    _fts_state[str(engine.url)] = True
+    return True
+
+
+def drop_search_index(engine=None):
+    """Remove the FTS5 table and its triggers."""
+    engine = engine or db.engine
+    with engine.begin() as connection:
+        for statement in _FTS_DROP:
+            connection.execute(text(statement))
+    _fts_state[str(engine.url)] = False
+
+
+def rebuild_search_index(engine=None) -> int:
+    """
+    Recreate the FTS5 table from ``users``.
+
+    Returns:
+        Number of users indexed, or -1 if FTS search is not available
+    """
+    engine = engine or db.engine
+    if not create_search_index(rebuild=True, engine=engine):
+        return -1
+    with engine.connect() as connection:
+        return connection.execute(text(f'SELECT count(*) FROM {FTS_TABLE}')).scalar()
+
+
+def fts_enabled(engine=None) -> bool:
+    """Whether searches on the database go through the FTS5 table."""
+    engine = engine or db.engine
+    key = str(engine.url)
+    if key not in _fts_state:
+        create_search_index(engine=engine)
+    return _fts_state[key]
+
+
+def _fts_phrase(term: str) -> str:
+    # Quote the whole term as one phrase so FTS5 operators in user input are literal
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _prefix_upper_bound(term: str) -> str:
+    # Smallest string greater than every string starting with ``term``
+    return term + '\U0010ffff'
+
+
+def _folded(column):
+    # Matches the idx_users_username_lower / idx_users_email_lower expression indexes
+    return func.lower(column)
+
+
+def _has_prefix(column, term: str):
+    # Lower-case the term in SQL as well, so both sides fold the same characters
+    return (_folded(column) >= func.lower(term)) & (_folded(column) < func.lower(_prefix_upper_bound(term)))
+
+
+def _prefix_filter(term: str):
+    return _has_prefix(User.username, term) | _has_prefix(User.email, term)
+
+
+def search_users(query, term: str, ranked=True, max_results: Optional[int] = None):
+    """
+    Narrow a ``User`` query to users whose username or email matches ``term``, ignoring case.
+
+    Exact matches rank first, then username and email prefixes, then shorter
+    usernames.
+    FTS candidates are the newest ``max_results`` matching users: walking the
+    index by rowid stops early, while ranking every match of a broad term
+    would touch a large share of the table. Exact and prefix matches are
+    added from the username/email indexes whatever their age, so the
+    best-ranked users are never cut off by the cap.
+
+    Args:
+        query: ``User`` ORM query to filter
+        term: Search text typed by the admin
+        ranked: Order the query by relevance (skip when the caller orders it)
+        max_results: Cap on FTS candidates (defaults to ``USER_SEARCH_MAX_RESULTS``)
+
+    Returns:
+        Filtered (and optionally ordered) query
+    """
+    term = term.strip()
+    if not term:
+        return query
+
+    match_tier = case(
+        ((_folded(User.username) == func.lower(term)) | (_folded(User.email) == func.lower(term)), 0),
+        (_has_prefix(User.username, term), 1),
+        (_has_prefix(User.email, term), 2),
+        else_=3,
+    )
+    relevance = (match_tier, func.length(User.username), User.id.desc())
+
+    if len(term) >= MIN_FTS_TERM_LENGTH and fts_enabled(query.session.get_bind()):
+        if max_results is None:
+            max_results = current_app.config.get('USER_SEARCH_MAX_RESULTS', 500)
+        matches = select(_fts_table.c.rowid.label('user_id')).where(
+            literal_column(FTS_TABLE).op('MATCH')(_fts_phrase(term))
+        ).order_by(_fts_table.c.rowid.desc()).limit(max_results)
+        query = query.filter(User.id.in_(matches) | _prefix_filter(term))
+        if ranked:
+            query = query.order_by(*relevance)
+        return query
+
+    query = query.filter(_prefix_filter(term))
+    if ranked:
+        query = query.order_by(*relevance)
+    return query
@@ -6,8 +6,9 @@ load_dotenv()
 
 class Config:
     """Base configuration class."""
-    # Generate a secure random secret key
-    SECRET_KEY = os.urandom(24)
+    # Generate a secure random secret key unless one is configured (signed
+    # tokens and sessions only survive restarts and span workers with a fixed key)
+    SECRET_KEY = os.environ.get('SECRET_KEY') or os.urandom(24)
     
     # Check if running on Vercel
     IS_VERCEL = os.environ.get('VERCEL') == '1'
@@ -24,6 +25,26 @@ class Config:
             'sqlite:///' + os.path.join(basedir, 'instance', 'app.db')
         SQLALCHEMY_TRACK_MODIFICATIONS = False
         DISABLE_DATABASE = False
+
+    # SQLite pragmas run on each connection when SQLITE_TUNING_ENABLED (on in production)
+    SQLITE_TUNING_ENABLED = os.environ.get('SQLITE_TUNING_ENABLED', 'False').lower() in ['true', 'on', '1']
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))  # Wait this long for the write lock
+    SQLITE_CACHE_SIZE_KIB = int(os.environ.get('SQLITE_CACHE_SIZE_KIB', 20000))  # Page cache per connection
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # Bytes; 0 disables
+    SQLITE_JOURNAL_SIZE_LIMIT = int(os.environ.get('SQLITE_JOURNAL_SIZE_LIMIT', 64 * 1024 * 1024))  # WAL file, bytes
+
+    # Connection pool (per worker process)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # Seconds before a connection is replaced
+
+    # Read replica for admin pages and log exports (empty URL: the SQLite file through a query-only pool)
+    READ_REPLICA_ENABLED = os.environ.get('READ_REPLICA_ENABLED', 'False').lower() in ['true', 'on', '1']
+    READ_REPLICA_URL = os.environ.get('READ_REPLICA_URL', '')
+    READ_REPLICA_STICKY_SECONDS = int(os.environ.get('READ_REPLICA_STICKY_SECONDS', 10))  # Primary reads after a write
     
     # Email configuration (required for password reset)
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
@@ -31,7 +52,39 @@ class Config:
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
+
+    # Pooled SMTP connections (per process)
+    MAIL_POOL_SIZE = int(os.environ.get('MAIL_POOL_SIZE', 2))
+    MAIL_POOL_IDLE_TIMEOUT = int(os.environ.get('MAIL_POOL_IDLE_TIMEOUT', 60))  # Seconds before an idle connection is closed
+    MAIL_POOL_HEALTH_CHECK_AFTER = int(os.environ.get('MAIL_POOL_HEALTH_CHECK_AFTER', 10))  # Idle seconds before a NOOP check
+    MAIL_POOL_MAX_MESSAGES = int(os.environ.get('MAIL_POOL_MAX_MESSAGES', 100))  # Then the connection is recycled
+    MAIL_TIMEOUT = int(os.environ.get('MAIL_TIMEOUT', 30))  # Socket timeout, seconds
+
+    # Transactional email outbox, drained by `flask outbox work` (off: send inline; on requires the worker)
+    EMAIL_OUTBOX_ENABLED = os.environ.get('EMAIL_OUTBOX_ENABLED', 'False').lower() in ['true', 'on', '1']
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 50))
+    EMAIL_OUTBOX_POLL_INTERVAL = float(os.environ.get('EMAIL_OUTBOX_POLL_INTERVAL', 5))  # Seconds
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))  # Then dead-lettered
+    EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.environ.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))  # Doubles per attempt
+    EMAIL_OUTBOX_BACKOFF_MAX = int(os.environ.get('EMAIL_OUTBOX_BACKOFF_MAX', 3600))
+    EMAIL_OUTBOX_LEASE_SECONDS = int(os.environ.get('EMAIL_OUTBOX_LEASE_SECONDS', 300))  # Crashed worker's claim expires
     
+    # Maintenance sweeps (flask maintenance run/work): batched deletes of old rows
+    MAINTENANCE_BATCH_SIZE = int(os.environ.get('MAINTENANCE_BATCH_SIZE', 1000))  # Rows per DELETE/commit
+    MAINTENANCE_BATCH_PAUSE = float(os.environ.get('MAINTENANCE_BATCH_PAUSE', 0.05))  # Seconds between batches
+    MAINTENANCE_INTERVAL = int(os.environ.get('MAINTENANCE_INTERVAL', 3600))  # Seconds between worker runs
+    MAINTENANCE_REQUEST_BUDGET = float(os.environ.get('MAINTENANCE_REQUEST_BUDGET', 2))  # Seconds for the admin button
+    LOGIN_ATTEMPT_RETENTION_DAYS = int(os.environ.get('LOGIN_ATTEMPT_RETENTION_DAYS', 30))
+    EMAIL_VERIFICATION_RETENTION_DAYS = int(os.environ.get('EMAIL_VERIFICATION_RETENTION_DAYS', 7))  # After expiry
+    PASSWORD_RESET_RETENTION_DAYS = int(os.environ.get('PASSWORD_RESET_RETENTION_DAYS', 7))  # After expiry
+    CONTACT_RETENTION_DAYS = int(os.environ.get('CONTACT_RETENTION_DAYS', 90))
+    EMAIL_OUTBOX_RETENTION_DAYS = int(os.environ.get('EMAIL_OUTBOX_RETENTION_DAYS', 7))  # Sent messages
+    LOGIN_ROLLUP_IP_HOURLY_RETENTION_DAYS = int(os.environ.get('LOGIN_ROLLUP_IP_HOURLY_RETENTION_DAYS', 7))  # Top IPs up to 7d read hourly rows
+
+    # Archive login attempts and contact submissions (gzip JSONL per day) before deleting them
+    ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'True').lower() in ['true', 'on', '1']
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', '')  # Empty: instance/archive
+
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(days=int(os.environ.get('PERMANENT_SESSION_LIFETIME', 30)))
     SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
@@ -40,12 +93,56 @@ class Config:
     
     # Application settings
     POSTS_PER_PAGE = int(os.environ.get('POSTS_PER_PAGE', 10))
+    ADMIN_PAGINATION_MODE = os.environ.get('ADMIN_PAGINATION_MODE', 'offset')  # 'offset' (numbered pages) or 'cursor'
+    USER_SEARCH_BACKEND = os.environ.get('USER_SEARCH_BACKEND', 'auto')  # 'auto' (FTS5 on SQLite) or 'prefix'
+    USER_SEARCH_MAX_RESULTS = int(os.environ.get('USER_SEARCH_MAX_RESULTS', 500))  # Ranked FTS candidates per search
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))  # Rows fetched per query when streaming exports
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'app/static/uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file upload
 
     # Login security settings
     MAX_LOGIN_ATTEMPTS = int(os.environ.get('MAX_LOGIN_ATTEMPTS', 5))
     LOGIN_LOCKOUT_MINUTES = int(os.environ.get('LOGIN_LOCKOUT_MINUTES', 15))
+    LOCKOUT_BACKEND = os.environ.get('LOCKOUT_BACKEND', 'sql')  # sql, kv, or memory (single process only)
+    LOCKOUT_MAX_TRACKED_IPS = int(os.environ.get('LOCKOUT_MAX_TRACKED_IPS', 10000))
+    LOCKOUT_KV_URL = os.environ.get('LOCKOUT_KV_URL', 'redis://127.0.0.1:6379/0')
+    LOCKOUT_KV_PREFIX = os.environ.get('LOCKOUT_KV_PREFIX', 'lockout')
+
+    # Argon2 cost parameters (see `flask calibrate-hash`); older hashes are upgraded on login
+    ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', 3))
+    ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', 65536))  # KiB
+    ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', 4))
+
+    # Argon2 hashing pool; requests beyond workers + queue get a 503 (0 workers hashes inline)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 8))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 5))  # Seconds
+
+    # Load zxcvbn dictionaries in create_app instead of on first password check
+    # (enable with gunicorn preload_app so workers share them)
+    ZXCVBN_PRELOAD = os.environ.get('ZXCVBN_PRELOAD', 'False').lower() in ['true', 'on', '1']
+
+    # Offline breached-password check (build the files with: flask breached build)
+    BREACHED_PASSWORDS_FILE = os.environ.get('BREACHED_PASSWORDS_FILE', '')  # Empty disables the check
+    BREACHED_PASSWORDS_BLOOM = os.environ.get('BREACHED_PASSWORDS_BLOOM', '')  # Optional Bloom filter in front
+
+    # JSON password strength endpoint (per-IP requests per minute, zxcvbn deadline, max body bytes)
+    PASSWORD_STRENGTH_RATE_LIMIT = int(os.environ.get('PASSWORD_STRENGTH_RATE_LIMIT', 60))
+    PASSWORD_STRENGTH_BUDGET_MS = int(os.environ.get('PASSWORD_STRENGTH_BUDGET_MS', 150))
+    PASSWORD_STRENGTH_MAX_BODY = int(os.environ.get('PASSWORD_STRENGTH_MAX_BODY', 4096))
+
+    # Password reset and email verification links; signed tokens need no table rows
+    SIGNED_TOKENS_ENABLED = os.environ.get('SIGNED_TOKENS_ENABLED', 'False').lower() in ['true', 'on', '1']
+    PASSWORD_RESET_TOKEN_MAX_AGE = int(os.environ.get('PASSWORD_RESET_TOKEN_MAX_AGE', 3600))  # Seconds
+    EMAIL_VERIFICATION_TOKEN_MAX_AGE = int(os.environ.get('EMAIL_VERIFICATION_TOKEN_MAX_AGE', 86400))  # Seconds
+
+    # Identity cache for the Flask-Login user loader (per process)
+    IDENTITY_CACHE_ENABLED = os.environ.get('IDENTITY_CACHE_ENABLED', 'True').lower() in ['true', 'on', '1']
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 30))  # Seconds; bounds staleness across workers
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 1024))
+
+    # Login activity rollups (hourly/daily aggregates read by the admin dashboard)
+    LOGIN_ROLLUPS_ENABLED = os.environ.get('LOGIN_ROLLUPS_ENABLED', 'True').lower() in ['true', 'on', '1']
     
     # hCaptcha settings
     HCAPTCHA_ENABLED = os.environ.get('HCAPTCHA_ENABLED', 'True').lower() in ['true', 'on', '1']
@@ -61,6 +158,17 @@ class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
     TESTING = False
+
+    # Database profile: WAL and pragmas on connect, explicit pool settings
+    SQLITE_TUNING_ENABLED = os.environ.get('SQLITE_TUNING_ENABLED', 'True').lower() in ['true', 'on', '1']
+    if not Config.IS_VERCEL:
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': Config.DB_POOL_SIZE,
+            'max_overflow': Config.DB_MAX_OVERFLOW,
+            'pool_timeout': Config.DB_POOL_TIMEOUT,
+            'pool_recycle': Config.DB_POOL_RECYCLE,
+            'pool_pre_ping': True,
+        }
     
     # Use more secure settings in production
     SESSION_COOKIE_SECURE = True
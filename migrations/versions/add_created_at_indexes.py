@@ -0,0 +1,26 @@
+"""Add created_at indexes for keyset pagination
+
+Revision ID: add_created_at_indexes
+Revises: add_login_rollups
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_created_at_indexes'
+down_revision = 'add_login_rollups'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Cursor pagination orders by (created_at, id); these make each page an index range scan
+    op.create_index('ix_users_created_at', 'users', ['created_at'])
+    op.create_index('ix_contact_submissions_created_at', 'contact_submissions', ['created_at'])
+    op.create_index('idx_email_verification_created_at', 'email_verifications', ['created_at'])
+
+def downgrade():
+    op.drop_index('idx_email_verification_created_at', table_name='email_verifications')
+    op.drop_index('ix_contact_submissions_created_at', table_name='contact_submissions')
+    op.drop_index('ix_users_created_at', table_name='users')
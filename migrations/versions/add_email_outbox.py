@@ -0,0 +1,39 @@
+"""Add email outbox table
+
+Revision ID: add_email_outbox
+Revises: add_user_email_verified
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_email_outbox'
+down_revision = 'add_user_email_verified'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('sender', sa.String(length=120), nullable=True),
+        sa.Column('recipients', sa.Text(), nullable=False),
+        sa.Column('reply_to', sa.String(length=120), nullable=True),
+        sa.Column('body', sa.Text(), nullable=True),
+        sa.Column('html', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('idx_email_outbox_status_next_attempt', 'email_outbox', ['status', 'next_attempt_at'])
+
+def downgrade():
+    op.drop_index('idx_email_outbox_status_next_attempt', table_name='email_outbox')
+    op.drop_table('email_outbox')
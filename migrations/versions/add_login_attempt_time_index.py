@@ -0,0 +1,22 @@
+"""Add attempted_at index to login_attempts table
+
+Revision ID: add_login_attempt_time_index
+Revises: add_admin_field
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_login_attempt_time_index'
+down_revision = 'add_admin_field'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Time-range scans (dashboard, stats, cleanup) cannot use idx_ip_attempted_at
+    op.create_index('idx_attempted_at', 'login_attempts', ['attempted_at'])
+
+def downgrade():
+    op.drop_index('idx_attempted_at', table_name='login_attempts')
@@ -0,0 +1,43 @@
+"""Add login activity rollup tables
+
+Revision ID: add_login_rollups
+Revises: add_login_attempt_time_index
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_login_rollups'
+down_revision = 'add_login_attempt_time_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'login_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('resolution', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('success', sa.Boolean(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('resolution', 'bucket_start', 'success', name='uq_login_rollup_bucket'),
+    )
+    op.create_table(
+        'login_rollup_ips',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('resolution', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('ip_address', sa.String(length=45), nullable=False),
+        sa.Column('success', sa.Boolean(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('resolution', 'bucket_start', 'ip_address', 'success', name='uq_login_rollup_ip_bucket'),
+    )
+    op.create_index('idx_rollup_ip_bucket_attempts', 'login_rollup_ips', ['resolution', 'bucket_start', 'attempts'])
+    # Backfill with: flask rollups rebuild
+
+def downgrade():
+    op.drop_index('idx_rollup_ip_bucket_attempts', table_name='login_rollup_ips')
+    op.drop_table('login_rollup_ips')
+    op.drop_table('login_rollups')
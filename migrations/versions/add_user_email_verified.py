@@ -0,0 +1,33 @@
+"""Add denormalized email verification state to users
+
+Revision ID: add_user_email_verified
+Revises: add_username_or_email_index
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_user_email_verified'
+down_revision = 'add_username_or_email_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Login reads these instead of querying email_verifications
+    op.add_column('users', sa.Column('verified_email', sa.String(length=120), nullable=True))
+    op.add_column('users', sa.Column('email_verified_at', sa.DateTime(), nullable=True))
+
+    # Backfill from the latest verified record for each user's current address
+    op.get_bind().execute(sa.text("""
+        UPDATE users SET email_verified_at = (
+            SELECT MAX(ev.verified_at) FROM email_verifications ev
+            WHERE ev.user_id = users.id AND ev.email = users.email AND ev.is_verified = :verified
+        )
+    """), {'verified': True})
+    op.execute("UPDATE users SET verified_email = email WHERE email_verified_at IS NOT NULL")
+
+def downgrade():
+    op.drop_column('users', 'email_verified_at')
+    op.drop_column('users', 'verified_email')
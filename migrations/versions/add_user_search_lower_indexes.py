@@ -0,0 +1,24 @@
+"""Add lower(username) and lower(email) indexes for case-insensitive user search
+
+Revision ID: add_user_search_lower_indexes
+Revises: add_email_outbox
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_user_search_lower_indexes'
+down_revision = 'add_email_outbox'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Prefix search compares lower(username)/lower(email); these keep it an index range scan
+    op.create_index('idx_users_username_lower', 'users', [sa.text('lower(username)')])
+    op.create_index('idx_users_email_lower', 'users', [sa.text('lower(email)')])
+
+def downgrade():
+    op.drop_index('idx_users_email_lower', table_name='users')
+    op.drop_index('idx_users_username_lower', table_name='users')
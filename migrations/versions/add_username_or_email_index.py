@@ -0,0 +1,22 @@
+"""Add username_or_email index to login_attempts
+
+Revision ID: add_username_or_email_index
+Revises: add_users_fts
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_username_or_email_index'
+down_revision = 'add_users_fts'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Per-user login history: lookup by username/email, newest first
+    op.create_index('idx_username_or_email_attempted_at', 'login_attempts', ['username_or_email', 'attempted_at'])
+
+def downgrade():
+    op.drop_index('idx_username_or_email_attempted_at', table_name='login_attempts')
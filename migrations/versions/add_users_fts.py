@@ -0,0 +1,52 @@
+"""Add FTS5 search index for users
+
+Revision ID: add_users_fts
+Revises: add_created_at_indexes
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_users_fts'
+down_revision = 'add_created_at_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # FTS5 is SQLite only; other databases search with prefix scans on the username/email indexes
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+            username, email, content='users', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+            INSERT INTO users_fts(rowid, username, email) VALUES (new.id, new.username, new.email);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+            INSERT INTO users_fts(users_fts, rowid, username, email)
+            VALUES ('delete', old.id, old.username, old.email);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF username, email ON users BEGIN
+            INSERT INTO users_fts(users_fts, rowid, username, email)
+            VALUES ('delete', old.id, old.username, old.email);
+            INSERT INTO users_fts(rowid, username, email) VALUES (new.id, new.username, new.email);
+        END
+    """)
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS users_fts_update')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_delete')
+    op.execute('DROP TRIGGER IF EXISTS users_fts_insert')
+    op.execute('DROP TABLE IF EXISTS users_fts')